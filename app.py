@@ -1,63 +1,91 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sqlalchemy import create_engine
-import os
-from dotenv import load_dotenv
-# Importing the independent modules
-from data_loader import load_and_prepare_data, ROLE_PLAYERS_MAP, load_team_data, load_match_data
-from graphs.rankings import show_rankings
-from graphs.compare_page import compare_page, show_team_stats
-from graphs.bubble_chart import show_bubble_charts
-from graphs.team_charts import show_team_performance_charts
-from graphs.eff_chart import show_efficiency_chart
-from graphs.early_game_chart import show_early_game_chart
-from graphs.impact_chart import show_impact_chart
-from graphs.misc import show_player_origin_map, show_all_rankings
-from team_overview import show_overview
-from pickems import show_pickems_page
-
-load_dotenv()
-
-def get_db_engine_():
-    url = f"postgresql+psycopg2://{os.getenv('user')}:{os.getenv('password')}@{os.getenv('endpoint')}:{os.getenv('port')}/{os.getenv('dbname')}"
-    engine = create_engine(url)
-
-    with engine.connect():
-        st.sidebar.success("Database connection successful!")
-    return engine
+# Importing the independent modules. Page renderers (and plotly) are imported on first use via page_registry.
+from db import get_engine, check_connection, pool_status
+from queries import query_stats
+from snapshot_store import DATA_SOURCE, SNAPSHOT_DIR, open_snapshot
+from data_prefetch import PageData, DataLoadTimeout
+from data_cache import DATA_CACHE, H2H_CACHE, watermark_stats
+from data_loader import load_season_snapshot, ROLE_PLAYERS_MAP, SPLIT_OPTIONS, load_team_data, load_match_index, \
+    load_team_ratings, load_all_team_data
+from page_registry import PAGES, PageContext
+from player_similarity import SIMILARITY_NORMS
+from memory_stats import memory_report, record_sample, MEMORY_STATS
+from graphs.figures import closing_figures, FIGURE_CACHE
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 @st.cache_resource
+def get_snapshot_store():
+    """Opens the offline snapshot once per process; its files are memory-mapped and shared between workers."""
+    return open_snapshot()
+
+
 def get_db_engine():
     """
-    Retrieves granular database credentials from st.secrets and
-    creates a SQLAlchemy engine, caching the result.
-    """
-    # Define required keys for the connection string
-    required_secrets = ['user', 'password', 'endpoint', 'port', 'dbname']
+    Returns the shared, pooled database engine, or None when the database is unreachable.
+    Reruns reuse the process-wide engine; the liveness check is throttled inside db.py.
 
-    #Check for missing secrets first
-    for key in required_secrets:
-        if key not in st.secrets:
-            st.error(f"Missing required secret key. Please ensure it is added to your Streamlit secrets.")
+    With DATA_SOURCE=snapshot the offline snapshot store is returned instead, and no
+    database is contacted at all. Status messages go to the current container.
+    """
+    if DATA_SOURCE == 'snapshot':
+        try:
+            store = get_snapshot_store()
+        except Exception as e:
+            st.error(f"Could not open snapshot in '{SNAPSHOT_DIR}': {e}")
             return None
+        st.info(f"Offline mode: snapshot {store.version}")
+        return store
 
     try:
-        DATABASE_URL = (
-            f"postgresql+psycopg2://{st.secrets.user}:{st.secrets.password}"
-            f"@{st.secrets.endpoint}:{st.secrets.port}/{st.secrets.dbname}"
-        )
+        engine = get_engine()
+    except Exception as e:
+        st.error(f"DB Connection Failed: Check secrets, URL format, or firewall. Error: {e}")
+        return None
 
-        engine = create_engine(DATABASE_URL)
+    if not check_connection(engine):
+        st.error("DB Connection Failed: Check secrets, URL format, or firewall.")
+        return None
 
-        with engine.connect():
-            st.sidebar.success("Database connection successful!")
-        return engine
+    st.success("Database connection successful!")
+    return engine
 
-    except Exception as e:
-        # Display an error if the connection fails
-        st.sidebar.error(f"DB Connection Failed: Check secrets, URL format, or firewall. Error:")
-        return None
+
+def show_db_metrics(engine):
+    """Readout of the connection pool counters and per-query timings, in the current container."""
+    with st.expander("Database metrics"):
+        if DATA_SOURCE != 'snapshot':
+            st.caption("Connection pool")
+            st.json(pool_status(engine))
+        st.caption("Queries")
+        st.json(query_stats())
+        st.caption("Team/match data cache")
+        st.json({'team_match': DATA_CACHE.stats(), 'head_to_head': H2H_CACHE.stats(), 'watermarks': watermark_stats()})
+        st.caption("Figure cache")
+        st.json(FIGURE_CACHE.stats())
+
+
+def show_memory_stats(engine, data: PageData):
+    """
+    Per-session memory accounting: process RSS and its growth over this session's reruns,
+    open matplotlib figures, and the bytes held by DataFrames in session state and by the shared caches.
+    The snapshot is only measured when this page already loaded it.
+
+    Only the RSS sample is taken on every rerun; the deep byte counts run while the sidebar
+    toggle is on (off unless MEMORY_STATS=1), so the accounting does not slow down the reruns it measures.
+    """
+    if not st.sidebar.toggle("Memory accounting", value=MEMORY_STATS, key='show_memory_stats'):
+        record_sample(st.session_state)
+        return
+
+    cached_bytes = {'team_match': DATA_CACHE.nbytes(), 'head_to_head': H2H_CACHE.nbytes(),
+                    'figures': FIGURE_CACHE.nbytes()}
+    if engine is not None and {'players', 'players_all', 'players_similar'}.intersection(data.loaded()):
+        cached_bytes['season_snapshot'] = get_snapshot(engine).nbytes()
+
+    ctx = get_script_run_ctx()
+    report = memory_report(st.session_state, ctx.session_id if ctx else None, cached_bytes)
+    with st.sidebar.expander("Memory"):
+        st.json(report)
 
 
 # --- App Configuration ---
@@ -67,11 +95,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Set global plotting style for consistency
-sns.set_theme(style="whitegrid")
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Inter', 'Arial']
-
 st.markdown("""
     <style>
     /* Centers the main content block */
@@ -87,14 +110,22 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(show_spinner="Loading data and running SQL query...")
-def get_data(_engine, role: str, split: str):
+@st.cache_resource(show_spinner="Loading data and running SQL query...")
+def get_snapshot(_engine):
+    """
+    Loads the season snapshot (all roles and splits) once per process.
+    cache_resource hands back the same object on every rerun instead of a copy.
+    """
+    return load_season_snapshot(_engine)
+
+
+def get_data(_engine, role: str, split: str, norms=()):
     """
-    Wrapper function to load data using Streamlit caching.
-    This function invalidates the cache when the 'role' changes.
+    Wrapper function to serve a role/split view from the cached season snapshot.
+    Changing the role or split only slices the in-memory snapshot.
+    Safe to call from loader threads: the missing-player warning is left to the caller.
     """
-    # Load and prepare data using the dynamic function
-    return load_and_prepare_data(_engine, role, split)
+    return get_snapshot(_engine).view(role, split, warn=False, norms=norms)
 
 #TODO: add same for teams, when a certain team is selected show all individual players and team
 #TODO: add other team stats like objectives, early game aggression(@15)
@@ -107,12 +138,8 @@ def main():
 
     # --- Sidebar for Filtering ---
     st.sidebar.header("Data Source & Selection")
-
-    # Get the Database Engine
-    engine = get_db_engine_()
-    if engine is None:
-        st.error("Cannot proceed without a successful database connection.")
-        return
+    # Connection status, filled in only when the selected page needs data
+    connection_status = st.sidebar.container()
 
     # Role Selector
     role_options = list(ROLE_PLAYERS_MAP.keys())
@@ -123,103 +150,69 @@ def main():
     )
 
     # Split Selector
-    split_options = ["ALL", "Spring", "Winter", "Summer", "Pre-Season"]
+    split_options = SPLIT_OPTIONS
     selected_split = st.sidebar.selectbox(
         "Filter by Split:",
         options=split_options,
         index=0  # Default to ALL
     )
 
-    #Load Data based on the selected role
-    df_filtered = get_data(engine, selected_role, selected_split)
-    df_all = get_data(engine, "All", "ALL")
-    df_teams = load_team_data(engine, selected_split)
-    df_matches = load_match_data(engine)
-
-    # Check if data was successfully loaded
-    if df_filtered.empty or df_filtered.shape[0] == 0:
-        st.warning(
-            f"No data retrieved from the database for the **{selected_role}** role. Please check the DB connection and the player list in `data_loader.py`.")
-        return
-
     # --- Sidebar for Navigation ---
     st.sidebar.markdown("---")
     st.sidebar.title("View Metrics")
-    options = st.sidebar.radio("Select Analysis Type:", [
-        "Team Overview",
-        "Player Overview & Rankings",
-        "Win/KDA & Games Analysis",
-        "Economic & Efficiency Charts",
-        "Early Game & Vision Control",
-        "Player Origins",
-        "Other charts",
-        "Teams Page",
-        "Team Comparison",
-        "Pickems Analysis",
-        "Future Additions"
-    ])
-
-    # --- Display content based on the selected section ---
-    if options == "Team Overview":
-        show_overview()
-
-    elif options == "Player Overview & Rankings":
-        # --- Display Player Summary ---
-        st.subheader(f"Players Loaded: {selected_role} ({df_filtered.shape[0]} Found)")
-        st.dataframe(df_filtered[['name', 'games', 'winrate', 'kda', 'gpm', 'kp', 'impact_score']].sort_values(by='kda',
-                                                                                                               ascending=False),
-                     width='stretch', hide_index=True)
-        st.markdown("---")
-        st.markdown("Select a role in the sidebar to load and analyze player data from the database.")
-        show_rankings(df_filtered)
-
-    elif options == "Win/KDA & Games Analysis":
-        st.header("Winrate, KDA, and Games Played")
-        show_bubble_charts(df_filtered, selected_role)
-
-    elif options == "Economic & Efficiency Charts":
-        st.header("Economic & Damage Efficiency")
-        col1, col2 = st.columns(2)
-
-        show_efficiency_chart(df_filtered, selected_role)  # CSM vs DPM
-
-        show_impact_chart(df_filtered, selected_role)  # GPM vs KP
-
-    elif options == "Early Game & Vision Control":
-        st.header("Early Game Advantage & Vision Control")
-        col1, col2 = st.columns(2)
-
-        show_early_game_chart(df_filtered, selected_role)  # GD15 vs CSD15
-
-        st.subheader("Vision Score per Minute (VSPM)")
-        st.warning("Future Chart: VSPM vs KP (Vision Control)")
-
-    elif options == "Player Origins":
-        st.header("Player Origins")
-        show_player_origin_map(df_all)
-
-    elif options == "Other charts":
-        st.header("Other charts")
-        show_all_rankings(df_filtered)
-
-    elif options == "Pickems Analysis":
-        st.header("My Pickems")
-        show_pickems_page(df_filtered, engine)
-
-    elif options == "Teams Page":
-        st.header("Teams Page")
-        st.warning("Select a split other than ALL to see charts")
-        show_team_performance_charts(df_teams)
-
-    elif options == "Team Comparison":
-        compare_page(df_matches, df_teams)
-
-    elif options == "Future Additions":
-        st.header("Future Additions")
-        st.subheader("I want to keep building this into more than just Worlds Analysis and add more data/visulations to it."
-                     " But for now I will keep adding data about the Teams playing in Worlds showcasing teams early game "
-                     "aggression, objective control and how these statistics can show how a team plays and how the changes"
-                     "in game affects teams play-style and also how teams compare domestically and on international stage")
-        st.warning("Some data is not available right now or is missing. So I am not able to build a lot relating to teams.")
+    options = st.sidebar.radio("Select Analysis Type:", list(PAGES.keys()))
+    page = PAGES[options]
+    datasets = page.datasets
+
+    # Static pages never touch the database
+    engine = None
+    if datasets:
+        with connection_status:
+            engine = get_db_engine()
+        if engine is None:
+            st.error("Cannot proceed without a successful database connection.")
+            return
+        with connection_status:
+            show_db_metrics(engine)
+
+    # The page's declared datasets load concurrently; anything else only on first access
+    data = PageData({
+        'players': lambda: get_data(engine, selected_role, selected_split),
+        'players_all': lambda: get_data(engine, "All", "ALL"),
+        # Every player with the role z-scores the similarity search uses
+        'players_similar': lambda: get_data(engine, "All", "ALL", norms=SIMILARITY_NORMS),
+        'teams': lambda: load_team_data(engine, selected_split),
+        'teams_all': lambda: load_all_team_data(engine, selected_split),
+        'matches': lambda: load_match_index(engine),
+        'ratings': lambda: load_team_ratings(engine),
+    }, prefetch=datasets)
+
+    try:
+        render_page(page, PageContext(data, engine, selected_role, selected_split))
+    except DataLoadTimeout as e:
+        st.error(f"Data could not be loaded in time: {e}")
+
+    show_memory_stats(engine, data)
+
+
+def render_page(page, ctx: PageContext):
+    """Renders the selected section; its module is imported on first use and resolves datasets from ctx.data."""
+
+    if 'players' in page.datasets:
+        df_filtered = ctx.data['players']
+        get_snapshot(ctx.engine).warn_missing_players(ctx.selected_role, ctx.selected_split)
+
+        # Check if data was successfully loaded
+        if df_filtered.empty:
+            st.warning(
+                f"No data retrieved from the database for the **{ctx.selected_role}** role. Please check the DB connection and the player list in `data_loader.py`.")
+            return
+
+    if {'players_all', 'players_similar'}.intersection(page.datasets):
+        get_snapshot(ctx.engine).warn_missing_players("All", "ALL")
+
+    # Any matplotlib figure a renderer leaves open is closed when the rerun ends
+    with closing_figures():
+        page.load()(ctx)
 
 main()
\ No newline at end of file
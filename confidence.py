@@ -0,0 +1,161 @@
+import os
+import threading
+from statistics import NormalDist
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from schema import DATA_VERSION_ATTR
+
+CI_LEVEL = 0.95
+# Parametric bootstrap resamples per player for ratio stats without a closed-form interval (KDA)
+BOOTSTRAP_SAMPLES = int(os.getenv('BOOTSTRAP_SAMPLES', '1000'))
+# Players resampled at once; bounds the (players x samples) arrays of the bootstrap
+BOOTSTRAP_CHUNK = 2048
+
+# Percentage columns (0-100) treated as a share of games: column -> column holding the games.
+# Objective shares (dragons, barons...) are really shares of objectives taken; games is the
+# closest trial count the tables have, so their intervals are approximate.
+PLAYER_RATE_COLUMNS: Dict[str, str] = {'winrate': 'games', 'fb_pct': 'games'}
+TEAM_RATE_COLUMNS: Dict[str, str] = {
+    'fb_pct': 'games', 'ft_pct': 'games', 'fos_pct': 'games', 'atak_pct': 'games', 'drag_pct': 'games',
+    'baron_pct': 'games',
+}
+
+
+def interval_columns(column: str) -> Tuple[str, str]:
+    """Names of the lower and upper bound columns of column, e.g. ('kda_lo', 'kda_hi')."""
+    return f"{column}_lo", f"{column}_hi"
+
+
+def wilson_interval(successes: np.ndarray, trials: np.ndarray, level: float = CI_LEVEL) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Wilson score interval of a binomial proportion, for all rows at once. Unlike the normal
+    approximation it stays inside [0, 1] and is sensible at 0 or n successes and small n.
+    Rows without trials get NaN.
+    """
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    n = np.where(trials > 0, trials, np.nan)
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    centre = (p + z ** 2 / (2 * n)) / denominator
+    half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return centre - half, centre + half
+
+
+def kda_interval(avg_kills: np.ndarray, avg_deaths: np.ndarray, avg_assists: np.ndarray, games: np.ndarray,
+                 kda: Optional[np.ndarray] = None, level: float = CI_LEVEL, samples: int = BOOTSTRAP_SAMPLES,
+                 seed: Optional[int] = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile interval of KDA, (kills + assists) / max(deaths, 1), by parametric bootstrap:
+    each player's season totals are redrawn as Poisson counts around the observed ones, for
+    every player and sample in one (players x samples) draw per chunk of players. Kills and
+    assists are drawn as one count, since a sum of independent Poisson counts is Poisson.
+
+    When the reported kda is given, the interval is scaled to it (bounds relative to the
+    resampled ratio), so it is centred on the value the charts show even if the source
+    rounds or computes KDA slightly differently.
+    """
+    rng = np.random.default_rng(seed)
+    games = np.asarray(games, dtype=np.float64)
+    involved = np.nan_to_num(np.maximum((np.asarray(avg_kills) + np.asarray(avg_assists)) * games, 0.0))
+    deaths = np.nan_to_num(np.maximum(np.asarray(avg_deaths) * games, 0.0))
+    # Order statistics of the interval bounds, picked by partial selection instead of a full sort
+    lower_rank = int(np.floor((1 - level) / 2 * (samples - 1)))
+    upper_rank = samples - 1 - lower_rank
+    low, high = np.empty(len(games)), np.empty(len(games))
+
+    for start in range(0, len(games), BOOTSTRAP_CHUNK):
+        stop = min(start + BOOTSTRAP_CHUNK, len(games))
+        shape = (stop - start, samples)
+        resampled = rng.poisson(involved[start:stop, None], size=shape).astype(np.float32) / \
+            np.maximum(rng.poisson(deaths[start:stop, None], size=shape), 1)
+        resampled.partition([lower_rank, upper_rank], axis=1)
+        low[start:stop], high[start:stop] = resampled[:, lower_rank], resampled[:, upper_rank]
+
+    if kda is not None:
+        point = involved / np.maximum(deaths, 1)
+        scale = np.divide(np.asarray(kda, dtype=np.float64), point, out=np.ones_like(point), where=point > 0)
+        low, high = low * scale, high * scale
+
+    no_games = ~(games > 0)
+    low[no_games], high[no_games] = np.nan, np.nan
+    return low, high
+
+
+def _rate_intervals(df: pd.DataFrame, rate_columns: Dict[str, str], level: float) -> Dict[str, np.ndarray]:
+    bounds = {}
+    for column, trials_column in rate_columns.items():
+        if column not in df.columns or trials_column not in df.columns:
+            continue
+        trials = df[trials_column].to_numpy(dtype=np.float64)
+        share = np.clip(df[column].to_numpy(dtype=np.float64) / 100, 0, 1)
+        low, high = wilson_interval(share * trials, trials, level)
+        bounds[column] = (low * 100, high * 100)
+    return bounds
+
+
+def player_intervals(df: pd.DataFrame, level: float = CI_LEVEL) -> pd.DataFrame:
+    """
+    Lower and upper bounds ('<column>_lo', '<column>_hi') of the players' winrate, first blood
+    rate and KP (Wilson) and KDA (bootstrap), aligned with df.
+
+    KP is a share of the team's kills: the team kills behind it are recovered from the
+    player's kills and assists, (kills + assists) / KP, and used as the trial count.
+    """
+    bounds = _rate_intervals(df, PLAYER_RATE_COLUMNS, level)
+
+    if {'kp', 'avg_kills', 'avg_assists', 'games'}.issubset(df.columns):
+        involved = (df['avg_kills'] + df['avg_assists']).to_numpy(dtype=np.float64) * df['games'].to_numpy(dtype=np.float64)
+        share = np.clip(df['kp'].to_numpy(dtype=np.float64) / 100, 0, 1)
+        team_kills = np.where(share > 0, involved / np.where(share > 0, share, 1), 0)
+        low, high = wilson_interval(share * team_kills, team_kills, level)
+        bounds['kp'] = (low * 100, high * 100)
+
+    if {'avg_kills', 'avg_deaths', 'avg_assists', 'games'}.issubset(df.columns):
+        bounds['kda'] = kda_interval(df['avg_kills'].to_numpy(), df['avg_deaths'].to_numpy(),
+                                     df['avg_assists'].to_numpy(), df['games'].to_numpy(),
+                                     df['kda'].to_numpy() if 'kda' in df.columns else None, level)
+
+    return _bounds_frame(df, bounds)
+
+
+def team_intervals(df: pd.DataFrame, level: float = CI_LEVEL) -> pd.DataFrame:
+    """Wilson bounds ('<column>_lo', '<column>_hi') of the teams' percentage stats, aligned with df."""
+    return _bounds_frame(df, _rate_intervals(df, TEAM_RATE_COLUMNS, level))
+
+
+def _bounds_frame(df: pd.DataFrame, bounds: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> pd.DataFrame:
+    columns = {}
+    for column, (low, high) in bounds.items():
+        low_name, high_name = interval_columns(column)
+        columns[low_name], columns[high_name] = low, high
+    return pd.DataFrame(columns, index=df.index).astype(np.float32)
+
+
+_intervals: LRUCache = LRUCache(maxsize=64)
+_intervals_lock = threading.Lock()
+
+
+def with_intervals(df: pd.DataFrame, kind: str = 'players') -> pd.DataFrame:
+    """
+    df with the interval columns of player_intervals() or team_intervals() (kind 'players' or
+    'teams') added, keeping its attrs. The bounds are computed once per data version.
+    """
+    compute = player_intervals if kind == 'players' else team_intervals
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        bounds = compute(df)
+    else:
+        with _intervals_lock:
+            bounds = _intervals.get((version, kind))
+        if bounds is None:
+            bounds = compute(df)
+            with _intervals_lock:
+                _intervals[(version, kind)] = bounds
+
+    result = pd.concat([df, bounds.drop(columns=[col for col in bounds.columns if col in df.columns])], axis=1)
+    result.attrs = dict(df.attrs)
+    return result
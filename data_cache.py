@@ -0,0 +1,163 @@
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+from cachetools import TTLCache
+from sqlalchemy.engine import Engine
+
+from queries import fetch, watermark_statement_name
+
+# Upper bound on how long a cached result is served, even if its watermark never moves (seconds)
+DATA_CACHE_TTL = int(os.getenv('DATA_CACHE_TTL', '3600'))
+DATA_CACHE_MAX_ENTRIES = int(os.getenv('DATA_CACHE_MAX_ENTRIES', '32'))
+# How long a table's watermark is trusted before it is re-read; bounds staleness after ingestion (seconds)
+WATERMARK_TTL = int(os.getenv('WATERMARK_TTL', '60'))
+# Entry lifetime for tables whose watermark is a row count only, which misses in-place refreshes (seconds)
+COUNT_ONLY_TTL = int(os.getenv('COUNT_ONLY_TTL', '300'))
+
+logger = logging.getLogger(__name__)
+
+
+class LoadFailed(Exception):
+    """
+    Raised by a cached loader that could not read its data, carrying the placeholder to show instead.
+
+    The cache hands the fallback to the caller without storing it, so the next rerun tries again,
+    while a successful load that is legitimately empty is cached like any other result.
+    """
+
+    def __init__(self, fallback: Any):
+        super().__init__("loader fell back to a placeholder result")
+        self.fallback = fallback
+
+
+class WatermarkCache:
+    """
+    Caches loader results keyed on a cheap per-table change watermark.
+
+    A cached entry is served while its table's watermark (row count plus the max of a
+    marker column, see queries.WATERMARK_COLUMNS) is unchanged. The watermark itself is
+    only re-read every WATERMARK_TTL seconds, so most reruns do no database work at all.
+    A table without a marker is only watched by its row count, so its entries are also
+    dropped after COUNT_ONLY_TTL seconds. When full, the least recently used entry is evicted first.
+    """
+
+    def __init__(self, maxsize: int = DATA_CACHE_MAX_ENTRIES, ttl: int = DATA_CACHE_TTL):
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def watermark(self, engine: Engine, table: str) -> Optional[Tuple]:
+        """Current watermark of table, or None if it could not be read."""
+        with _watermarks_lock:
+            if table in _watermarks:
+                return _watermarks[table]
+
+        try:
+            row = fetch(engine, watermark_statement_name(table), []).iloc[0]
+        except Exception as e:
+            logger.warning("Could not read watermark for %s: %s", table, e)
+            return None
+
+        # A missing marker (no marker column, or an empty table) leaves the row count as the only signal
+        mark = (int(row['row_count']), None if pd.isna(row['max_marker']) else str(row['max_marker']))
+        with _watermarks_lock:
+            _watermarks[table] = mark
+        return mark
+
+    def get_or_load(self, engine: Engine, table: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        mark = self.watermark(engine, table)
+        if mark is None:
+            # Without a watermark there is nothing to validate against, so load directly
+            return _run(loader)[0]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mark and \
+                    (mark[1] is not None or time.monotonic() - entry[2] < COUNT_ONLY_TTL):
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value, loaded = _run(loader)
+        # A failed load is not pinned until the TTL expires; an empty result is
+        if loaded:
+            with self._lock:
+                self._entries[key] = (mark, value, time.monotonic())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def nbytes(self) -> int:
+        """Deep size of the cached values: their own nbytes() where they have one, else DataFrame memory usage."""
+        with self._lock:
+            values = [entry[1] for entry in self._entries.values()]
+        return sum(_value_nbytes(v) for v in values)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def _value_nbytes(value: Any) -> int:
+    if callable(getattr(value, 'nbytes', None)):
+        return int(value.nbytes())
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return 0
+
+
+def _run(loader: Callable[[], Any]) -> Tuple[Any, bool]:
+    """(result, True) for a successful load, (fallback, False) when the loader raised LoadFailed."""
+    try:
+        return loader(), True
+    except LoadFailed as failure:
+        return failure.fallback, False
+
+
+# Watermarks are per table, shared by every cache instance
+_watermarks: TTLCache = TTLCache(maxsize=64, ttl=WATERMARK_TTL)
+_watermarks_lock = threading.Lock()
+
+
+def watermark_stats() -> Dict[str, list]:
+    with _watermarks_lock:
+        return {table: list(mark) for table, mark in _watermarks.items()}
+
+
+DATA_CACHE = WatermarkCache()
+
+# Small LRU of recently compared team pairs for the Team Comparison page
+H2H_CACHE = WatermarkCache(maxsize=int(os.getenv('H2H_CACHE_SIZE', '64')))
+
+
+def watermark_cached(table: str, cache: Optional[WatermarkCache] = None):
+    """
+    Decorator for loaders shaped like loader(engine, *args) that read from table.
+
+    Results are shared across sessions and must be treated as read-only by callers.
+    A loader signals a failed read by raising LoadFailed; callers get its fallback, uncached.
+    The undecorated function stays available as .uncached (and raises LoadFailed itself).
+    """
+    cache = cache or DATA_CACHE
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(engine: Engine, *args):
+            return cache.get_or_load(engine, table, (func.__name__,) + args, lambda: func(engine, *args))
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
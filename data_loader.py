@@ -1,7 +1,17 @@
+import threading
+import uuid
+import numpy as np
 import pandas as pd
 from sqlalchemy.engine import Engine
-from typing import List, Dict
+from typing import List, Dict, Sequence, Tuple
 import streamlit as st
+from queries import fetch
+from schema import apply_schema, PLAYER_SCHEMA, TEAM_SCHEMA, DATA_VERSION_ATTR
+from data_cache import watermark_cached, H2H_CACHE, LoadFailed
+from match_index import MatchIndex, pair_key
+from ratings import TeamRatings, fit_ratings
+from player_norms import compute_player_norms
+from derived_metrics import MetricStore, PLAYER_METRICS
 
 ROLE_PLAYERS_MAP: Dict[str, List[str]] = {
     "Mid": ['Faker', 'Chovy', 'Zeka', 'Bdd', 'Knight', 'Shanks', 'Creme', 'RooKie', 'Poby', 'Caps', 'jojopyun', 'Quad', 'Mireu', 'Quid', 'HongQ', 'Maple', 'Dire'],
@@ -25,11 +35,29 @@ TEAM_MAP = [
         'Vivo Keyd Stars', 'Team Secret Whales', 'CTBC Flying Oyster', 'PSG Talon'
 ]
 
+# The two TEAM_MAP teams playing the qualifying series; the winner takes the last Swiss slot
+WORLDS_PLAY_IN: Tuple[str, str] = ('T1', 'Invictus Gaming')
+
+# Derived metrics every player view carries; any other registered metric is added on request
+VIEW_METRICS = ('impact_score',)
+# Normalized columns (player_norms) every player view carries; any other one is added on request
+VIEW_NORMS = ('kda_role_pct', 'impact_score_role_pct')
+
+SPLIT_OPTIONS = ["ALL", "Spring", "Winter", "Summer", "Pre-Season"]
+
+TARGET_SEASON = 'S15'
+
 # @st.cache_data
-def load_team_map():
-    """Loads and caches the player-team-league mapping from player_team_map.csv."""
+def load_team_map(source=None):
+    """
+    Loads and caches the player-team-league mapping from player_team_map.csv,
+    or from the snapshot when source is an offline snapshot store.
+    """
     try:
-        df_map = pd.read_csv("player_team_names.csv")
+        if hasattr(source, 'team_map'):
+            df_map = source.team_map()
+        else:
+            df_map = pd.read_csv("player_team_names.csv")
         # Ensure the essential columns exist
         if 'name' not in df_map.columns or 'team' not in df_map.columns or 'league' not in df_map.columns:
             st.error("player_team_names.csv must contain 'name', 'team', and 'league' columns.")
@@ -43,12 +71,13 @@ def load_team_map():
         st.error(f"Error loading player_team_map.csv: {e}")
         return pd.DataFrame({'name': [], 'team': [], 'league': []})
 
+@watermark_cached('teams_staging')
 def load_team_data(engine: Engine, selected_split: str):
     """
         Fetches aggregated team stats from the 'teams_staging' table,
         filtering for teams present in the loaded player map.
 
-        This function leverages st.cache_data to only query the database once.
+        Results are cached per split until the teams_staging watermark moves.
         """
     # 1. Get the DataFrame containing player/team/league mapping
     teams = TEAM_MAP
@@ -58,144 +87,348 @@ def load_team_data(engine: Engine, selected_split: str):
 
     if not teams:
         st.error("No teams found in the player map. Cannot load team data.")
-        return pd.DataFrame()
-
-    # 3. Format the list for the SQL IN clause
-    teams_list_str = ', '.join([f"'{team}'" for team in teams])
-
-    # 4. Construct the SQL statement
-    target_season = 'S15'
-    statement = f"""
-            SELECT * FROM teams_staging
-            WHERE name IN ({teams_list_str})
-            AND season = '{target_season}'
-            AND split = '{selected_split}';
-        """
+        raise LoadFailed(pd.DataFrame())
 
-    # 5. Execute the query and load into DataFrame
+    # 3. Execute the bound-parameter query and load into DataFrame
     try:
-        team_df = pd.read_sql(statement, engine)
+        team_df = fetch(engine, 'teams_by_split', [TARGET_SEASON, selected_split, teams])
 
         # Simple cleaning and return
-        team_df = team_df.fillna(0)  # Fill NaN for numeric stats
+        team_df = apply_schema(team_df.fillna(0), TEAM_SCHEMA)  # Fill NaN for numeric stats
+        # A new token per load; the cached frame keeps it until the watermark moves
+        team_df.attrs[DATA_VERSION_ATTR] = f"teams/{selected_split}/{uuid.uuid4().hex[:12]}"
         return team_df
 
     except Exception as e:
         st.error(f"Error executing SQL query for team data: {e}")
-        return pd.DataFrame()
+        raise LoadFailed(pd.DataFrame()) from e
+
+
+@watermark_cached('teams_staging')
+def load_all_team_data(engine: Engine, selected_split: str):
+    """
+        Fetches the stats of every team in 'teams_staging' for the split, whatever its league,
+        not only the teams of the player map.
+
+        Results are cached per split until the teams_staging watermark moves.
+        """
+    try:
+        team_df = fetch(engine, 'all_teams_by_split', [TARGET_SEASON, selected_split])
+        team_df = apply_schema(team_df.fillna(0), TEAM_SCHEMA)
+        team_df.attrs[DATA_VERSION_ATTR] = f"teams_all/{selected_split}/{uuid.uuid4().hex[:12]}"
+        return team_df
+
+    except Exception as e:
+        st.error(f"Error executing SQL query for all team data: {e}")
+        raise LoadFailed(pd.DataFrame()) from e
+
+
+def _empty_player_frame() -> pd.DataFrame:
+    """Empty player frame with the columns the charts expect, used as a fallback."""
+    expected_cols = ['name', 'games', 'winrate', 'kda', 'avg_kills', 'avg_deaths', 'avg_assists', 'gpm', 'kp',
+                     'csm', 'dpm', 'gd15', 'csd15', 'xpd15', 'vspm', 'solo_kills',
+                     'impact_score', 'team_name', 'league', 'role']
+    return pd.DataFrame(columns=expected_cols)
+
+
+def _player_role_map() -> Dict[str, str]:
+    """Inverts ROLE_PLAYERS_MAP into a name -> role lookup (ignoring the 'All' bucket)."""
+    return {
+        name: role
+        for role, names in ROLE_PLAYERS_MAP.items() if role != "All"
+        for name in names
+    }
+
+
+def _prepare_player_frame(player_df: pd.DataFrame, df_team_map: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cleans raw 'players_staging' rows that were already cast to PLAYER_SCHEMA at read time
+    (numeric coercion, NaNs filled with 0): the games >= 10 filter and the player/team map
+    merge. Derived metrics such as the impact score are added by SeasonSnapshot.
+    """
+    #Filter out players with insufficient games (essential filter). Missing game counts were read as 0.
+    df_cleaned = player_df[player_df['games'] >= 10]
+
+    # Merge on the player name
+    df_cleaned = df_cleaned.merge(
+        df_team_map,
+        on='name',
+        how='left'
+    )
+
+    # Fill missing team info (for players not in your CSV map)
+    df_cleaned['team_name'] = df_cleaned['team'].fillna('Free Agent')
+    df_cleaned['league'] = df_cleaned['league'].fillna('Unknown League')
+
+    if 'team' in df_cleaned.columns:
+        df_cleaned = df_cleaned.drop(columns=['team'])
+
+    df_cleaned['role'] = df_cleaned['name'].astype(object).map(_player_role_map()).fillna('Unknown')
+
+    # Re-apply the schema for the merged columns (team_name, league, role)
+    return apply_schema(df_cleaned, PLAYER_SCHEMA).reset_index(drop=True)
+
+
+class SeasonSnapshot:
+    """
+    All prepared player rows of one season (every split), fetched with a single query.
+
+    Role/split views are served from positional indexes that are built on first use,
+    so switching the sidebar selection never goes back to the database.
+
+    Per-role and per-league percentiles and z-scores (player_norms) are computed here once
+    each, so pages never re-run those groupbys: the VIEW_NORMS columns when the snapshot is
+    built, any other one the first time a view asks for it. Views carry the VIEW_NORMS columns
+    and the ones asked for, so a default view stays a single positional take.
+    """
+
+    def __init__(self, df: pd.DataFrame, fetched: pd.DataFrame, season: str = TARGET_SEASON):
+        # Derived metrics (derived_metrics.PLAYER_METRICS) are evaluated on the whole season, once each
+        self.metrics = MetricStore(df, PLAYER_METRICS)
+        defaults = [name for name in VIEW_METRICS if name not in df.columns and self.metrics.available(name)]
+        self.df = pd.concat([df, self.metrics.evaluate(defaults)], axis=1) if defaults else df
+        view_norms = compute_player_norms(self.df, VIEW_NORMS)
+        if not view_norms.columns.empty:
+            self.df = pd.concat([self.df, view_norms], axis=1)
+        # Norm columns outside VIEW_NORMS, added as views request them
+        self.norms = pd.DataFrame(index=self.df.index)
+        self._norms_lock = threading.Lock()
+        self.season = season
+        # Identifies this load; views carry it (plus role and split) in attrs for the figure cache
+        self.version = uuid.uuid4().hex[:12]
+        # (split -> names present before the games filter), used for the missing-player warning
+        self._fetched_names: Dict[str, set] = {
+            split: set(names) for split, names in fetched.groupby('split', observed=True)['name']
+        } if not fetched.empty else {}
+        self._split_positions: Dict[str, np.ndarray] = {
+            split: positions for split, positions in df.groupby('split', observed=True).indices.items()
+        } if not df.empty else {}
+        self._positions: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def positions(self, selected_role: str, selected_split: str) -> np.ndarray:
+        """Row positions of the (role, split) view inside the snapshot frame."""
+        key = (selected_role, selected_split)
+        if key not in self._positions:
+            split_positions = self._split_positions.get(selected_split, np.empty(0, dtype=np.intp))
+            names = ROLE_PLAYERS_MAP.get(selected_role, [])
+            in_role = self.df['name'].isin(names).to_numpy()
+            self._positions[key] = split_positions[in_role[split_positions]]
+        return self._positions[key]
+
+    def extra_norms(self, names: Sequence[str]) -> List[str]:
+        """The named norm columns outside the snapshot frame that exist, computing any not computed yet."""
+        with self._norms_lock:
+            missing = [name for name in names if name not in self.norms.columns and name not in self.df.columns]
+            if missing:
+                computed = compute_player_norms(self.df, missing)
+                if not computed.columns.empty:
+                    self.norms = pd.concat([self.norms, computed], axis=1)
+            return [name for name in names if name in self.norms.columns]
+
+    def missing_players(self, selected_role: str, selected_split: str) -> List[str]:
+        """Players requested for the role that have no row at all for the split."""
+        fetched_names = self._fetched_names.get(selected_split, set())
+        return [name for name in ROLE_PLAYERS_MAP.get(selected_role, []) if name not in fetched_names]
+
+    def warn_missing_players(self, selected_role: str, selected_split: str):
+        """Shows a Streamlit warning listing requested players without any row for the split."""
+        missing_names = self.missing_players(selected_role, selected_split)
+        if missing_names:
+            st.warning(
+                f"⚠️ **Data Warning:** {len(missing_names)} player(s) were requested for '{selected_role}' but not found in the database "
+                f"for season '{self.season}' and split '{selected_split}'. "
+                f"Missing: {', '.join(missing_names[:5])}{'...' if len(missing_names) > 5 else ''}"
+            )
+
+    def nbytes(self) -> int:
+        """Deep size of the snapshot frame, the extra normalized columns and the cached positional indexes."""
+        index_bytes = sum(p.nbytes for p in self._split_positions.values()) + \
+            sum(p.nbytes for p in self._positions.values())
+        return int(self.df.memory_usage(deep=True).sum()) + int(self.norms.memory_usage(deep=True).sum()) + \
+            self.metrics.nbytes() + index_bytes
+
+    def view(self, selected_role: str, selected_split: str, warn: bool = True,
+             metrics: Sequence[str] = (), norms: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        Returns the prepared player frame for one role and split.
+
+        The result is a fresh frame (not a view on the snapshot), so callers may add columns to it.
+        Next to the raw stats it has the VIEW_NORMS columns, any '<column>_<role|league>_<pct|z>'
+        column named in norms (see player_norms), and any extra derived metrics named in metrics,
+        each computed once per snapshot.
+        Pass warn=False when calling from a worker thread and call warn_missing_players() from the script thread.
+        """
+        if not ROLE_PLAYERS_MAP.get(selected_role):
+            print(f"Error: No players found for role '{selected_role}'. Returning empty DataFrame.")
+            return _empty_player_frame()
+
+        if warn:
+            self.warn_missing_players(selected_role, selected_split)
+
+        positions = self.positions(selected_role, selected_split)
+        view_df = self.df.take(positions)
+        extra_norms = self.extra_norms(norms) if norms else []
+        extra = [name for name in metrics if name not in self.df.columns]
+        if extra_norms or extra:
+            parts = [view_df, self.norms[extra_norms].take(positions)]
+            if extra:
+                parts.append(self.metrics.evaluate(extra).take(positions))
+            view_df = pd.concat(parts, axis=1)
+        view_df = view_df.reset_index(drop=True)
+        view_df.attrs[DATA_VERSION_ATTR] = f"{self.version}/{selected_role}/{selected_split}"
+        return view_df
+
+
+def load_season_snapshot(engine: Engine) -> SeasonSnapshot:
+    """
+    Fetches every tracked player's rows for the target season across all splits in one
+    query and prepares them once.
+
+    Args:
+        engine: The SQLAlchemy Engine/Connection object for database interaction,
+            or an offline snapshot store.
+
+    Returns:
+        A SeasonSnapshot serving role/split views.
+    """
+    player_names = sorted({name for names in ROLE_PLAYERS_MAP.values() for name in names})
+
+    try:
+        # Cast to the declared dtypes as the rows are read, before anything else touches them
+        player_df = apply_schema(fetch(engine, 'players_by_season', [TARGET_SEASON, player_names]), PLAYER_SCHEMA)
+    except Exception as e:
+        print(f"Error executing SQL query: {e}")
+        # Fallback in case of DB connection or SQL execution failure
+        return SeasonSnapshot(_empty_player_frame().assign(split=[]), pd.DataFrame())
+
+    fetched = player_df[['name', 'split']].copy()
+    return SeasonSnapshot(_prepare_player_frame(player_df, load_team_map(engine)), fetched)
+
 
 def load_and_prepare_data(engine: Engine, selected_role: str, selected_split: str):
     """
     Fetches player stats from the 'players_staging' table for a specific season
     and role, then cleans and prepares the data for visualization.
 
+    Prefer load_season_snapshot() and SeasonSnapshot.view() when several
+    role/split combinations are needed; this loads a full snapshot per call.
+
     Args:
         engine: The SQLAlchemy Engine/Connection object for database interaction.
         selected_role: The role selected by the user (e.g., 'Mid', 'Jungle', 'All').
+        selected_split: The split selected by the user (e.g., 'ALL', 'Spring').
 
     Returns:
         A cleaned Pandas DataFrame ready for charting.
     """
+    return load_season_snapshot(engine).view(selected_role, selected_split)
+
+
+@watermark_cached('matches_staging')
+def load_match_data(engine):
 
-    player_names = ROLE_PLAYERS_MAP.get(selected_role, [])
+    try:
+        matches_df = fetch(engine, 'matches_by_winner', [TEAM_MAP])
+    except Exception as e:
+        print(f"Error executing SQL query: {e}")
+        raise LoadFailed(pd.DataFrame()) from e
 
-    if not player_names:
-        print(f"Error: No players found for role '{selected_role}'. Returning empty DataFrame.")
-        # Return empty DataFrame with necessary columns to prevent downstream errors
-        expected_cols = ['name', 'country', 'games', 'winrate', 'kda', 'gpm', 'kp', 'csm', 'dpm', 'gd15', 'csd15', 'vspm',
-                         'impact_score']
-        return pd.DataFrame(columns=expected_cols)
+    return matches_df
 
-    names_list_str = ', '.join([f"'{name}'" for name in player_names])
 
-    target_season = 'S15'
-    player_statement = f"""
-        SELECT * FROM players_staging
-        WHERE season = '{target_season}'
-        AND name IN ({names_list_str})  
-        AND split = '{selected_split}';
+@watermark_cached('matches_staging')
+def load_match_index(engine: Engine) -> MatchIndex:
+    """
+    Match history indexed by unordered team pair, built once per change of matches_staging.
+    Head-to-head lookups against it are a dict hit plus a slice.
     """
+    # The index keeps its own sorted copy, so the raw frame is not cached next to it
+    try:
+        return MatchIndex(load_match_data.uncached(engine))
+    except LoadFailed as failure:
+        raise LoadFailed(MatchIndex(failure.fallback)) from failure
 
+# Default number of most recent meetings returned for a team pair
+H2H_MATCH_LIMIT = 10
+
+
+@watermark_cached('matches_staging', cache=H2H_CACHE)
+def _load_pair_matches(engine: Engine, team_low: str, team_high: str, limit: int) -> pd.DataFrame:
     try:
-        player_df = pd.read_sql(player_statement, engine)
+        matches_df = fetch(engine, 'head_to_head', [team_low, team_high, limit])
     except Exception as e:
         print(f"Error executing SQL query: {e}")
-        # Fallback in case of DB connection or SQL execution failure
-        expected_cols = ['name', 'games', 'winrate', 'kda', 'avg_kills', 'avg_deaths', 'avg_assists', 'gpm', 'kp',
-                         'csm', 'dpm', 'gd15', 'csd15', 'xpd15', 'vspm', 'solo_kills',
-                         'impact_score', 'team', 'league']
-        return pd.DataFrame(columns=expected_cols)
+        raise LoadFailed(pd.DataFrame()) from e
 
-    #Check for Missing Players ---
-    fetched_names = set(player_df['name'])
-    missing_names = [name for name in player_names if name not in fetched_names]
+    return _with_match_dates(matches_df)
 
-    if missing_names:
-        st.warning(
-            f"⚠️ **Data Warning:** {len(missing_names)} player(s) were requested for '{selected_role}' but not found in the database "
-            f"for season '{target_season}' and split '{selected_split}'. "
-            f"Missing: {', '.join(missing_names[:5])}{'...' if len(missing_names) > 5 else ''}"
-        )
 
-    # --- Data Cleaning and Metric Calculation ---
-
-    # Define all numeric columns
-    numeric_cols = ['games', 'winrate', 'kda', 'avg_kills', 'avg_deaths', 'avg_assists', 'gpm', 'kp', 'csm', 'dpm',
-                    'gd15', 'csd15', 'xpd15', 'vspm', 'solo_kills']
-
-    # Convert columns to numeric, coercing errors (NaNs)
-    for col in numeric_cols:
-        player_df[col] = pd.to_numeric(player_df[col], errors='coerce')
+@watermark_cached('matches_staging', cache=H2H_CACHE)
+def _load_group_matches(engine: Engine, teams: Tuple[str, ...], limit: int) -> pd.DataFrame:
+    try:
+        matches_df = fetch(engine, 'head_to_head_group', [list(teams), limit])
+    except Exception as e:
+        print(f"Error executing SQL query: {e}")
+        raise LoadFailed(pd.DataFrame()) from e
 
-    #Filter out players with insufficient games (essential filter)
-    df_cleaned = player_df[player_df['games'] >= 10].copy()
+    return _with_match_dates(matches_df.drop(columns=['pair_rank'], errors='ignore'))
 
-    # FILL NaNs with 0 instead of dropping rows to keep all players with a sufficient game count.
-    df_cleaned = df_cleaned.copy()
-    df_cleaned[numeric_cols] = df_cleaned[numeric_cols].fillna(0)
 
-    # Metric Calculation (Impact Score)
-    # Scaling KP (0-1) by 500 makes it comparable to GPM (400-500 range)
-    df_cleaned['impact_score'] = (df_cleaned['gpm'] * 0.5) + (df_cleaned['kp'] / 100 * 0.5 * 500)
+def _with_match_dates(matches_df: pd.DataFrame) -> pd.DataFrame:
+    if 'date' in matches_df.columns:
+        matches_df['date'] = pd.to_datetime(matches_df['date'], errors='coerce').dt.date
+    return matches_df
 
-    #Load Team Map and Merge
-    df_team_map = load_team_map()
 
-    # Merge on the player name
-    df_cleaned = df_cleaned.merge(
-        df_team_map,
-        on='name',
-        how='left'
-    )
+def load_head_to_head(engine: Engine, team_a: str, team_b: str, limit: int = H2H_MATCH_LIMIT) -> pd.DataFrame:
+    """
+    Fetches only the matches played between two teams, most recent first.
 
-    # Fill missing team info (for players not in your CSV map)
-    df_cleaned['team_name'] = df_cleaned['team'].fillna('Free Agent')
-    df_cleaned['league'] = df_cleaned['league'].fillna('Unknown League')
+    The filtering, ordering and LIMIT run in the database; results are kept in a small
+    LRU keyed by the unordered pair, so flipping Team A/Team B reuses the same entry.
 
-    # Ensure consistent column naming (using 'team_name' as per other files)
-    if 'team_name' not in df_cleaned.columns:
-        df_cleaned = df_cleaned.rename(columns={'team': 'team_name'})
+    Args:
+        engine: The pooled SQLAlchemy engine.
+        team_a: The name of the first team.
+        team_b: The name of the second team.
+        limit: The number of recent matches to return.
 
-    if 'team' in df_cleaned.columns:
-        df_cleaned = df_cleaned.drop(columns=['team'])
+    Returns:
+        A DataFrame of at most `limit` matches sorted by date (descending), or an empty DataFrame.
+    """
+    team_low, team_high = pair_key(team_a, team_b)
+    return _load_pair_matches(engine, team_low, team_high, int(limit))
 
-    return df_cleaned
 
+def load_pair_index(engine: Engine, teams: Sequence[str], limit: int = H2H_MATCH_LIMIT) -> MatchIndex:
+    """
+    MatchIndex over the last `limit` meetings of every pair among teams, fetched with one query
+    (the per-pair limit is applied in the database). Results are kept in the same LRU as
+    load_head_to_head, keyed by the set of teams. Pages comparing a few teams use this
+    instead of the full load_match_index().
+    """
+    group = tuple(sorted(set(teams)))
+    if len(group) < 2:
+        return MatchIndex(pd.DataFrame())
+    return MatchIndex(_load_group_matches(engine, group, int(limit)))
 
-def load_match_data(engine):
+# Last fit per rating method; the next fit starts from it when matches_staging changes
+_last_ratings: Dict[str, TeamRatings] = {}
 
-    names_list_str = ', '.join([f"'{name}'" for name in TEAM_MAP])
 
-    statement = f"""
-        SELECT * FROM matches_staging
-        WHERE winner IN ({names_list_str})
-        OR winner IN ({names_list_str});
+@watermark_cached('matches_staging')
+def load_team_ratings(engine: Engine, method: str = 'bradley_terry') -> TeamRatings:
     """
+    Ratings of every team in matches_staging, all leagues fitted together.
 
+    Refit once per change of matches_staging, warm-started from the previous fit.
+    """
     try:
-        matches_df = pd.read_sql(statement, engine)
+        matches_df = fetch(engine, 'match_results', [])
     except Exception as e:
         print(f"Error executing SQL query: {e}")
-        return pd.DataFrame()
+        raise LoadFailed(fit_ratings(pd.DataFrame(), method)) from e
 
-    return matches_df
\ No newline at end of file
+    ratings = fit_ratings(matches_df, method, previous=_last_ratings.get(method))
+    _last_ratings[method] = ratings
+    return ratings
@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterable
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Combined budget for all the loaders a page waits on (seconds)
+DATA_LOAD_TIMEOUT = float(os.getenv('DATA_LOAD_TIMEOUT', '30'))
+DATA_LOAD_WORKERS = int(os.getenv('DATA_LOAD_WORKERS', '4'))
+
+# One pool per process; loaders only block on the network, so threads are enough
+_executor = ThreadPoolExecutor(max_workers=DATA_LOAD_WORKERS, thread_name_prefix='data-load')
+
+
+class DataLoadTimeout(Exception):
+    """Raised when the requested datasets are not ready within the combined timeout."""
+
+
+def _bind_context(ctx, loader: Callable[[], Any]) -> Callable[[], Any]:
+    """Runs loader with the calling session's script context, so st.* calls and caches work in the worker."""
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return loader()
+    return run
+
+
+class PageData:
+    """
+    Lazily resolved datasets for one script run.
+
+    Datasets listed in prefetch start loading concurrently on the shared thread pool as soon
+    as the object is created. Any other registered dataset is only loaded, in the script
+    thread, the first time it is accessed. Nothing is loaded for a page that touches no data.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]], prefetch: Iterable[str] = (),
+                 timeout: float = DATA_LOAD_TIMEOUT):
+        ctx = get_script_run_ctx()
+        self._loaders = loaders
+        self._deadline = time.monotonic() + timeout
+        self._timeout = timeout
+        self._results: Dict[str, Any] = {}
+        self._futures: Dict[str, Future] = {
+            name: _executor.submit(_bind_context(ctx, loaders[name])) for name in prefetch
+        }
+
+    def __getitem__(self, name: str) -> Any:
+        """
+        Returns the dataset, loading or waiting for it on first access.
+
+        Raises:
+            DataLoadTimeout: if a prefetched dataset is not ready before the shared deadline.
+        """
+        if name not in self._results:
+            future = self._futures.get(name)
+            if future is None:
+                self._results[name] = self._loaders[name]()
+            else:
+                try:
+                    self._results[name] = future.result(timeout=max(self._deadline - time.monotonic(), 0))
+                except FutureTimeoutError:
+                    raise DataLoadTimeout(f"Loading '{name}' did not finish within {self._timeout:.0f}s")
+        return self._results[name]
+
+    def loaded(self) -> Iterable[str]:
+        """Names of the datasets resolved so far."""
+        return list(self._results)
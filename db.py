@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import streamlit as st
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+load_dotenv()
+
+# Connection pool configuration, overridable through the environment
+POOL_SETTINGS: Dict[str, int] = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+    'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),  # seconds to wait for a free connection
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),  # seconds before a connection is replaced
+}
+
+# How long a successful liveness check is trusted before pinging again (seconds)
+HEALTH_CHECK_INTERVAL = int(os.getenv('DB_HEALTH_CHECK_INTERVAL', '60'))
+
+REQUIRED_CREDENTIALS = ['user', 'password', 'endpoint', 'port', 'dbname']
+
+
+class PoolMetrics:
+    """Thread-safe counters describing how the connection pool is being used."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.overflow_checkouts = 0
+            self.peak_checked_out = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_checkout(self, wait: float, checked_out: int, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'overflow_checkouts': self.overflow_checkouts,
+                'peak_checked_out': self.peak_checked_out,
+                'wait_total_ms': round(self.wait_total * 1000, 2),
+                'wait_avg_ms': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 2),
+            }
+
+
+POOL_METRICS = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        connection = super()._do_get()
+        POOL_METRICS.record_checkout(time.perf_counter() - start, self.checkedout(), self.overflow())
+        return connection
+
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+_last_healthy_at = 0.0
+
+
+def _credentials() -> Dict[str, str]:
+    """Reads connection credentials from Streamlit secrets, falling back to environment variables (.env)."""
+    try:
+        if all(key in st.secrets for key in REQUIRED_CREDENTIALS):
+            return {key: str(st.secrets[key]) for key in REQUIRED_CREDENTIALS}
+    except Exception:
+        # No secrets.toml available, use the environment instead
+        pass
+
+    credentials = {key: os.getenv(key) for key in REQUIRED_CREDENTIALS}
+    missing = [key for key, value in credentials.items() if not value]
+    if missing:
+        raise RuntimeError(f"Missing database credentials: {', '.join(missing)}")
+    return credentials
+
+
+def _database_url() -> str:
+    creds = _credentials()
+    return (
+        f"postgresql+psycopg2://{creds['user']}:{creds['password']}"
+        f"@{creds['endpoint']}:{creds['port']}/{creds['dbname']}"
+    )
+
+
+def _attach_pool_listeners(engine: Engine):
+    event.listen(engine, 'connect', lambda dbapi_conn, record: POOL_METRICS.record_connect())
+    event.listen(engine, 'checkin', lambda dbapi_conn, record: POOL_METRICS.record_checkin())
+    event.listen(engine, 'invalidate', lambda dbapi_conn, record, exc: POOL_METRICS.record_invalidation())
+
+
+def get_engine() -> Engine:
+    """
+    Returns the process-wide SQLAlchemy engine, creating it on first use.
+
+    The engine owns a single QueuePool shared by every Streamlit session and thread.
+    pool_pre_ping replaces connections that died while idle, so callers never need
+    to reconnect themselves.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    _database_url(),
+                    poolclass=MeteredQueuePool,
+                    pool_pre_ping=True,
+                    **POOL_SETTINGS,
+                )
+                _attach_pool_listeners(engine)
+                _engine = engine
+    return _engine
+
+
+def check_connection(engine: Engine, interval: int = HEALTH_CHECK_INTERVAL) -> bool:
+    """
+    Cheap liveness check: runs SELECT 1 on a pooled connection at most once per interval.
+    Failures are never cached, so the next call retries immediately.
+    """
+    global _last_healthy_at
+    if time.monotonic() - _last_healthy_at < interval:
+        return True
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        print(f"Database health check failed: {e}")
+        return False
+
+    _last_healthy_at = time.monotonic()
+    return True
+
+
+def pool_status(engine: Optional[Engine] = None) -> Dict[str, float]:
+    """Current pool occupancy combined with the cumulative checkout counters."""
+    status = POOL_METRICS.as_dict()
+    engine = engine or _engine
+    if engine is not None:
+        pool = engine.pool
+        status.update({
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    return status
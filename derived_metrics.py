@@ -0,0 +1,169 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+import pandas as pd
+from cachetools import LRUCache
+
+from schema import DATA_VERSION_ATTR
+
+
+@dataclass(frozen=True)
+class DerivedMetric:
+    """
+    A column computed from other columns. inputs may name raw columns or other metrics of the
+    same registry; compute receives a frame holding exactly those inputs and returns the values
+    as a vectorized expression (Series or array aligned with it).
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    compute: Callable[[pd.DataFrame], object]
+    description: str = ''
+    dtype: str = 'float32'
+
+
+# Registries by frame kind; declare new metrics with @derived_metric below
+PLAYER_METRICS: Dict[str, DerivedMetric] = {}
+TEAM_METRICS: Dict[str, DerivedMetric] = {}
+
+
+def derived_metric(registry: Dict[str, DerivedMetric], name: str, inputs: Sequence[str], description: str = '',
+                   dtype: str = 'float32'):
+    """Registers the decorated function as the vectorized expression of metric `name`."""
+    def decorator(func):
+        if name in registry:
+            raise ValueError(f"Derived metric '{name}' is already registered")
+        registry[name] = DerivedMetric(name, tuple(inputs), func, description, dtype)
+        return func
+    return decorator
+
+
+def _safe_ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    """numerator / denominator, missing where the denominator is 0."""
+    return numerator / denominator.where(denominator != 0)
+
+
+# --- Player metrics ---
+
+# Impact score: weighted sum of its inputs, each first multiplied by its scale
+IMPACT_WEIGHTS: Dict[str, float] = {'gpm': 0.5, 'kp': 0.5}
+# Scaling KP (0-1) by 500 makes it comparable to GPM (400-500 range); kp is stored as a percentage
+IMPACT_SCALES: Dict[str, float] = {'gpm': 1.0, 'kp': 500 / 100}
+
+
+@derived_metric(PLAYER_METRICS, 'impact_score', tuple(IMPACT_WEIGHTS), "Resource and teamfight score")
+def _impact_score(df: pd.DataFrame):
+    return sum(df[col] * IMPACT_SCALES[col] * weight for col, weight in IMPACT_WEIGHTS.items())
+
+
+@derived_metric(PLAYER_METRICS, 'solo_kills_per_game', ('solo_kills', 'games'), "Solo kills per game played")
+def _solo_kills_per_game(df: pd.DataFrame):
+    return _safe_ratio(df['solo_kills'].astype('float64'), df['games'])
+
+
+@derived_metric(PLAYER_METRICS, 'damage_per_gold', ('dpm', 'gpm'), "Damage dealt per gold earned")
+def _damage_per_gold(df: pd.DataFrame):
+    return _safe_ratio(df['dpm'], df['gpm'])
+
+
+# --- Team metrics ---
+
+@derived_metric(TEAM_METRICS, 'kd_ratio', ('kills_per_game', 'deaths_per_game'), "Kills per death")
+def _team_kd_ratio(df: pd.DataFrame):
+    return _safe_ratio(df['kills_per_game'], df['deaths_per_game'])
+
+
+@derived_metric(TEAM_METRICS, 'damage_per_gold', ('dpm', 'gpm'), "Damage dealt per gold earned")
+def _team_damage_per_gold(df: pd.DataFrame):
+    return _safe_ratio(df['dpm'], df['gpm'])
+
+
+class MetricStore:
+    """
+    Lazily evaluated derived metrics of one frame.
+
+    A metric is computed the first time it is requested, after its own derived inputs, and kept
+    for the life of the store. Metrics nobody asks for cost nothing. The frame is never changed in
+    place: new data is a new data version, which get_metric_store() gives a fresh store.
+    """
+
+    def __init__(self, df: pd.DataFrame, registry: Dict[str, DerivedMetric] = PLAYER_METRICS):
+        self.df = df
+        self.registry = registry
+        self._values: Dict[str, pd.Series] = {}
+        self._lock = threading.RLock()
+
+    def available(self, name: str) -> bool:
+        """Whether every input of the metric, direct or through other metrics, can be resolved."""
+        metric = self.registry.get(name)
+        if metric is None:
+            return name in self.df.columns
+        return all(self.available(source) for source in metric.inputs)
+
+    def _resolve(self, name: str, resolving: Tuple[str, ...] = ()) -> pd.Series:
+        if name in self._values:
+            return self._values[name]
+        if name in resolving:
+            raise ValueError(f"Derived metric cycle: {' -> '.join(resolving + (name,))}")
+        metric = self.registry[name]
+
+        inputs = {}
+        for source in metric.inputs:
+            if source in self.registry:
+                inputs[source] = self._resolve(source, resolving + (name,))
+            elif source in self.df.columns:
+                inputs[source] = self.df[source]
+            else:
+                raise KeyError(f"Derived metric '{name}' needs column '{source}', which the frame does not have")
+
+        values = metric.compute(pd.DataFrame(inputs, index=self.df.index))
+        self._values[name] = pd.Series(values, index=self.df.index, name=name).astype(metric.dtype)
+        return self._values[name]
+
+    def evaluate(self, names: Iterable[str]) -> pd.DataFrame:
+        """The requested metrics as columns aligned with the frame, computing only the missing ones."""
+        names = list(names)
+        with self._lock:
+            return pd.DataFrame({name: self._resolve(name) for name in names}, index=self.df.index)
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return int(sum(values.nbytes for values in self._values.values()))
+
+
+_stores: LRUCache = LRUCache(maxsize=64)
+_stores_lock = threading.Lock()
+
+
+def get_metric_store(df: pd.DataFrame, registry: Dict[str, DerivedMetric] = PLAYER_METRICS) -> MetricStore:
+    """
+    Metric store of df, kept per data version, so a metric is computed once per load of the data
+    and recomputed after a reload. Frames without a version token get a fresh store on every call.
+    """
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        return MetricStore(df, registry)
+
+    key = (version, id(registry))
+    with _stores_lock:
+        store = _stores.get(key)
+    if store is None:
+        store = MetricStore(df, registry)
+        with _stores_lock:
+            _stores[key] = store
+    return store
+
+
+def with_metrics(df: pd.DataFrame, names: Sequence[str],
+                 registry: Dict[str, DerivedMetric] = PLAYER_METRICS) -> pd.DataFrame:
+    """
+    df with the requested derived metrics added as columns (keeping its attrs). Metrics the frame
+    already has, or whose inputs it lacks (e.g. an empty fallback frame), are left out.
+    """
+    store = get_metric_store(df, registry)
+    wanted = [name for name in names if name in registry and name not in df.columns and store.available(name)]
+    if not wanted:
+        return df
+    result = pd.concat([df, store.evaluate(wanted)], axis=1)
+    result.attrs = dict(df.attrs)
+    return result
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.express as px
+from graphs.figures import cached_figure
+from confidence import with_intervals, interval_columns, CI_LEVEL
 
 REGION_MAP = {
     "Custom Selection": None, # Default option to enable manual multiselect
@@ -19,20 +20,30 @@ REGION_OPTIONS = list(REGION_MAP.keys())
 
 def plot_single_bubble_chart(df: pd.DataFrame, x: str, y: str, size: str, title: str, xlabel: str, ylabel: str):
     """Helper function to plot a single bubble chart."""
-    fig, ax = plt.subplots(figsize=(10, 6))
     fig = px.scatter(
-        df, x=x, y=y, color='name', size=size, hover_data=y,
+        df, x=x, y=y, color='name', size=size, hover_data=y, title=title,
     )
-    ax.set_title(title, fontsize=16)
-    ax.set_xlabel(xlabel)
-    ax.set_ylabel(ylabel)
-    plt.tight_layout()
+    fig.update_layout(xaxis_title=xlabel, yaxis_title=ylabel)
     st.plotly_chart(fig)
 
 
+def _with_error_bars(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Adds '<column>_err_plus' and '<column>_err_minus', the distances from the value to its interval bounds."""
+    bars = {}
+    for column in columns:
+        low, high = interval_columns(column)
+        bars[f'{column}_err_plus'] = (df[high] - df[column]).clip(lower=0)
+        bars[f'{column}_err_minus'] = (df[column] - df[low]).clip(lower=0)
+    return df.assign(**bars)
+
+
+@st.fragment
 def show_bubble_charts(df: pd.DataFrame, selected_role: str):
 
-    """Displays three bubble charts: Winrate vs KDA, Winrate vs Games, KDA vs Games."""
+    """
+    Displays three bubble charts: Winrate vs KDA, Winrate vs Games, KDA vs Games.
+    The grouping controls drive all three, so they rerun together as one fragment.
+    """
 
     if selected_role.upper() == 'ALL':
         color_variable = 'team_name'
@@ -106,71 +117,106 @@ def show_bubble_charts(df: pd.DataFrame, selected_role: str):
 
     n_groups = df_filtered[color_variable].nunique()
 
+    # Few games make for wide intervals; the bounds are computed once per data version
+    show_ci = st.checkbox(f"Show {CI_LEVEL:.0%} confidence intervals (error bars)", key='bubble_show_ci')
+    if show_ci:
+        df_filtered = _with_error_bars(with_intervals(df).loc[df_filtered.index], ['kda', 'winrate'])
+
     st.subheader(f"KDA vs. Winrate & Games Played (Grouped by {title_group})")
     # --- 1. KDA vs Winrate Bubble Chart ---
     col1, col2 = st.columns(2)
 
-    fig1 = px.scatter(
-        df_filtered,
-        x='kda',
-        y='winrate',
-        size='games',
-        color=color_variable,  # Dynamically colored by Team or League
-        hover_name='name',
-        hover_data=['team_name'],# Show player name on hover
-        size_max=45,  # Max size for bubbles
-        opacity=0.8,
-        title=f'KDA vs. Winrate (N={n_groups} {title_group}s), Size = Games Played'
-    )
+    # Figures are reused across reruns while the data and the selected groups are unchanged
+    filters = dict(color=color_variable, players=df_filtered['name'].tolist(), ci=show_ci)
+
+    def error_bars(axis: str, column: str) -> dict:
+        if not show_ci:
+            return {}
+        return {f'error_{axis}': f'{column}_err_plus', f'error_{axis}_minus': f'{column}_err_minus'}
+
+    def build_kda_winrate():
+        fig1 = px.scatter(
+            df_filtered,
+            x='kda',
+            y='winrate',
+            size='games',
+            color=color_variable,  # Dynamically colored by Team or League
+            hover_name='name',
+            hover_data=['team_name'],# Show player name on hover
+            size_max=45,  # Max size for bubbles
+            opacity=0.8,
+            title=f'KDA vs. Winrate (N={n_groups} {title_group}s), Size = Games Played',
+            **error_bars('x', 'kda'),
+            **error_bars('y', 'winrate'),
+        )
 
-    # Update layout for clearer axis labels
-    fig1.update_layout(
-        xaxis_title='KDA (Kills + Assists) / Deaths',
-        yaxis_title='Winrate (%)',
-        legend_title=legend_title,
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
+        # Update layout for clearer axis labels
+        fig1.update_layout(
+            xaxis_title='KDA (Kills + Assists) / Deaths',
+            yaxis_title='Winrate (%)',
+            legend_title=legend_title,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        return fig1
+
+    fig1 = cached_figure('bubble_kda_winrate', df, build_kda_winrate, **filters)
     st.plotly_chart(fig1, use_container_width=True)
 
     # --- 2. Winrate vs Games Played Bubble Chart ---
-    fig2 = px.scatter(
-        df_filtered,
-        x='games',
-        y='winrate',
-        size='kda',
-        color=color_variable,  # Dynamically colored by Team or League
-        hover_name='name',
-        size_max=45,
-        opacity=0.8,
-        title=f'Winrate vs. Games Played (Color = {legend_title}, Size = KDA)'
-    )
+    def build_winrate_games():
+        fig2 = px.scatter(
+            df_filtered,
+            x='games',
+            y='winrate',
+            size='kda',
+            color=color_variable,  # Dynamically colored by Team or League
+            hover_name='name',
+            size_max=45,
+            opacity=0.8,
+            title=f'Winrate vs. Games Played (Color = {legend_title}, Size = KDA)',
+            **error_bars('y', 'winrate'),
+        )
 
-    fig2.update_layout(
-        xaxis_title='Games Played',
-        yaxis_title='Winrate (%)',
-        legend_title=legend_title,
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
+        fig2.update_layout(
+            xaxis_title='Games Played',
+            yaxis_title='Winrate (%)',
+            legend_title=legend_title,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        return fig2
 
+    fig2 = cached_figure('bubble_winrate_games', df, build_winrate_games, **filters)
     st.plotly_chart(fig2, use_container_width=True)
 
     # --- 3. KDA vs Games Played Bubble Chart ---
     st.subheader(f"KDA vs. Games Played (Grouped by {title_group}, Bubble Size = Winrate)")
-    fig3 = px.scatter(
-        df_filtered,
-        x='games',
-        y='kda',
-        size='winrate',
-        color=color_variable,  # Dynamically colored by Team or League
-        hover_name='name',
-        size_max=45,
-        opacity=0.8,
-        title='KDA vs. Games Played'
-    )
 
-    fig3.update_layout(
-        xaxis_title='Games Played',
-        yaxis_title='KDA',
-        legend_title=legend_title
-    )
+    def build_kda_games():
+        fig3 = px.scatter(
+            df_filtered,
+            x='games',
+            y='kda',
+            size='winrate',
+            color=color_variable,  # Dynamically colored by Team or League
+            hover_name='name',
+            size_max=45,
+            opacity=0.8,
+            title='KDA vs. Games Played',
+            **error_bars('y', 'kda'),
+        )
+
+        fig3.update_layout(
+            xaxis_title='Games Played',
+            yaxis_title='KDA',
+            legend_title=legend_title
+        )
+        return fig3
+
+    fig3 = cached_figure('bubble_kda_games', df, build_kda_games, **filters)
     st.plotly_chart(fig3, use_container_width=True)
+
+
+def render_page(ctx):
+    """Win/KDA & Games Analysis page."""
+    st.header("Winrate, KDA, and Games Played")
+    show_bubble_charts(ctx.data['players'], ctx.selected_role)
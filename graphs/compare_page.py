@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 from team_overview import WORLDS_TEAMS_DATA
-from typing import Dict, Any, List
+from data_loader import H2H_MATCH_LIMIT, load_pair_index
+from match_index import MatchIndex
+from tournament_sim import series_win_probability
+from derived_metrics import with_metrics, TEAM_METRICS
 
 all_teams = [
     "100 Thieves", "Anyone s Legend", "Bilibili Gaming", "CTBC Flying Oyster",
@@ -12,110 +15,108 @@ all_teams = [
 
 def get_last_n_head_to_head(df_matches: pd.DataFrame, team1: str, team2: str):
     """
-    Retrieves the last N head-to-head matches played between two specified teams.
+    Retrieves the head-to-head matches played between two specified teams.
 
     Args:
         df_matches: DataFrame containing the match history data.
                     Expected columns include 'team1', 'team2', 'date', 'winner', 'loser'.
         team1: The name of the first team.
         team2: The name of the second team.
-        n: The number of recent matches to return (default is 5).
 
     Returns:
-        A DataFrame containing the last N head-to-head matches, sorted by date
+        A DataFrame containing the head-to-head matches, sorted by date
         (most recent first), or an empty DataFrame if no matches are found.
+
+    This indexes df_matches on every call; pages should look pairs up through
+    data_loader.load_pair_index() instead.
+    """
+    return MatchIndex(df_matches).head_to_head(team1, team2)
+
+def add_score_line(h2h_data: pd.DataFrame, team_a: str, team_b: str) -> pd.DataFrame:
+    """Adds the 'H2H Score' line of every match from Team A's side (see MatchIndex.head_to_head)."""
+    return h2h_data.assign(**{'H2H Score': (
+        f"{team_a} " + h2h_data['score_a'].astype(str) + " - " + h2h_data['score_b'].astype(str) + f" {team_b}"
+    )})
+
+
+TEAM_STAT_COLUMNS = {
+    'kills_per_game': 'Kills',
+    'deaths_per_game': 'Deaths',
+    'kd_ratio': 'Kill/Death Ratio',
+    'fb_pct': 'First Blood %',
+    'ft_pct': 'First Turret %',
+    'gd_at15':'Gold Diff at 15',
+    'td_at15': 'Tower Diff at 15',
+    'fos_pct': 'Feats of Strength %',
+    'dpm': 'Damage Per Minute',
+    'gpm': 'Gold Per Minute',
+    'cspm': 'CS Per Minute',
+    'gdm': 'Gold Diff/Min',
+    'damage_per_gold': 'Damage per Gold',
+    'baron_per_game': 'Barons/Game',
+    'drags_per_game': 'Dragons/Game',
+    'plates_per_game': 'Plates/Game',
+    'vg_per_game': 'Void Grubs/Game',
+}
+
+
+def show_rating_prediction(ratings, team_a: str, team_b: str):
+    """Game and Bo5 win probabilities of the pair from the rating model, which also covers teams that never met."""
+    p_game = ratings.win_probability(team_a, team_b)
+    if p_game is None:
+        return
+    p_series = float(series_win_probability(p_game, 5))
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(label=f"{team_a} Game Win Chance (Model)", value=f"{p_game:.0%}")
+    with col2:
+        st.metric(label=f"{team_a} Bo5 Win Chance (Model)", value=f"{p_series:.0%}")
+    st.caption(f"Bradley-Terry ratings fitted on {ratings.matches:,} matches across all leagues.")
+
+
+def show_team_stats(df: pd.DataFrame, *teams: str) -> pd.DataFrame:
     """
-    if df_matches.empty:
-        return pd.DataFrame()
+    Side-by-side stat table of the given teams, one row per metric and one float column per team.
 
-    # Ensure date is in datetime format for correct sorting
-    if 'date' in df_matches.columns:
-        df_matches['date'] = pd.to_datetime(df_matches['date'], errors='coerce')
-        df_matches['date'] = df_matches['date'].dt.date
-    else:
-        # Cannot sort if 'date' column is missing
-        return pd.DataFrame()
-
-    # Filter for matches where team1 and team2 participated against each other
-    # Condition 1: (team1 vs team2)
-    condition1 = (df_matches['team1'] == team1) & (df_matches['team2'] == team2)
-    # Condition 2: (team2 vs team1)
-    condition2 = (df_matches['team1'] == team2) & (df_matches['team2'] == team1)
-
-    # Combine conditions to get all head-to-head matches
-    df_h2h = df_matches[condition1 | condition2].copy()
-
-    if df_h2h.empty:
-        return pd.DataFrame()
-
-    # Sort by date in descending order (most recent first)
-    df_h2h_sorted = df_h2h.sort_values(by='date', ascending=False)
-
-    # Return the last N matches
-    return df_h2h_sorted
-
-def show_team_stats(df: pd.DataFrame, team_a:str, team_b:str):
-
-    cols = {
-        'kills_per_game': 'Kills',
-        'deaths_per_game': 'Deaths',
-        'fb_pct': 'First Blood %',
-        'ft_pct': 'First Turret %',
-        'gd_at15':'Gold Diff at 15',
-        'td_at15': 'Tower Diff at 15',
-        'fos_pct': 'Feats of Strength %',
-        'dpm': 'Damage Per Minute',
-        'gpm': 'Gold Per Minute',
-        'cspm': 'CS Per Minute',
-        'gdm': 'Gold Diff/Min',
-        'baron_per_game': 'Barons/Game',
-        'drags_per_game': 'Dragons/Game',
-        'plates_per_game': 'Plates/Game',
-        'vg_per_game': 'Void Grubs/Game',
-    }
-
-    df_a_row = df[df['name'] == team_a]
-    df_b_row = df[df['name'] == team_b]
-
-    combined_data: List[Dict[str, Any]] = []
-
-    # 2. Iterate through metrics, extract raw value, and combine
-    for df_col, display_name in cols.items():
-        # Team A processing
-        value_a = df_a_row[df_col].values
-
-        # Team B processing
-        value_b = df_b_row[df_col].values
-
-        # Build the combined dictionary with dynamic team names as keys
-        combined_data.append({
-            f"{team_a}": value_a,  # Column Name is Team A's name
-            'Metric': display_name,
-            f"{team_b}": value_b  # Column Name is Team B's name
-        })
-
-    # 3. Create the final combined DataFrame
-    df_stats_combined = pd.DataFrame(combined_data)
-
-    # 4. Ensure column order is exactly as requested: Team A Value, Metric, Team B Value
-    df_stats_combined = df_stats_combined[[team_a, 'Metric', team_b]]
+    For two teams the columns are Team A, Metric, Team B; for any other number the Metric
+    column comes first. Teams without a row in df get empty cells.
+    """
+    stats = df.drop_duplicates('name').set_index('name').reindex(list(teams))
+    metrics = [col for col in TEAM_STAT_COLUMNS if col in stats.columns]
+
+    # One transpose instead of a loop over the metrics
+    df_stats_combined = stats[metrics].astype('float64').round(2).T
+    df_stats_combined.index = [TEAM_STAT_COLUMNS[col] for col in metrics]
+    df_stats_combined = df_stats_combined.rename_axis('Metric').reset_index().rename_axis(columns=None)
 
+    if len(teams) == 2:
+        return df_stats_combined[[teams[0], 'Metric', teams[1]]]
     return df_stats_combined
 
 
-def compare_page(df_matches: pd.DataFrame, df_teams: pd.DataFrame):
+@st.fragment
+def compare_page(df_teams: pd.DataFrame, engine, ratings):
+    """
+    Team picker, head-to-head history and stat table; picking teams reruns only this fragment.
+    Only the meetings of the selected pairs are read from the database (data_loader.load_pair_index).
+    """
 
     all_teams.sort()
 
-    col_t1, col_t2 = st.columns(2)
+    col_t1, col_t2, col_n = st.columns([2, 2, 1])
     with col_t1:
         team_a = st.selectbox("Select Team A:", all_teams, index=0)
     with col_t2:
         team_b = st.selectbox("Select Team B:", all_teams, index=1)
+    with col_n:
+        n_matches = st.number_input("Last N matches:", min_value=1, max_value=50, value=H2H_MATCH_LIMIT)
+    extra_teams = st.multiselect("Also compare with:", [team for team in all_teams if team not in (team_a, team_b)])
 
     if team_a and team_b and team_a != team_b:
-        # Get last 5 matches
-        h2h_data = get_last_n_head_to_head(df_matches, team_a, team_b)
+        # The last N meetings of the pair, fetched on demand, and their record
+        pair_index = load_pair_index(engine, [team_a, team_b], n_matches)
+        h2h_data = pair_index.head_to_head(team_a, team_b)
+        record = pair_index.record(team_a, team_b)
         team_stats = show_team_stats(df_teams, team_a, team_b)
 
         image_team_a = "https://placehold.co/50x50/cccccc/000000?text=LOGO"
@@ -130,43 +131,14 @@ def compare_page(df_matches: pd.DataFrame, df_teams: pd.DataFrame):
                     image_team_b = team["logo"]
 
         if not h2h_data.empty:
-            # Prepare a display table with only the most relevant columns
-            ind_game_wins_a = 0
-            ind_game_wins_b = 0
-            scores = []
-            # Iterate through the matches to aggregate individual game scores
-            for _, row in h2h_data.iterrows():
-                # Case 1: Team A is team1 in the match
-                if row['team1'] == team_a:
-                    ind_game_wins_a += row['team1_score']
-                    ind_game_wins_b += row['team2_score']
-                # Case 2: Team A is team2 in the match (the only other possibility)
-                elif row['team2'] == team_a:
-                    ind_game_wins_a += row['team2_score']
-                    ind_game_wins_b += row['team1_score']
-
-                if row['team1'] == team_a:
-                    score_a = row['team1_score']
-                    score_b = row['team2_score']
-                else:  # Assumes row['team2'] == team_a
-                    score_a = row['team2_score']
-                    score_b = row['team1_score']
-
-                score  = f"{team_a} {score_a} - {score_b} {team_b}"
-                scores.append(score)
-
-            h2h_data['H2H Score'] = scores
-
-            # Simple H2H record summary
-            wins_a = (h2h_data['winner'] == team_a).sum()
-            wins_b = (h2h_data['winner'] == team_b).sum()
+            h2h_data = add_score_line(h2h_data, team_a, team_b)
 
             st.markdown(f"**Head-to-Head Record (Last {len(h2h_data)} Games):**")
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.image(image_team_a, width=100)
                 st.subheader(team_a)
-                st.metric(label='Series (Games)', value=f"{wins_a}({ind_game_wins_a})")
+                st.metric(label='Series (Games)', value=f"{record.series_wins_a}({record.game_wins_a})")
             with col2:
                 st.markdown("",unsafe_allow_html=True)
                 st.markdown("<h2 style='text-align: center;'>WINS</h2>", unsafe_allow_html=True)
@@ -174,7 +146,7 @@ def compare_page(df_matches: pd.DataFrame, df_teams: pd.DataFrame):
             with col3:
                 st.image(image_team_b, width=100)
                 st.subheader(team_b)
-                st.metric(label='Series (Games)', value=f"{wins_b}({ind_game_wins_b})")
+                st.metric(label='Series (Games)', value=f"{record.series_wins_b}({record.game_wins_b})")
 
             st.table(team_stats)
             display_cols = ['date', 'tournament_name', 'H2H Score', 'match_type']
@@ -186,7 +158,29 @@ def compare_page(df_matches: pd.DataFrame, df_teams: pd.DataFrame):
         else:
             st.info(f"No match history found between {team_a} and {team_b} in the current dataset.")
 
+        show_rating_prediction(ratings, team_a, team_b)
+
+        if extra_teams:
+            group = [team_a, team_b] + extra_teams
+            st.markdown(f"**Record Within the Group (Last {n_matches} Meetings per Pair):**")
+            group_record = load_pair_index(engine, group, n_matches).group_record(group).rename(columns={
+                'team': 'Team',
+                'series_wins': 'Series Won',
+                'series_losses': 'Series Lost',
+                'game_wins': 'Games Won',
+                'game_losses': 'Games Lost',
+            })
+            st.dataframe(group_record, hide_index=True)
+            st.table(show_team_stats(df_teams, *group))
+
     elif team_a == team_b:
         st.warning("Please select two different teams to compare.")
     else:
-        st.info("Please select two teams for comparison.")
\ No newline at end of file
+        st.info("Please select two teams for comparison.")
+
+
+def render_page(ctx):
+    """Team Comparison page."""
+    # Derived team metrics in the stat table, computed once per load of the team data
+    compare_page(with_metrics(ctx.data['teams'], list(TEAM_STAT_COLUMNS), TEAM_METRICS), ctx.engine,
+                 ctx.data['ratings'])
@@ -1,13 +1,16 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from graphs.figures import cached_figure
 
+@st.fragment
 def show_early_game_chart(df: pd.DataFrame, selected_role: str):
     """
     Renders GD15 vs. CSD15 chart.
 
     Colors the chart by team if 'ALL' roles are selected, or by league
     if a specific role is selected, to visually confirm farming vs. team-play leads.
+    Runs as a fragment, so changing the group filter only reruns this chart.
     """
     st.subheader("Early Game Lead Comparison (GD15 vs. CSD15)")
 
@@ -33,37 +36,51 @@ def show_early_game_chart(df: pd.DataFrame, selected_role: str):
         st.warning(f"No data available for the selected {grouping_title}(s).")
         return
 
-    fig = px.scatter(
-        df_filtered,
-        x='csd15',
-        y='gd15',
-        size='games',
-        color=color_variable,  # Dynamic coloring
-        hover_name='name',
-        hover_data=['team_name', 'league', 'games'],
-        title=f'Gold Difference (GD15) vs. CS Difference (CSD15) Colored by {grouping_title}'
-    )
+    def build():
+        fig = px.scatter(
+            df_filtered,
+            x='csd15',
+            y='gd15',
+            size='games',
+            color=color_variable,  # Dynamic coloring
+            hover_name='name',
+            hover_data=['team_name', 'league', 'games'],
+            title=f'Gold Difference (GD15) vs. CS Difference (CSD15) Colored by {grouping_title}'
+        )
 
-    fig.add_vline(x=0, line_width=1, line_dash="dash", line_color="gray",
-                  annotation_text="CS Neutral", annotation_position="bottom left")
+        fig.add_vline(x=0, line_width=1, line_dash="dash", line_color="gray",
+                      annotation_text="CS Neutral", annotation_position="bottom left")
 
-    fig.add_hline(y=0, line_width=1, line_dash="dash", line_color="gray",
-                  annotation_text="Gold Neutral", annotation_position="top left")
+        fig.add_hline(y=0, line_width=1, line_dash="dash", line_color="gray",
+                      annotation_text="Gold Neutral", annotation_position="top left")
 
-    fig.add_annotation(
-        x=df_filtered['csd15'].max() * 0.9, y=df_filtered['gd15'].min() * 0.9,
-        text="High CSD, Low GD (Farming Lead Lost)", showarrow=False, bgcolor="rgba(255, 0, 0, 0.2)"
-    )
-    fig.add_annotation(
-        x=df_filtered['csd15'].max() * 0.9, y=df_filtered['gd15'].max() * 0.9,
-        text="Dominant Leads (Farming & Kills)", showarrow=False, bgcolor="rgba(0, 255, 0, 0.2)"
-    )
+        fig.add_annotation(
+            x=df_filtered['csd15'].max() * 0.9, y=df_filtered['gd15'].min() * 0.9,
+            text="High CSD, Low GD (Farming Lead Lost)", showarrow=False, bgcolor="rgba(255, 0, 0, 0.2)"
+        )
+        fig.add_annotation(
+            x=df_filtered['csd15'].max() * 0.9, y=df_filtered['gd15'].max() * 0.9,
+            text="Dominant Leads (Farming & Kills)", showarrow=False, bgcolor="rgba(0, 255, 0, 0.2)"
+        )
 
-    fig.update_layout(
-        xaxis_title="CS Difference at 15 Minutes (CSD15)",
-        yaxis_title="Gold Difference at 15 Minutes (GD15)",
-        legend_title=grouping_title,
-        height=600
-    )
+        fig.update_layout(
+            xaxis_title="CS Difference at 15 Minutes (CSD15)",
+            yaxis_title="Gold Difference at 15 Minutes (GD15)",
+            legend_title=grouping_title,
+            height=600
+        )
+        return fig
+
+    # Reused across reruns while the data and the selection are unchanged
+    fig = cached_figure('early_game', df, build, color=color_variable, groups=selected_groups)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_page(ctx):
+    """Early Game & Vision Control page."""
+    st.header("Early Game Advantage & Vision Control")
+
+    show_early_game_chart(ctx.data['players'], ctx.selected_role)  # GD15 vs CSD15
 
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    st.subheader("Vision Score per Minute (VSPM)")
+    st.warning("Future Chart: VSPM vs KP (Vision Control)")
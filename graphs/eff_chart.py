@@ -1,14 +1,17 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.express as px
+from graphs.figures import cached_figure
+from graphs.impact_chart import show_impact_chart
 
+@st.fragment
 def show_efficiency_chart(df: pd.DataFrame, selected_role: str):
     """
     Renders DPM vs. CSM chart, highlighting efficiency and damage output.
 
     Colors the chart by team if 'ALL' roles are selected, or by league
-    if a specific role is selected.
+    if a specific role is selected. The filter reruns this fragment only,
+    not the impact chart below it.
     """
     st.subheader("Farming Efficiency (CSM) vs. Damage Output (DPM)")
 
@@ -34,22 +37,35 @@ def show_efficiency_chart(df: pd.DataFrame, selected_role: str):
         st.warning(f"No data available for the selected {grouping_title}(s).")
         return
 
-    fig = px.scatter(
-        df_filtered,
-        x='dpm',
-        y='csm',
-        size='games',
-        color=color_variable,  # Dynamic coloring
-        hover_name='name',
-        hover_data=['team_name', 'league', 'csm', 'dpm', 'kp'],
-        title=f'Damage Per Minute (DPM) vs. CS Per Minute (CSM) Colored by {grouping_title}'
-    )
+    def build():
+        fig = px.scatter(
+            df_filtered,
+            x='dpm',
+            y='csm',
+            size='games',
+            color=color_variable,  # Dynamic coloring
+            hover_name='name',
+            hover_data=['team_name', 'league', 'csm', 'dpm', 'kp'],
+            title=f'Damage Per Minute (DPM) vs. CS Per Minute (CSM) Colored by {grouping_title}'
+        )
 
-    fig.update_layout(
-        xaxis_title="Damage Per Minute (DPM)",
-        yaxis_title="CS Per Minute (CSM)",
-        legend_title=grouping_title,
-        height=600
-    )
+        fig.update_layout(
+            xaxis_title="Damage Per Minute (DPM)",
+            yaxis_title="CS Per Minute (CSM)",
+            legend_title=grouping_title,
+            height=600
+        )
+        return fig
 
+    # Reused across reruns while the data and the selection are unchanged
+    fig = cached_figure('efficiency', df, build, color=color_variable, groups=selected_groups)
     st.plotly_chart(fig, use_container_width=True)
+
+
+def render_page(ctx):
+    """Economic & Efficiency Charts page."""
+    st.header("Economic & Damage Efficiency")
+
+    show_efficiency_chart(ctx.data['players'], ctx.selected_role)  # CSM vs DPM
+
+    show_impact_chart(ctx.data['players'], ctx.selected_role)  # GPM vs KP
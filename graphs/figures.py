@@ -0,0 +1,137 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+
+import pandas as pd
+
+from schema import DATA_VERSION_ATTR
+
+# Upper bound on the serialized size of the cached figures (bytes)
+FIGURE_CACHE_MAX_BYTES = int(os.getenv('FIGURE_CACHE_MAX_BYTES', str(32 * 2 ** 20)))
+
+
+def live_figure_count() -> int:
+    """Number of open matplotlib figures in this process (0 if matplotlib was never imported)."""
+    plt = sys.modules.get('matplotlib.pyplot')
+    return len(plt.get_fignums()) if plt is not None else 0
+
+
+@contextmanager
+def closing_figures():
+    """
+    Closes every matplotlib figure opened inside the block, even if rendering fails.
+
+    pyplot keeps a global reference to each figure until it is closed, so a figure that is
+    created during a rerun and not closed lives for the lifetime of the server. The charts
+    render with Plotly, but page renderers run inside this guard so a stray plt.subplots()
+    can never accumulate. matplotlib is not imported here if nothing else imported it.
+    """
+    plt = sys.modules.get('matplotlib.pyplot')
+    before = set(plt.get_fignums()) if plt is not None else set()
+    try:
+        yield
+    finally:
+        plt = sys.modules.get('matplotlib.pyplot')
+        if plt is not None:
+            for num in set(plt.get_fignums()) - before:
+                plt.close(num)
+
+
+class FigureCache:
+    """
+    LRU of serialized Plotly figures, bounded by the total size of their JSON.
+
+    Keys are built from a frame's data version token (see schema.DATA_VERSION_ATTR) and the
+    normalized filter selections, so a lookup never hashes the DataFrame. Figures are stored as
+    JSON rather than as objects: every hit returns a fresh figure, and callers may keep
+    modifying it without touching the cached copy.
+    """
+
+    def __init__(self, max_bytes: int = FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Returns the cached figure for key, or builds, stores and returns it. A None result is not cached."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if payload is not None:
+            import plotly.io as pio
+            return pio.from_json(payload)
+
+        fig = build()
+        if fig is None:
+            return None
+
+        payload = fig.to_json()
+        if len(payload) > self.max_bytes:
+            return fig
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = payload
+                self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return fig
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def _normalize(value: Any) -> Hashable:
+    """Filter selections as an order-independent, hashable value."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(str(item) for item in value))
+    return value
+
+
+def cached_figure(name: str, df: pd.DataFrame, build: Callable[[], Any], **filters) -> Any:
+    """
+    Builds a chart through FIGURE_CACHE.
+
+    Args:
+        name: Identifies the chart; two charts built from the same frame need different names.
+        df: The frame the chart is built from; its data version token is part of the key.
+        build: Returns the figure (or None), called on a miss.
+        **filters: Every selection the figure depends on. Lists are compared as sets.
+
+    Frames without a version token (e.g. the empty fallback frames) are never cached.
+    """
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        return build()
+    key = (name, version) + tuple((k, _normalize(v)) for k, v in sorted(filters.items()))
+    return FIGURE_CACHE.get_or_build(key, build)
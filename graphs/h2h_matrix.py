@@ -0,0 +1,98 @@
+import numpy as np
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from data_loader import TEAM_MAP, H2H_MATCH_LIMIT
+from graphs.compare_page import add_score_line
+
+MATRIX_VIEWS = {
+    "Series won": 'series',
+    "Games won": 'games',
+}
+
+
+def _records_text(wins: pd.DataFrame) -> np.ndarray:
+    """'W-L' label for every cell; empty where the pair never met."""
+    losses = wins.T.to_numpy()
+    labels = wins.astype(str).to_numpy().astype(object) + "-" + losses.astype(str)
+    labels[(wins.to_numpy() + losses) == 0] = ""
+    return labels
+
+
+def show_pair_details(match_index, team_a: str, team_b: str, limit):
+    """Record and meetings of one pair of the matrix."""
+    record = match_index.record(team_a, team_b, limit)
+    if not record.matches:
+        st.info(f"No match history found between {team_a} and {team_b} in the current dataset.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(label=f"{team_a} Series (Games)", value=f"{record.series_wins_a}({record.game_wins_a})")
+    with col2:
+        st.metric(label=f"{team_b} Series (Games)", value=f"{record.series_wins_b}({record.game_wins_b})")
+
+    h2h_data = match_index.head_to_head(team_a, team_b, limit)
+    h2h_data = add_score_line(h2h_data, team_a, team_b)
+    st.table(h2h_data[['date', 'tournament_name', 'H2H Score', 'match_type']].rename(columns={
+        'tournament_name': 'Tournament',
+        'match_type': 'Type'
+    }))
+
+
+@st.fragment
+def show_head_to_head_matrix(match_index):
+    """
+    Heatmap of every Worlds team's record against every other, with drill-down into one pair.
+    Cell colour is the share of the pair's series won by the row team; the label is its W-L.
+    """
+    teams = sorted(TEAM_MAP)
+
+    col_view, col_n = st.columns([3, 1])
+    with col_view:
+        view = st.radio("Count:", list(MATRIX_VIEWS.keys()), horizontal=True)
+    with col_n:
+        n_matches = st.number_input("Last N meetings per pair (0 = all):", min_value=0, max_value=50,
+                                    value=H2H_MATCH_LIMIT)
+    limit = n_matches or None
+
+    matrix = match_index.matrix(teams, limit)
+    wins = matrix.series_wins if MATRIX_VIEWS[view] == 'series' else matrix.game_wins
+    played = wins + wins.T
+    share = wins.div(played.where(played > 0))
+
+    fig = px.imshow(
+        share,
+        color_continuous_scale='RdBu',
+        zmin=0,
+        zmax=1,
+        aspect='auto',
+        labels={'x': 'Opponent', 'y': 'Team', 'color': 'Win share'},
+        title=f"{view} by Row Team Against Column Team",
+    )
+    fig.update_traces(text=_records_text(wins), texttemplate="%{text}")
+    fig.update_layout(height=700, xaxis={'side': 'top'})
+    st.plotly_chart(fig, use_container_width=True)
+
+    # --- Drill-down into one pair ---
+    st.subheader("Pair Details")
+    col_a, col_b = st.columns(2)
+    with col_a:
+        team_a = st.selectbox("Team:", teams, index=0, key='matrix_team_a')
+    with col_b:
+        team_b = st.selectbox("Opponent:", teams, index=1, key='matrix_team_b')
+
+    if team_a == team_b:
+        st.warning("Please select two different teams to compare.")
+        return
+    show_pair_details(match_index, team_a, team_b, limit)
+
+
+def render_page(ctx):
+    """Head-to-Head Matrix page."""
+    st.header("Head-to-Head Matrix")
+    match_index = ctx.data['matches']
+    if match_index.empty:
+        st.warning("No match history was loaded from 'matches_staging'.")
+        return
+    show_head_to_head_matrix(match_index)
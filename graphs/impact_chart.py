@@ -1,12 +1,21 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.express as px
+from graphs.figures import cached_figure
+from graphs.impact_weights import impact_weight_controls
+from leaderboard import get_impact_scorer, top_positions
 
+@st.fragment
 def show_impact_chart(df: pd.DataFrame, selected_role: str):
-    """GPM vs. Kill Participation, sized by Impact Score."""
+    """
+    GPM vs. Kill Participation, sized by Impact Score under the what-if weights.
+    Filtering or moving a weight slider reruns just this fragment.
+    """
 
     st.subheader("GPM vs. Kill Participation (Team Impact)")
+    weights = impact_weight_controls('impact_chart')
+    # Only the dot product over the cached input matrix runs per slider move
+    scores = get_impact_scorer(df).scores(weights)
 
     if selected_role == "ALL":
         color_variable = 'team_name'
@@ -24,22 +33,28 @@ def show_impact_chart(df: pd.DataFrame, selected_role: str):
     )
 
     # Filter the DataFrame based on user selection
-    df_filtered = df[df[color_variable].isin(selected_groups)]
+    mask = df[color_variable].isin(selected_groups).to_numpy()
+    df_filtered = df[mask].assign(impact_score=scores[mask])
 
     if df_filtered.empty:
         st.warning(f"No data available for the selected {grouping_title}(s).")
         return
 
-    fig, ax = plt.subplots(figsize=(10, 6))
-    fig = px.scatter(
-        df_filtered, x='gpm', y='kp', size='impact_score', color='impact_score',color_continuous_scale='Plasma_r', hover_data='name'
-    )
-    # Highlight highest impact players
-    top_impact_players = df.sort_values(by='impact_score', ascending=False).head(3)
-    for index, row in top_impact_players.iterrows():
-        ax.text(row['gpm'] + 2, row['kp'], row['name'], fontsize=10, weight='bold', color='red')
-
-    ax.set_title('GPM vs. Kill Participation (Teamfight & Resource Impact)', fontsize=16)
-    ax.set_xlabel('Gold Per Minute (GPM)')
-    ax.set_ylabel('Kill Participation (KP)')
+    def build():
+        fig = px.scatter(
+            df_filtered, x='gpm', y='kp', size='impact_score' if df_filtered['impact_score'].max() > 0 else None, color='impact_score',color_continuous_scale='Plasma_r', hover_data='name',
+            title='GPM vs. Kill Participation (Teamfight & Resource Impact)'
+        )
+        # Highlight highest impact players
+        top_impact_players = df.take(top_positions(scores, 3))
+        for index, row in top_impact_players.iterrows():
+            fig.add_annotation(x=row['gpm'], y=row['kp'], text=f"<b>{row['name']}</b>", showarrow=False,
+                               xshift=8, xanchor='left', font=dict(size=10, color='red'))
+
+        fig.update_layout(xaxis_title='Gold Per Minute (GPM)', yaxis_title='Kill Participation (KP)')
+        return fig
+
+    # Reused across reruns while the data and the selection are unchanged
+    fig = cached_figure('impact', df, build, color=color_variable, groups=selected_groups,
+                       weights=tuple(weights.items()))
     st.plotly_chart(fig)
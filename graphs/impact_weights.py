@@ -0,0 +1,45 @@
+from typing import Dict
+
+import streamlit as st
+from derived_metrics import IMPACT_WEIGHTS
+
+IMPACT_WEIGHT_LABELS = {
+    'gpm': "Gold Per Minute weight",
+    'kp': "Kill Participation weight",
+}
+
+# Session key of the weights last chosen on any page
+_WEIGHTS_STATE = 'impact_weights'
+
+
+def impact_weight_controls(key: str) -> Dict[str, float]:
+    """
+    What-if sliders for the impact score weights. The choice is shared between the pages that
+    show the score: each page's sliders start from the weights last set on any of them.
+    Call from inside a fragment, so moving a slider reruns only that fragment.
+    """
+    weights = st.session_state.setdefault(_WEIGHTS_STATE, dict(IMPACT_WEIGHTS))
+
+    with st.expander("What-if impact weights"):
+        cols = st.columns(len(IMPACT_WEIGHTS) + 1)
+        for col, name in zip(cols, IMPACT_WEIGHTS):
+            slider_key = f'{key}_impact_weight_{name}'
+            if slider_key not in st.session_state:
+                st.session_state[slider_key] = weights[name]
+            with col:
+                weights[name] = st.slider(IMPACT_WEIGHT_LABELS.get(name, name), min_value=0.0, max_value=2.0,
+                                          step=0.05, key=slider_key)
+        with cols[-1]:
+            st.button("Reset weights", key=f'{key}_impact_weight_reset', on_click=_reset_weights, args=(key,))
+    return dict(weights)
+
+
+def _reset_weights(key: str):
+    """Button callback: back to the default weights, before the sliders are drawn again."""
+    st.session_state[_WEIGHTS_STATE] = dict(IMPACT_WEIGHTS)
+    for name, value in IMPACT_WEIGHTS.items():
+        st.session_state[f'{key}_impact_weight_{name}'] = value
+
+
+def is_default_weights(weights: Dict[str, float]) -> bool:
+    return all(abs(weights.get(name, 0.0) - value) < 1e-9 for name, value in IMPACT_WEIGHTS.items())
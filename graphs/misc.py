@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from graphs.figures import cached_figure
+from leaderboard import get_leaderboards
 
 def show_player_origin_map(df: pd.DataFrame):
     """
@@ -28,7 +30,7 @@ def show_player_origin_map(df: pd.DataFrame):
     df['iso_alpha_3'] = df['country'].str.upper().map(iso_2_to_3)
 
     # 2. Aggregate data: Count players per country using the new ISO-3 code
-    df_country = df.groupby(['country', 'iso_alpha_3']).size().reset_index(name='Player Count')
+    df_country = df.groupby(['country', 'iso_alpha_3'], observed=True).size().reset_index(name='Player Count')
 
     # Filter out rows where mapping failed (iso_alpha_3 is NaN)
     df_country = df_country.dropna(subset=['iso_alpha_3'])
@@ -63,11 +65,21 @@ def show_player_origin_map(df: pd.DataFrame):
 def _create_misc_bar_chart(df, x_col, y_col='name', color_col='league', title=None, x_label=None, grouping_var=None):
     """
     Helper function to create a standardized Plotly horizontal bar chart for player ranking.
-    It sorts the DataFrame by the metric and limits results to the top 20.
+    It takes the top 20 for the metric from the precomputed leaderboards.
+    The figure is reused across reruns while the data is unchanged.
     """
+    return cached_figure(f'misc_bar_{x_col}', df,
+                         lambda: _build_misc_bar_chart(df, x_col, y_col, color_col, title, x_label),
+                         y=y_col, color=color_col, title=title, x_label=x_label)
 
-    # Sort the data by the ranking metric (x_col) in descending order and limit to top 20
-    df_sorted = df.sort_values(by=x_col, ascending=False).head(20).copy()
+
+def _build_misc_bar_chart(df, x_col, y_col, color_col, title, x_label):
+    """Builds the ranking bar chart for _create_misc_bar_chart, or None when there is nothing to rank."""
+    # Top 20 by the ranking metric (x_col), highest first; shared by every chart on the page
+    boards = get_leaderboards(df)
+    df_sorted = boards.top_players(x_col, 20)
+    # Rank and percentile among every player of the view, not only the 20 shown
+    df_sorted = df_sorted.join(boards.ranks[[f'{x_col}_rank', f'{x_col}_pct']])
 
     # Filter out rows where the ranking column is 0 or NaN, if the total sum is not zero
     if df_sorted[x_col].sum() > 0:
@@ -76,7 +88,8 @@ def _create_misc_bar_chart(df, x_col, y_col='name', color_col='league', title=No
     if df_sorted.empty:
         return None
 
-    hover_cols = ['name', 'team_name', 'league', 'games', x_col]
+    hover_cols = {'name': True, 'team_name': True, 'league': True, 'games': True, x_col: True,
+                  f'{x_col}_rank': True, f'{x_col}_pct': ':.0%'}
 
     fig = px.bar(
         df_sorted,
@@ -85,6 +98,7 @@ def _create_misc_bar_chart(df, x_col, y_col='name', color_col='league', title=No
         color=color_col,
         orientation='h',
         hover_data=hover_cols,
+        labels={f'{x_col}_rank': 'Rank', f'{x_col}_pct': 'Percentile'},
         title=title or f'Top 20 Players by {x_col.replace("_", " ").title()}'
     )
 
@@ -254,3 +268,15 @@ def show_all_rankings(df: pd.DataFrame):
         show_vision_ranking(df)
         st.markdown("---")
         show_penta_kills_ranking(df)
+
+
+def render_origins_page(ctx):
+    """Player Origins page (always all roles and splits)."""
+    st.header("Player Origins")
+    show_player_origin_map(ctx.data['players_all'])
+
+
+def render_rankings_page(ctx):
+    """Other charts page."""
+    st.header("Other charts")
+    show_all_rankings(ctx.data['players'])
@@ -1,23 +1,76 @@
 import streamlit as st
 import pandas as pd
+from leaderboard import get_leaderboards, get_impact_scorer, top_positions
+from confidence import with_intervals, CI_LEVEL
+from graphs.impact_weights import impact_weight_controls, is_default_weights
 
 
 def show_rankings(df: pd.DataFrame):
     """Displays the KDA and Impact Score rankings side-by-side."""
+    boards = get_leaderboards(df)
     col1, col2 = st.columns(2)
 
     with col1:
-        st.subheader("KDA")
-        df_kda_rank = df.sort_values(by='kda', ascending=False).head(5)
-        n = 1
-        for i, row in df_kda_rank.iterrows():
-            st.markdown(f"{n}. {row['name']} - KDA: **{row['kda']:.2f}**")
-            n += 1
+        show_kda_ranking(df, boards)
 
     with col2:
-        st.subheader("Impact Score (Resource & Teamfight)")
-        df_impact_rank = df.sort_values(by='impact_score', ascending=False).head(5)
-        n = 1
-        for i, row in df_impact_rank.iterrows():
-            st.markdown(f"{n}. {row['name']} - Score: **{row['impact_score']:.0f}**")
-            n += 1
\ No newline at end of file
+        show_impact_ranking(df)
+
+
+@st.fragment
+def show_kda_ranking(df: pd.DataFrame, boards):
+    """
+    Top 5 by KDA, or by the lower bound of its confidence interval, which keeps a hot streak
+    over a handful of games from outranking a long, consistent season.
+    """
+    st.subheader("KDA")
+    by_lower_bound = st.toggle(f"Rank by lower bound ({CI_LEVEL:.0%} interval)", key='kda_rank_lower_bound')
+    if not by_lower_bound:
+        df_kda_rank = boards.top_players('kda', 5)
+        st.markdown("\n".join(
+            f"{n}. {name} - KDA: **{kda:.2f}**"
+            for n, (name, kda) in enumerate(zip(df_kda_rank['name'], df_kda_rank['kda']), start=1)
+        ))
+        return
+
+    df_ci = with_intervals(df)
+    df_kda_rank = df_ci.take(top_positions(df_ci['kda_lo'].to_numpy(dtype='float64'), 5))
+    st.markdown("\n".join(
+        f"{n}. {name} - KDA: **{kda:.2f}** (at least {low:.2f})"
+        for n, (name, kda, low) in enumerate(zip(df_kda_rank['name'], df_kda_rank['kda'], df_kda_rank['kda_lo']), start=1)
+    ))
+
+
+@st.fragment
+def show_impact_ranking(df: pd.DataFrame):
+    """Top 5 by impact score under the what-if weights; a slider move reruns only this fragment."""
+    st.subheader("Impact Score (Resource & Teamfight)")
+    weights = impact_weight_controls('rankings')
+    # Re-weighting is a dot product over a cached matrix plus a top-5 partial selection
+    df_impact_rank = get_impact_scorer(df).top_players(weights, 5)
+    # Role percentiles come precomputed with the snapshot view (player_norms), for the default weights only
+    if is_default_weights(weights) and 'impact_score_role_pct' in df_impact_rank.columns:
+        role_pct = df_impact_rank['impact_score_role_pct']
+    else:
+        role_pct = pd.Series(float('nan'), index=df_impact_rank.index)
+    st.markdown("\n".join(
+        f"{n}. {name} - Score: **{score:.0f}**" + (f" ({pct:.0%} within role)" if pd.notna(pct) else "")
+        for n, (name, score, pct) in enumerate(
+            zip(df_impact_rank['name'], df_impact_rank['impact_score'], role_pct), start=1)
+    ))
+
+
+def render_page(ctx):
+    """Player Overview & Rankings page."""
+    df_filtered = ctx.data['players']
+    # --- Display Player Summary ---
+    st.subheader(f"Players Loaded: {ctx.selected_role} ({df_filtered.shape[0]} Found)")
+    summary_cols = ['name', 'games', 'winrate', 'kda', 'gpm', 'kp', 'impact_score']
+    # Where a player stands among the same role, precomputed once per snapshot
+    pct_cols = {f'{col}_role_pct': f'{col} (role pct)' for col in ('kda', 'impact_score')
+                if f'{col}_role_pct' in df_filtered.columns}
+    st.dataframe(df_filtered[summary_cols + list(pct_cols)].sort_values(by='kda', ascending=False).rename(columns=pct_cols),
+                 width='stretch', hide_index=True)
+    st.markdown("---")
+    st.markdown("Select a role in the sidebar to load and analyze player data from the database.")
+    show_rankings(df_filtered)
@@ -0,0 +1,67 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from player_similarity import get_similarity_index, SIMILAR_PLAYERS
+
+# Players drawn on the profile chart next to the selected one
+PROFILE_NEIGHBOURS = 3
+
+
+def _profile_chart(index, names):
+    """Radar of the players' role-normalized stats (0 = role average, in standard deviations)."""
+    profile = index.profile(names)
+    fig = go.Figure()
+    for name, row in profile.iterrows():
+        fig.add_trace(go.Scatterpolar(
+            r=list(row.values) + [row.values[0]],
+            theta=list(profile.columns) + [profile.columns[0]],
+            name=name,
+        ))
+    fig.update_layout(title="Stat Profile (standard deviations from the role average)", height=550)
+    return fig
+
+
+@st.fragment
+def show_similar_players(df: pd.DataFrame):
+    """Player picker and the players with the closest stat profiles; picking reruns only this fragment."""
+    index = get_similarity_index(df)
+    names = sorted(df['name'].astype(str).unique())
+
+    col_player, col_k, col_role = st.columns([2, 1, 1])
+    with col_player:
+        name = st.selectbox("Find players like:", names)
+    with col_k:
+        k = st.number_input("Results:", min_value=1, max_value=50, value=SIMILAR_PLAYERS)
+    with col_role:
+        same_role = st.checkbox("Same role only", value=True)
+
+    similar = index.similar_players(name, k, same_role)
+    if similar.empty:
+        st.info(f"No comparable players found for {name}.")
+        return
+
+    columns = ['name', 'team_name', 'league', 'role', 'similarity'] + \
+        [feature for feature in ('kda', 'gpm', 'kp', 'dpm', 'gd15', 'vspm') if feature in similar.columns]
+    st.dataframe(
+        similar[columns].rename(columns={
+            'name': 'Player', 'team_name': 'Team', 'league': 'League', 'role': 'Role', 'similarity': 'Similarity',
+        }).style.format({'Similarity': "{:.2f}"}),
+        hide_index=True,
+    )
+
+    neighbours = similar['name'].astype(str).head(PROFILE_NEIGHBOURS).tolist()
+    st.plotly_chart(_profile_chart(index, [name] + neighbours), use_container_width=True)
+
+
+def render_page(ctx):
+    """Similar Players page."""
+    st.header("Similar Players")
+    st.markdown(
+        "Players are compared on per-game and per-minute stats, each scaled against the spread of "
+        "their own role, so the closest matches play the most alike rather than put up the biggest numbers."
+    )
+    df = ctx.data['players_similar']
+    if df.empty:
+        st.warning("No player data available.")
+        return
+    show_similar_players(df)
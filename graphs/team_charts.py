@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from graphs.figures import cached_figure
+from confidence import with_intervals, interval_columns, TEAM_RATE_COLUMNS, CI_LEVEL
 
 METRIC_GROUPS = {
     "Objectives & Kills": {
@@ -40,10 +42,52 @@ REGION_MAP = {
 
 REGION_OPTIONS = list(REGION_MAP.keys())
 
+@st.fragment
+def show_objective_ranking(df_teams: pd.DataFrame, df_filtered: pd.DataFrame, teams_to_show: list):
+    """
+    Horizontal bar ranking of the selected teams by one objective metric.
+    A nested fragment: picking another metric redraws only this chart, not the scatter and polar charts.
+    """
+    st.markdown("---")
+    st.subheader("1. Objective Control Ranking (Bar Chart)")
+    st.caption("Ranks teams by selected objective acquisition per game.")
+
+    obj_metrics = METRIC_GROUPS["Objectives & Kills"]
+    rank_metric_key = st.selectbox(
+        "Select objective metric to rank by:",
+        list(obj_metrics.keys()),
+        format_func=lambda x: obj_metrics[x],
+        key='obj_rank_select'
+    )
+
+    def build_bar():
+        df_sorted = df_filtered.sort_values(by=rank_metric_key, ascending=True)
+
+        fig_bar = px.bar(
+            df_sorted,
+            x=rank_metric_key,
+            y='name',
+            orientation='h',
+            color='name',
+            title=f"Team Ranking by {obj_metrics[rank_metric_key]}",
+            labels={'name': 'Team', rank_metric_key: obj_metrics[rank_metric_key]},
+            template="plotly_white"
+        )
+        fig_bar.update_layout(showlegend=False)
+        return fig_bar
+
+    # Figures are reused across reruns while the data and the selections are unchanged
+    fig_bar = cached_figure('team_objective_bar', df_teams, build_bar, teams=teams_to_show, metric=rank_metric_key)
+    st.plotly_chart(fig_bar, use_container_width=True)
+
+
+@st.fragment
 def show_team_performance_charts(df_teams: pd.DataFrame):
     """
     Generates three distinct charts (Bar, Scatter, Polar) to compare teams
     across Objectives, Efficiency, and Percentage Control metrics.
+
+    Runs as a fragment: the region and team selection rerun these charts without reloading the page's data.
     """
     st.title("Team Performance Profiles (Multi-Chart View)")
     st.info(
@@ -107,36 +151,11 @@ def show_team_performance_charts(df_teams: pd.DataFrame):
     # Filter the DataFrame using the determined list of teams
     df_filtered = df_teams[df_teams['name'].isin(teams_to_show)].copy()
 
-    # Fill NaN values with 0 for metrics being plotted
-    df_filtered = df_filtered.fillna(0)
+    # Fill NaN values with 0 for metrics being plotted (numeric columns only, identifiers are categorical)
+    df_filtered = df_filtered.fillna(dict.fromkeys(df_filtered.select_dtypes('number').columns, 0))
 
     # --- CHART 1: Objectives & Kills (Horizontal Bar Chart) ---
-    st.markdown(f"---")
-    st.subheader("1. Objective Control Ranking (Bar Chart)")
-    st.caption("Ranks teams by selected objective acquisition per game.")
-
-    obj_metrics = METRIC_GROUPS["Objectives & Kills"]
-    rank_metric_key = st.selectbox(
-        "Select objective metric to rank by:",
-        list(obj_metrics.keys()),
-        format_func=lambda x: obj_metrics[x],
-        key='obj_rank_select'
-    )
-
-    df_sorted = df_filtered.sort_values(by=rank_metric_key, ascending=True)
-
-    fig_bar = px.bar(
-        df_sorted,
-        x=rank_metric_key,
-        y='name',
-        orientation='h',
-        color='name',
-        title=f"Team Ranking by {obj_metrics[rank_metric_key]}",
-        labels={'name': 'Team', rank_metric_key: obj_metrics[rank_metric_key]},
-        template="plotly_white"
-    )
-    fig_bar.update_layout(showlegend=False)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    show_objective_ranking(df_teams, df_filtered, teams_to_show)
 
     # --- CHART 2: Efficiency & Economy (Scatter Plot) ---
     st.markdown(f"---")
@@ -145,18 +164,22 @@ def show_team_performance_charts(df_teams: pd.DataFrame):
 
     eff_metrics = METRIC_GROUPS["Efficiency & Economy"]
 
-    fig_scatter = px.scatter(
-        df_filtered,
-        x='gpm',
-        y='dpm',
-        color='name',
-        size='cspm',  # Use Gold Difference per minute for bubble size
-        hover_data=['name', 'cspm', 'gdm'],
-        size_max=45,
-        title='DPM vs. GPM (Bubble size = CS per Minute)',
-        labels={'gpm': eff_metrics['gpm'], 'dpm': eff_metrics['dpm']},
-        template="plotly_dark"
-    )
+    def build_scatter():
+        fig_scatter = px.scatter(
+            df_filtered,
+            x='gpm',
+            y='dpm',
+            color='name',
+            size='cspm',  # Use Gold Difference per minute for bubble size
+            hover_data=['name', 'cspm', 'gdm'],
+            size_max=45,
+            title='DPM vs. GPM (Bubble size = CS per Minute)',
+            labels={'gpm': eff_metrics['gpm'], 'dpm': eff_metrics['dpm']},
+            template="plotly_dark"
+        )
+        return fig_scatter
+
+    fig_scatter = cached_figure('team_efficiency_scatter', df_teams, build_scatter, teams=teams_to_show)
     st.plotly_chart(fig_scatter, use_container_width=True)
 
     # --- CHART 3: First Control & Percentage (Polar Chart) ---
@@ -167,30 +190,96 @@ def show_team_performance_charts(df_teams: pd.DataFrame):
     pct_metrics = METRIC_GROUPS["First Control & Percentage"]
     metrics_to_plot = list(pct_metrics.keys())
 
-    df_plot = df_filtered[['name'] + metrics_to_plot]
-    df_melted = df_plot.melt(
-        id_vars='name',
-        value_vars=metrics_to_plot,
-        var_name='Metric',
-        value_name='Value'
-    )
-    df_melted['Metric'] = df_melted['Metric'].apply(lambda x: pct_metrics.get(x, x))
-
-    fig_polar = px.line_polar(
-        df_melted,
-        r='Value',
-        theta='Metric',
-        color='name',
-        line_close=True,
-        template="plotly_dark",
-        title="Team Early Game Percentage Control"
-    )
+    def build_polar():
+        df_plot = df_filtered[['name'] + metrics_to_plot]
+        df_melted = df_plot.melt(
+            id_vars='name',
+            value_vars=metrics_to_plot,
+            var_name='Metric',
+            value_name='Value'
+        )
+        df_melted['Metric'] = df_melted['Metric'].apply(lambda x: pct_metrics.get(x, x))
 
-    # fig_polar.update_traces(fill='toself', opacity=0.4)
-    max_val = df_melted['Value'].max()
-    fig_polar.update_layout(
-        polar=dict(
-            radialaxis=dict(visible=True, range=[0, max_val * 1.1])
+        fig_polar = px.line_polar(
+            df_melted,
+            r='Value',
+            theta='Metric',
+            color='name',
+            line_close=True,
+            template="plotly_dark",
+            title="Team Early Game Percentage Control"
         )
-    )
+
+        # fig_polar.update_traces(fill='toself', opacity=0.4)
+        max_val = df_melted['Value'].max()
+        fig_polar.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, max_val * 1.1])
+            )
+        )
+        return fig_polar
+
+    fig_polar = cached_figure('team_control_polar', df_teams, build_polar, teams=teams_to_show)
     st.plotly_chart(fig_polar, use_container_width=True)
+
+    # --- CHART 4: Percentage stats with their confidence intervals ---
+    show_percentage_intervals(df_teams, teams_to_show)
+
+
+@st.fragment
+def show_percentage_intervals(df_teams: pd.DataFrame, teams_to_show: list):
+    """
+    One percentage stat of the selected teams with its Wilson confidence interval, optionally
+    ranked by the interval's lower bound. A nested fragment, like the objective ranking.
+    """
+    st.markdown("---")
+    st.subheader(f"4. Percentage Stats with {CI_LEVEL:.0%} Confidence Intervals")
+    st.caption("Teams with fewer games get wider intervals; ranking by the lower bound favours proven rates.")
+
+    pct_metrics = {key: label for key, label in METRIC_GROUPS["First Control & Percentage"].items()
+                   if key in TEAM_RATE_COLUMNS and key in df_teams.columns}
+    if not pct_metrics:
+        return
+
+    col_metric, col_rank = st.columns([2, 1])
+    with col_metric:
+        metric = st.selectbox("Select percentage stat:", list(pct_metrics), format_func=lambda x: pct_metrics[x],
+                              key='pct_interval_select')
+    with col_rank:
+        by_lower_bound = st.toggle("Rank by lower bound", key='pct_interval_lower_bound')
+
+    low, high = interval_columns(metric)
+
+    def build_intervals():
+        # Bounds are computed once per load of the team data
+        df_ci = with_intervals(df_teams, 'teams')
+        df_ci = df_ci[df_ci['name'].isin(teams_to_show)]
+        df_sorted = df_ci.assign(
+            err_plus=(df_ci[high] - df_ci[metric]).clip(lower=0),
+            err_minus=(df_ci[metric] - df_ci[low]).clip(lower=0),
+        ).sort_values(by=low if by_lower_bound else metric, ascending=True)
+
+        fig = px.scatter(
+            df_sorted,
+            x=metric,
+            y='name',
+            error_x='err_plus',
+            error_x_minus='err_minus',
+            hover_data={'games': True, low: ':.1f', high: ':.1f'},
+            title=f"{pct_metrics[metric]} ({CI_LEVEL:.0%} interval)",
+            labels={'name': 'Team', metric: pct_metrics[metric], low: 'Lower bound', high: 'Upper bound'},
+            template="plotly_white"
+        )
+        fig.update_layout(yaxis={'categoryorder': 'array', 'categoryarray': df_sorted['name'].tolist()})
+        return fig
+
+    fig = cached_figure('team_pct_intervals', df_teams, build_intervals, teams=teams_to_show, metric=metric,
+                        lower_bound=by_lower_bound)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_page(ctx):
+    """Teams Page."""
+    st.header("Teams Page")
+    st.warning("Select a split other than ALL to see charts")
+    show_team_performance_charts(ctx.data['teams'])
@@ -0,0 +1,82 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from graphs.figures import cached_figure
+from graphs.team_charts import METRIC_GROUPS
+from team_clusters import get_team_clusters
+
+# Every team chart metric, as one feature set
+CLUSTER_FEATURES = {col: label for group in METRIC_GROUPS.values() for col, label in group.items()}
+
+TEAM_POOLS = {
+    "Tracked teams": 'teams',
+    "Every team in every league": 'teams_all',
+}
+
+
+def _cluster_scatter(df: pd.DataFrame, clusters):
+    coords = clusters.coords.join(clusters.labels)
+    coords['Archetype'] = [f"{cluster + 1}: {clusters.archetypes[cluster]}" for cluster in coords['cluster']]
+    if 'region' in df.columns:
+        teams = df.drop_duplicates('name')
+        coords['region'] = teams['region'].astype(str).to_numpy()
+    coords = coords.reset_index().sort_values('cluster')
+
+    first, second = clusters.explained_variance[:2]
+    fig = px.scatter(
+        coords, x='pc1', y='pc2', color='Archetype', text='name',
+        hover_data=[col for col in ('region',) if col in coords.columns],
+        labels={'pc1': f"Component 1 ({first:.0%} of variance)", 'pc2': f"Component 2 ({second:.0%} of variance)"},
+        title="Team Playstyles (principal components of the standardized stats)",
+    )
+    fig.update_traces(textposition='top center', marker=dict(size=12))
+    fig.update_layout(height=650)
+    return fig
+
+
+@st.fragment
+def show_team_clusters(df: pd.DataFrame):
+    """Cluster count picker with the archetype chart; moving the slider reruns only this fragment."""
+    team_count = df['name'].nunique()
+    # At most team_count - 1 archetypes, so up to three teams leave k = 2 as the only choice,
+    # and a slider needs min_value < max_value
+    if team_count > 3:
+        k = st.slider("Archetypes:", min_value=2, max_value=min(8, team_count - 1), value=min(4, team_count - 1),
+                      key='cluster_k')
+    else:
+        k = 2
+
+    features = [col for col in CLUSTER_FEATURES if col in df.columns]
+    clusters = get_team_clusters(df, features, k, CLUSTER_FEATURES)
+    if clusters is None:
+        st.info("Not enough teams to group into archetypes.")
+        return
+
+    fig = cached_figure('team_clusters', df, lambda: _cluster_scatter(df, clusters), features=features, k=k)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("Archetype Profiles")
+    st.caption("Cluster centres, in standard deviations from the average team.")
+    sizes = clusters.labels.value_counts().reindex(range(k), fill_value=0)
+    profile = clusters.centroids.rename(columns=CLUSTER_FEATURES)
+    profile.insert(0, 'Teams', sizes.values)
+    profile.insert(0, 'Archetype', [f"{cluster + 1}: {clusters.archetypes[cluster]}" for cluster in profile.index])
+    st.dataframe(
+        profile.style.format({col: "{:+.2f}" for col in CLUSTER_FEATURES.values() if col in profile.columns}),
+        hide_index=True,
+    )
+
+
+def render_page(ctx):
+    """Team Playstyles page."""
+    st.header("Team Playstyles")
+    st.markdown(
+        "Teams are grouped by how they play rather than how well: every objective, early game and economy "
+        "stat is scaled to the spread of the selected teams, and teams with similar profiles form an archetype."
+    )
+    pool = st.radio("Teams:", list(TEAM_POOLS), horizontal=True, key='cluster_pool')
+    df = ctx.data[TEAM_POOLS[pool]]
+    if df.empty:
+        st.warning("No team data available.")
+        return
+    show_team_clusters(df)
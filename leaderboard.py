@@ -0,0 +1,173 @@
+import threading
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from schema import DATA_VERSION_ATTR
+from derived_metrics import IMPACT_WEIGHTS, IMPACT_SCALES
+
+# Every metric a ranking page shows, highest first
+RANKING_METRICS = ('solo_kills', 'avg_kills', 'avg_assists', 'dmg_pct', 'wpm', 'penta_kills', 'kda', 'impact_score',
+                   'fb_pct')
+# Longest leaderboard any page shows
+LEADERBOARD_SIZE = 20
+
+
+def _rank_columns(values: np.ndarray):
+    """
+    Descending competition ranks (1 = best, ties share the best rank) and percentiles (share of
+    rows at or below the value) of every column of values, from one stable argsort of the matrix.
+    Missing values are -inf: they rank last and get no percentile.
+    """
+    n_rows = values.shape[0]
+    order = np.argsort(-values, axis=0, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=0)
+
+    # Position of the first row of each run of equal values, carried forward through the run
+    positions = np.arange(n_rows)[:, None]
+    starts = np.ones_like(ordered, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    run_start = np.maximum.accumulate(np.where(starts, positions, 0), axis=0)
+
+    missing = np.isneginf(values)
+    n_valid = np.maximum(n_rows - missing.sum(axis=0), 1)
+
+    ranks = np.empty_like(run_start)
+    pct = np.empty(values.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, run_start + 1, axis=0)
+    np.put_along_axis(pct, order, (n_valid - run_start) / n_valid, axis=0)
+    pct[missing] = np.nan
+    return ranks, pct
+
+
+def _top_above(column: np.ndarray, threshold: float, k: int) -> np.ndarray:
+    """
+    Positions of the k largest values given the k-th largest, highest first. Rows at or above
+    the threshold (k plus any ties with the k-th) are taken in row order, so the stable sort
+    breaks ties by row order, as a stable sort_values would.
+    """
+    candidates = np.flatnonzero(column >= threshold)
+    return candidates[np.argsort(-column[candidates], kind='stable')[:k]]
+
+
+def top_positions(values: np.ndarray, k: int) -> np.ndarray:
+    """Row positions of the k largest values (missing values as -inf), highest first."""
+    values = np.where(np.isnan(values), -np.inf, values)
+    k = min(k, len(values))
+    if not k:
+        return np.empty(0, dtype=np.intp)
+    return _top_above(values, np.partition(values, len(values) - k)[len(values) - k], k)
+
+
+class Leaderboards:
+    """
+    Top-N and full rankings of one player frame for every ranking metric.
+
+    top holds, per metric, the row positions of the best `size` players in descending order,
+    found by partial selection when the object is built. The full rank and percentile of every
+    player are only computed on first access to ranks. Missing values rank last.
+    """
+
+    def __init__(self, df: pd.DataFrame, metrics: Sequence[str] = RANKING_METRICS, size: int = LEADERBOARD_SIZE):
+        self.df = df
+        self.metrics = [metric for metric in metrics if metric in df.columns]
+        values = df[self.metrics].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._values = np.where(np.isnan(values), -np.inf, values)
+        self.top = self._select_top(size)
+        self._ranks = None
+        self._lock = threading.Lock()
+
+    def _select_top(self, size: int) -> Dict[str, np.ndarray]:
+        values = self._values
+        n_rows = values.shape[0]
+        k = min(size, n_rows)
+        if not k:
+            return {metric: np.empty(0, dtype=np.intp) for metric in self.metrics}
+
+        # k-th largest value of every column in one partial-selection pass over the matrix
+        threshold = np.partition(values, n_rows - k, axis=0)[n_rows - k]
+        return {metric: _top_above(values[:, j], threshold[j], k) for j, metric in enumerate(self.metrics)}
+
+    def top_players(self, metric: str, n: int = LEADERBOARD_SIZE) -> pd.DataFrame:
+        """The best n rows for metric (n at most the leaderboard size), highest first."""
+        return self.df.take(self.top[metric][:n])
+
+    @property
+    def ranks(self) -> pd.DataFrame:
+        """'<metric>_rank' and '<metric>_pct' columns for every metric, aligned with df."""
+        with self._lock:
+            if self._ranks is None:
+                ranks, pct = _rank_columns(self._values)
+                self._ranks = pd.concat([
+                    pd.DataFrame(ranks, index=self.df.index, columns=[f'{m}_rank' for m in self.metrics]),
+                    pd.DataFrame(pct, index=self.df.index, columns=[f'{m}_pct' for m in self.metrics]),
+                ], axis=1)
+            return self._ranks
+
+
+_leaderboards: LRUCache = LRUCache(maxsize=64)
+_leaderboards_lock = threading.Lock()
+
+
+def get_leaderboards(df: pd.DataFrame) -> Leaderboards:
+    """
+    Leaderboards for df, computed once per data version (snapshot load, role and split).
+    Frames without a version token are ranked on every call.
+    """
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        return Leaderboards(df)
+
+    with _leaderboards_lock:
+        boards = _leaderboards.get(version)
+    if boards is None:
+        boards = Leaderboards(df)
+        with _leaderboards_lock:
+            _leaderboards[version] = boards
+    return boards
+
+
+class ImpactScorer:
+    """
+    Impact scores of one player frame under any weights (derived_metrics.IMPACT_WEIGHTS).
+
+    The scaled input columns are cached as one float32 matrix, so re-scoring for new weights is
+    a dot product and re-ranking is a partial selection of the top N; the frame and the rest of
+    the preparation pipeline are not touched.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.inputs = [col for col in IMPACT_WEIGHTS if col in df.columns]
+        scales = np.array([IMPACT_SCALES[col] for col in self.inputs], dtype=np.float32)
+        self._matrix = df[self.inputs].to_numpy(dtype=np.float32, na_value=np.nan) * scales
+
+    def scores(self, weights: Dict[str, float]) -> np.ndarray:
+        """Impact score of every row under weights (inputs without a weight count 0)."""
+        return self._matrix @ np.array([weights.get(col, 0.0) for col in self.inputs], dtype=np.float32)
+
+    def top_players(self, weights: Dict[str, float], n: int = LEADERBOARD_SIZE) -> pd.DataFrame:
+        """The best n rows under weights, highest first, with their re-weighted 'impact_score'."""
+        scores = self.scores(weights)
+        positions = top_positions(scores, n)
+        return self.df.take(positions).assign(impact_score=scores[positions])
+
+
+_impact_scorers: LRUCache = LRUCache(maxsize=64)
+
+
+def get_impact_scorer(df: pd.DataFrame) -> ImpactScorer:
+    """ImpactScorer for df, built once per data version (frames without a version token: every call)."""
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        return ImpactScorer(df)
+
+    with _leaderboards_lock:
+        scorer = _impact_scorers.get(version)
+    if scorer is None:
+        scorer = ImpactScorer(df)
+        with _leaderboards_lock:
+            _impact_scorers[version] = scorer
+    return scorer
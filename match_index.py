@@ -0,0 +1,228 @@
+import threading
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class HeadToHeadRecord:
+    """Series and game wins of team_a and team_b over their most recent `matches` meetings."""
+    team_a: str
+    team_b: str
+    matches: int
+    series_wins_a: int
+    series_wins_b: int
+    game_wins_a: int
+    game_wins_b: int
+
+
+@dataclass(frozen=True)
+class HeadToHeadMatrix:
+    """
+    All-pairs records of a list of teams: series_wins.loc[a, b] and game_wins.loc[a, b] are
+    the series and games team a won against team b. Losses are the transpose.
+    """
+    series_wins: pd.DataFrame
+    game_wins: pd.DataFrame
+
+
+def pair_key(team_a: str, team_b: str) -> Tuple[str, str]:
+    """The unordered pair as (low, high), in code point order (Python's sorted())."""
+    return (team_a, team_b) if team_a <= team_b else (team_b, team_a)
+
+
+class MatchIndex:
+    """
+    Match history indexed by unordered team pair.
+
+    Built once per load of the matches: dates are parsed once, and rows are sorted by pair and
+    then by date (most recent first), so each pair's meetings are one contiguous block. A lookup
+    is a dict hit plus a slice. Running totals of series and game wins (from the pair's low
+    team's side) are kept alongside, so the record over the last N meetings is two subtractions.
+    """
+
+    def __init__(self, df_matches: pd.DataFrame):
+        required = {'team1', 'team2', 'team1_score', 'team2_score', 'winner', 'date'}
+        if df_matches.empty or not required.issubset(df_matches.columns):
+            df_matches = pd.DataFrame(columns=sorted(required))
+
+        team1 = df_matches['team1'].astype(str).to_numpy()
+        team2 = df_matches['team2'].astype(str).to_numpy()
+        swap = team1 > team2
+        low = np.where(swap, team2, team1)
+        high = np.where(swap, team1, team2)
+        score1 = pd.to_numeric(df_matches['team1_score'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+        score2 = pd.to_numeric(df_matches['team2_score'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+        dates = pd.to_datetime(df_matches['date'], errors='coerce')
+        winner = df_matches['winner'].astype(str).to_numpy()
+
+        df = df_matches.assign(
+            date=dates.dt.date,
+            _low=low,
+            _high=high,
+            _date=dates,
+            _low_games=np.where(swap, score2, score1),
+            _high_games=np.where(swap, score1, score2),
+            _low_won=(winner == low).astype(np.int64),
+            _high_won=(winner == high).astype(np.int64),
+        )
+        df = df.sort_values(['_low', '_high', '_date'], ascending=[True, True, False],
+                            na_position='last', kind='stable').reset_index(drop=True)
+
+        # Start of every pair's block, and one past the end of the last one
+        keys_low = df['_low'].to_numpy()
+        keys_high = df['_high'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, (keys_low[1:] != keys_low[:-1]) | (keys_high[1:] != keys_high[:-1])]) \
+            if len(df) else np.empty(0, dtype=np.intp)
+        bounds = np.r_[starts, len(df)]
+        self._blocks: Dict[Tuple[str, str], Tuple[int, int]] = {
+            (keys_low[start], keys_high[start]): (int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])
+        }
+        # The same blocks as arrays, for aggregating every pair at once
+        self._pair_low = keys_low[starts]
+        self._pair_high = keys_high[starts]
+        self._pair_bounds = np.column_stack([bounds[:-1], bounds[1:]]).astype(np.int64)
+        self._matrices: Dict[Tuple, HeadToHeadMatrix] = {}
+        self._lock = threading.Lock()
+
+        # Prefix sums, so any leading run of a block sums in O(1)
+        self._totals = {
+            col: np.r_[0, np.cumsum(df[f'_{col}'].to_numpy())]
+            for col in ('low_won', 'high_won', 'low_games', 'high_games')
+        }
+        self.df = df[list(df_matches.columns)]
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    def nbytes(self) -> int:
+        """Deep size of the sorted frame, the prefix sums, the pair arrays and the cached matrices."""
+        with self._lock:
+            matrices = list(self._matrices.values())
+        arrays = list(self._totals.values()) + [self._pair_low, self._pair_high, self._pair_bounds]
+        return int(self.df.memory_usage(deep=True).sum()) + sum(int(a.nbytes) for a in arrays) + sum(
+            int(m.series_wins.memory_usage(deep=True).sum() + m.game_wins.memory_usage(deep=True).sum())
+            for m in matrices)
+
+    def pairs(self) -> Dict[Tuple[str, str], int]:
+        """Number of meetings of every pair that has played, keyed by (low, high)."""
+        return {pair: stop - start for pair, (start, stop) in self._blocks.items()}
+
+    def _range(self, team_a: str, team_b: str, limit: Optional[int]) -> Tuple[int, int]:
+        start, stop = self._blocks.get(pair_key(team_a, team_b), (0, 0))
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return start, stop
+
+    def head_to_head(self, team_a: str, team_b: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        The most recent meetings of the pair (all of them if limit is None), newest first,
+        with each side's games won in 'score_a' and 'score_b'.
+        """
+        start, stop = self._range(team_a, team_b, limit)
+        matches = self.df.iloc[start:stop]
+        a_is_team1 = (matches['team1'] == team_a).to_numpy()
+        return matches.assign(
+            score_a=np.where(a_is_team1, matches['team1_score'], matches['team2_score']),
+            score_b=np.where(a_is_team1, matches['team2_score'], matches['team1_score']),
+        )
+
+    def record(self, team_a: str, team_b: str, limit: Optional[int] = None) -> HeadToHeadRecord:
+        """Series and game wins of each team over the same meetings head_to_head() returns."""
+        start, stop = self._range(team_a, team_b, limit)
+        totals = {col: int(sums[stop] - sums[start]) for col, sums in self._totals.items()}
+        a_is_low = pair_key(team_a, team_b)[0] == team_a
+        side_a, side_b = ('low', 'high') if a_is_low else ('high', 'low')
+        return HeadToHeadRecord(
+            team_a=team_a,
+            team_b=team_b,
+            matches=stop - start,
+            series_wins_a=totals[f'{side_a}_won'],
+            series_wins_b=totals[f'{side_b}_won'],
+            game_wins_a=totals[f'{side_a}_games'],
+            game_wins_b=totals[f'{side_b}_games'],
+        )
+
+    def group_record(self, teams: Sequence[str], limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Series and game record of every team against the rest of the group, counting each pair's
+        most recent `limit` meetings (all of them if limit is None).
+
+        All pairs are aggregated at once from the prefix sums, so the cost does not depend on
+        how many matches were played. Returns one row per team, in the order given.
+        """
+        teams = list(dict.fromkeys(teams))
+        position = {team: i for i, team in enumerate(teams)}
+        pairs = [pair_key(a, b) for a, b in combinations(teams, 2)]
+
+        blocks = np.array([self._blocks.get(pair, (0, 0)) for pair in pairs], dtype=np.int64).reshape(-1, 2)
+        starts, stops = blocks[:, 0], blocks[:, 1]
+        if limit is not None:
+            stops = np.minimum(stops, starts + limit)
+        totals = {col: sums[stops] - sums[starts] for col, sums in self._totals.items()}
+
+        low = np.array([position[low] for low, _ in pairs], dtype=np.intp)
+        high = np.array([position[high] for _, high in pairs], dtype=np.intp)
+        wins, losses = np.zeros(len(teams), dtype=np.int64), np.zeros(len(teams), dtype=np.int64)
+        game_wins, game_losses = np.zeros(len(teams), dtype=np.int64), np.zeros(len(teams), dtype=np.int64)
+        np.add.at(wins, low, totals['low_won'])
+        np.add.at(wins, high, totals['high_won'])
+        np.add.at(losses, low, totals['high_won'])
+        np.add.at(losses, high, totals['low_won'])
+        np.add.at(game_wins, low, totals['low_games'])
+        np.add.at(game_wins, high, totals['high_games'])
+        np.add.at(game_losses, low, totals['high_games'])
+        np.add.at(game_losses, high, totals['low_games'])
+
+        return pd.DataFrame({
+            'team': teams,
+            'series_wins': wins,
+            'series_losses': losses,
+            'game_wins': game_wins,
+            'game_losses': game_losses,
+        })
+
+    def matrix(self, teams: Sequence[str], limit: Optional[int] = None) -> HeadToHeadMatrix:
+        """
+        Series and game wins of every team against every other, counting each pair's most recent
+        `limit` meetings (all of them if limit is None).
+
+        Every pair that has met is aggregated in one vectorized pass over the pair blocks, and the
+        result is kept on the index, so it is computed once per load of the matches.
+        """
+        teams = list(dict.fromkeys(teams))
+        key = (tuple(teams), limit)
+        with self._lock:
+            if key in self._matrices:
+                return self._matrices[key]
+
+        starts, stops = self._pair_bounds[:, 0], self._pair_bounds[:, 1]
+        if limit is not None:
+            stops = np.minimum(stops, starts + limit)
+        totals = {col: sums[stops] - sums[starts] for col, sums in self._totals.items()}
+
+        # Pairs where both teams are in the list
+        names = pd.Index(teams)
+        low = names.get_indexer(self._pair_low)
+        high = names.get_indexer(self._pair_high)
+        keep = (low >= 0) & (high >= 0)
+        low, high = low[keep], high[keep]
+
+        series = np.zeros((len(teams), len(teams)), dtype=np.int64)
+        games = np.zeros((len(teams), len(teams)), dtype=np.int64)
+        series[low, high] = totals['low_won'][keep]
+        series[high, low] = totals['high_won'][keep]
+        games[low, high] = totals['low_games'][keep]
+        games[high, low] = totals['high_games'][keep]
+
+        result = HeadToHeadMatrix(
+            series_wins=pd.DataFrame(series, index=teams, columns=teams),
+            game_wins=pd.DataFrame(games, index=teams, columns=teams),
+        )
+        with self._lock:
+            self._matrices[key] = result
+        return result
@@ -0,0 +1,96 @@
+import os
+import resource
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, MutableMapping, Optional
+
+import pandas as pd
+
+from graphs.figures import live_figure_count
+
+# Whether the deep byte accounting is on by default (the app's sidebar toggle starts from this)
+MEMORY_STATS = os.getenv('MEMORY_STATS', '0') == '1'
+# Print a one-line process memory report to stdout at most this often while the accounting is on (seconds);
+# 0 disables it
+MEMORY_LOG_INTERVAL = int(os.getenv('MEMORY_LOG_INTERVAL', '0'))
+# Samples kept per session for the growth readout
+SESSION_SAMPLES = 50
+
+_SAMPLES_KEY = '_memory_samples'
+_last_logged = 0.0
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process; falls back to the peak RSS where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def frame_bytes(obj: Any) -> int:
+    """Deep size of a DataFrame (or of the DataFrames inside a dict/list/tuple); 0 for anything else."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, dict):
+        return sum(frame_bytes(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(frame_bytes(value) for value in obj)
+    return 0
+
+
+def _mb(n_bytes: int) -> float:
+    return round(n_bytes / 2 ** 20, 2)
+
+
+def record_sample(session_state: MutableMapping) -> deque:
+    """
+    Appends this rerun's RSS and open figure count to the session's samples and returns them.
+    Cheap (one /proc read), so it can run on every rerun to keep the growth readout's baseline.
+    """
+    samples = session_state.get(_SAMPLES_KEY)
+    if samples is None:
+        samples = session_state[_SAMPLES_KEY] = deque(maxlen=SESSION_SAMPLES)
+    samples.append((time.time(), rss_bytes(), live_figure_count()))
+    return samples
+
+
+def memory_report(session_state: MutableMapping, session_id: Optional[str] = None,
+                  cached_bytes: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Records a sample for the current session and returns the accounting report. This walks
+    every DataFrame in session state, so call it only when the report is shown.
+
+    Args:
+        session_state: The session's state mapping (st.session_state); samples are kept in it.
+        session_id: Identifier shown in the report.
+        cached_bytes: Bytes held by each shared cache (frames, serialized figures), keyed by cache name.
+    """
+    global _last_logged
+
+    cached_bytes = cached_bytes or {}
+    samples = record_sample(session_state)
+    _, rss, figures = samples[-1]
+
+    session_frames = sum(frame_bytes(value) for key, value in session_state.items() if key != _SAMPLES_KEY)
+
+    report = {
+        'session_id': session_id,
+        'reruns_sampled': len(samples),
+        'rss_mb': _mb(rss),
+        'rss_growth_mb': _mb(rss - samples[0][1]),
+        'live_figures': figures,
+        'session_state_frames_mb': _mb(session_frames),
+        'caches_mb': {name: _mb(n_bytes) for name, n_bytes in cached_bytes.items()},
+    }
+
+    if MEMORY_LOG_INTERVAL and time.monotonic() - _last_logged >= MEMORY_LOG_INTERVAL:
+        _last_logged = time.monotonic()
+        print(f"[memory] rss={report['rss_mb']}MB figures={figures} "
+              f"caches={sum(cached_bytes.values()) / 2 ** 20:.2f}MB")
+
+    return report
@@ -0,0 +1,50 @@
+import importlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple
+
+
+@dataclass
+class PageContext:
+    """Everything a page renderer may use: lazily resolved datasets plus the sidebar selections."""
+    data: Any  # data_prefetch.PageData
+    engine: Any
+    selected_role: str
+    selected_split: str
+
+
+@dataclass(frozen=True)
+class PageSpec:
+    """
+    A sidebar page: where its renderer lives and which datasets it needs.
+
+    The renderer's module is only imported the first time the page is opened, so the
+    charting stack stays out of process startup.
+    """
+    title: str
+    module: str
+    renderer: str
+    datasets: Tuple[str, ...] = ()
+
+    def load(self) -> Callable[[PageContext], None]:
+        return getattr(importlib.import_module(self.module), self.renderer)
+
+
+# In sidebar order
+PAGES: Dict[str, PageSpec] = {page.title: page for page in [
+    PageSpec("Team Overview", 'team_overview', 'render_overview_page'),
+    PageSpec("Player Overview & Rankings", 'graphs.rankings', 'render_page', ('players',)),
+    PageSpec("Win/KDA & Games Analysis", 'graphs.bubble_chart', 'render_page', ('players',)),
+    PageSpec("Economic & Efficiency Charts", 'graphs.eff_chart', 'render_page', ('players',)),
+    PageSpec("Early Game & Vision Control", 'graphs.early_game_chart', 'render_page', ('players',)),
+    PageSpec("Similar Players", 'graphs.similar_players', 'render_page', ('players_similar',)),
+    PageSpec("Player Origins", 'graphs.misc', 'render_origins_page', ('players_all',)),
+    PageSpec("Other charts", 'graphs.misc', 'render_rankings_page', ('players',)),
+    PageSpec("Teams Page", 'graphs.team_charts', 'render_page', ('teams',)),
+    PageSpec("Team Comparison", 'graphs.compare_page', 'render_page', ('teams', 'ratings')),
+    # The default pool only; 'teams_all' is resolved on first access when that pool is picked
+    PageSpec("Team Playstyles", 'graphs.team_clusters', 'render_page', ('teams',)),
+    PageSpec("Head-to-Head Matrix", 'graphs.h2h_matrix', 'render_page', ('matches',)),
+    # 'matches' is resolved on first access, only when there are no ratings to simulate from
+    PageSpec("Pickems Analysis", 'pickems', 'render_page', ('players', 'ratings')),
+    PageSpec("Future Additions", 'team_overview', 'render_future_additions_page'),
+]}
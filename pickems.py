@@ -2,6 +2,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from sqlalchemy.engine import Engine
+from queries import fetch
+from data_loader import TEAM_MAP, WORLDS_PLAY_IN
+from leaderboard import get_leaderboards
+from schema import DATA_VERSION_ATTR
+from tournament_sim import (simulate_worlds, game_win_probabilities, win_probabilities_from_strengths, best_pickems,
+                            pickem_expected_score, PICKEM_SLOTS, SimulationResult)
 
 WORLDS_PLAYER_LIST = [
     'Faker', 'Chovy', 'Zeka', 'Bdd', 'Knight', 'Shanks', 'Creme', 'RooKie', 'Poby', 'Caps',
@@ -27,39 +33,12 @@ WORLDS_TEAM_LIST = [
 @st.cache_data
 def _load_team_data(_engine: Engine) -> pd.DataFrame:
     """Loads team data (game duration and average kills) from the database."""
-    team_list_str = "', '".join(WORLDS_TEAM_LIST)
-
     try:
         # Query 1: Average Game Duration and Region
-        query_duration = f"""
-        SELECT 
-            name, 
-            region,
-            AVG(game_duration) AS average_game_duration
-        FROM 
-            teams_staging
-        WHERE 
-            season = 'S15' 
-            AND name IN ('{team_list_str}')
-        GROUP BY 
-            name, region;
-        """
-        df_duration = pd.read_sql(query_duration, _engine)
+        df_duration = fetch(_engine, 'team_duration_by_season', ['S15', WORLDS_TEAM_LIST])
 
         # Query 2: Average Kills Per Game
-        query_kills = f"""
-        SELECT 
-            name, 
-            AVG(kills_per_game) AS average_kills_per_game 
-        FROM 
-            teams_staging
-        WHERE 
-            season = 'S15' 
-            AND name IN ('{team_list_str}')
-        GROUP BY 
-            name;
-        """
-        df_kills = pd.read_sql(query_kills, _engine)
+        df_kills = fetch(_engine, 'team_kills_by_season', ['S15', WORLDS_TEAM_LIST])
 
         # Merge the two dataframes on team name
         team_data = pd.merge(df_duration, df_kills, on='name', how='inner')
@@ -71,15 +50,20 @@ def _load_team_data(_engine: Engine) -> pd.DataFrame:
         return pd.DataFrame({'name': [], 'region': [], 'average_game_duration': [], 'average_kills_per_game': []})
 
 
-def _filter_and_display_top_players(df: pd.DataFrame, column: str, title: str, ascending: bool = False,
-                                    top_n: int = 10):
-    """Filters player DataFrame, displays top results, and generates a simple bar chart."""
-
-    #Filter the raw data to include only players in the pickems list
+def _pickems_players(df: pd.DataFrame) -> pd.DataFrame:
+    """The rows of the players in the pickems list, with their own data version for the leaderboard cache."""
     df_pickems = df[df['name'].isin(WORLDS_PLAYER_LIST)].copy()
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is not None:
+        df_pickems.attrs[DATA_VERSION_ATTR] = f"{version}/pickems"
+    return df_pickems
+
 
-    #Sort and select top N
-    df_top = df_pickems.sort_values(by=column, ascending=ascending).head(top_n)
+def _filter_and_display_top_players(df_pickems: pd.DataFrame, column: str, title: str, top_n: int = 10):
+    """Displays the top pickems players for a ranking metric and generates a simple bar chart."""
+
+    # Top N from the precomputed leaderboards (highest first)
+    df_top = get_leaderboards(df_pickems).top_players(column, top_n)
 
     st.subheader(f"📊 {title}")
 
@@ -104,7 +88,97 @@ def _filter_and_display_top_players(df: pd.DataFrame, column: str, title: str, a
     st.plotly_chart(fig)
 
 
-def show_pickems_page(df_players: pd.DataFrame, engine: Engine):
+SIMULATION_SIZES = [10_000, 100_000, 1_000_000]
+
+PICKEM_LABELS = {
+    'swiss_3_0': "3-0",
+    'swiss_0_3': "0-3",
+    'swiss_3_1_3_2': "3-1 / 3-2",
+}
+
+
+@st.cache_data(show_spinner="Simulating the tournament...")
+def _run_simulation(p_game: pd.DataFrame, n_sims: int) -> SimulationResult:
+    """Simulation results, cached per win-probability matrix and run size."""
+    return simulate_worlds(p_game, WORLDS_PLAY_IN, n_sims=n_sims, seed=0)
+
+
+def _simulation_probabilities(match_index, ratings):
+    """
+    Per-game win probabilities of the Worlds teams: from the all-league rating fit when there is
+    one, otherwise from each team's share of games won against the other Worlds teams.
+    Returns the matrix and a line describing its source, or (None, None) without match data.
+    """
+    if ratings is not None and not ratings.empty:
+        # Teams without a rated match are treated as average
+        strengths = ratings.strengths.reindex(TEAM_MAP).fillna(0.0)
+        return win_probabilities_from_strengths(strengths), \
+            f"Per-game win probabilities come from Bradley-Terry ratings fitted on {ratings.matches:,} matches across all leagues."
+    if match_index is not None and not match_index.empty:
+        return game_win_probabilities(match_index.matrix(TEAM_MAP).game_wins), \
+            "Per-game win probabilities come from each team's share of games won in its match history."
+    return None, None
+
+
+@st.fragment
+def show_tournament_simulator(match_index, ratings=None):
+    """
+    Monte Carlo simulation of the Swiss stage and bracket from the teams' match history,
+    with the pick'em that maximizes the expected score and the score of the user's own picks.
+    """
+    st.header("Tournament Simulator")
+    p_game, source = _simulation_probabilities(match_index, ratings)
+    if p_game is None:
+        st.warning("No match history was loaded from 'matches_staging'; the simulator needs it for win probabilities.")
+        return
+
+    n_sims = st.select_slider("Simulated tournaments:", options=SIMULATION_SIZES, value=100_000,
+                              format_func=lambda n: f"{n:,}")
+    result = _run_simulation(p_game, n_sims)
+
+    st.caption(f"{source} Swiss rounds pair teams on the same record at random.")
+    st.dataframe(
+        result.probabilities.drop(columns=['swiss']).rename(columns={
+            'swiss_3_0': '3-0', 'swiss_3_1_3_2': '3-1/3-2', 'swiss_0_3': '0-3',
+            'quarterfinal': 'Quarterfinal', 'semifinal': 'Semifinal', 'final': 'Final', 'champion': 'Champion',
+        }).style.format("{:.1%}")
+    )
+
+    fig = px.bar(
+        result.probabilities.reset_index(names='team'),
+        x='team',
+        y='champion',
+        title=f'Title Probability ({n_sims:,} simulations)',
+        labels={'team': 'Team', 'champion': 'Title Probability'}
+    )
+    fig.update_layout(xaxis={'categoryorder': 'total descending'}, yaxis_tickformat='.0%')
+    st.plotly_chart(fig)
+
+    # --- Pick'em ---
+    best = best_pickems(result)
+    st.subheader("Best Swiss Pick'em")
+    cols = st.columns(len(PICKEM_SLOTS))
+    for col, (outcome, teams) in zip(cols, best.items()):
+        with col:
+            st.markdown(f"**{PICKEM_LABELS[outcome]}**")
+            st.markdown("\n".join(f"- {team}" for team in teams))
+    st.metric("Expected correct picks", f"{pickem_expected_score(result, best):.2f} / {sum(PICKEM_SLOTS.values())}")
+
+    st.subheader("Score Your Own Picks")
+    cols = st.columns(len(PICKEM_SLOTS))
+    picks = {}
+    for col, (outcome, slots) in zip(cols, PICKEM_SLOTS.items()):
+        with col:
+            picks[outcome] = st.multiselect(f"{PICKEM_LABELS[outcome]} ({slots}):", list(result.probabilities.index),
+                                            max_selections=slots, key=f'pickem_{outcome}')
+    picked = [team for teams in picks.values() for team in teams]
+    if len(picked) != len(set(picked)):
+        st.warning("A team can only be picked for one outcome.")
+    elif picked:
+        st.metric("Expected correct picks (yours)", f"{pickem_expected_score(result, picks):.2f}")
+
+
+def show_pickems_page(df_players: pd.DataFrame, engine: Engine, match_index=None, ratings=None):
     """Renders the Pickems Analysis page with data-driven insights."""
 
     st.title("🏆 Worlds 2025 Pickems Analysis")
@@ -120,9 +194,12 @@ def show_pickems_page(df_players: pd.DataFrame, engine: Engine):
     #Player-Focused Aggression & Efficiency
     st.header("Player Analysis: Aggression and Consistency")
 
+    #Filter the raw data to include only players in the pickems list
+    df_pickems = _pickems_players(df_players)
+
     # Most First Bloods (FB%)
     _filter_and_display_top_players(
-        df_players,
+        df_pickems,
         column='fb_pct',
         title='First Blood Percentage (FB%)',
         top_n=8
@@ -132,7 +209,7 @@ def show_pickems_page(df_players: pd.DataFrame, engine: Engine):
 
     # Best KDA
     _filter_and_display_top_players(
-        df_players,
+        df_pickems,
         column='kda',
         title='Kill-Death-Assist Ratio (KDA)',
         top_n=8
@@ -145,7 +222,7 @@ def show_pickems_page(df_players: pd.DataFrame, engine: Engine):
     with col1:
         # Average Kills
         _filter_and_display_top_players(
-            df_players,
+            df_pickems,
             column='avg_kills',
             title='Average Kills Per Game',
             top_n=5
@@ -153,8 +230,7 @@ def show_pickems_page(df_players: pd.DataFrame, engine: Engine):
 
     with col2:
         # Penta Kills
-        df_penta = df_players[df_players['name'].isin(WORLDS_PLAYER_LIST)].copy()
-        df_penta = df_penta[df_penta['penta_kills'] > 0]
+        df_penta = df_pickems[df_pickems['penta_kills'] > 0]
 
         st.subheader("📊 Penta Kills")
         if df_penta.empty:
@@ -211,6 +287,10 @@ def show_pickems_page(df_players: pd.DataFrame, engine: Engine):
         st.warning("Team data could not be loaded from the database. Displaying player analysis only.")
     st.markdown("---")
 
+    show_tournament_simulator(match_index, ratings)
+
+    st.markdown("---")
+
     #Pickems Final Decision
     st.header("Final Pickems Decision")
 
@@ -228,4 +308,13 @@ def show_pickems_page(df_players: pd.DataFrame, engine: Engine):
     st.subheader("My Pickems Screenshot")
     st.image("images/pickems.png")
 
-    st.markdown("---")
\ No newline at end of file
+    st.markdown("---")
+
+
+def render_page(ctx):
+    """Pickems Analysis page."""
+    st.header("My Pickems")
+    ratings = ctx.data['ratings']
+    # Match history is only the fallback source of win probabilities, so it is loaded only without ratings
+    match_index = ctx.data['matches'] if ratings is None or ratings.empty else None
+    show_pickems_page(ctx.data['players'], ctx.engine, match_index, ratings)
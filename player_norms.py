@@ -0,0 +1,65 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from schema import PLAYER_SCHEMA
+
+# Peer groups a player's stats are normalized within, by column suffix. Rows of different
+# splits are never compared with each other.
+NORM_GROUPS: Dict[str, Tuple[str, ...]] = {
+    'role': ('split', 'role'),
+    'league': ('split', 'league'),
+}
+NORM_KINDS = ('pct', 'z')
+
+
+def numeric_player_columns(df: pd.DataFrame) -> List[str]:
+    """The numeric PLAYER_SCHEMA columns present in df, in schema order."""
+    return [col for col, dtype in PLAYER_SCHEMA.items()
+            if dtype != 'category' and col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+
+
+def norm_column(column: str, group: str, kind: str) -> str:
+    """Name of a precomputed column, e.g. norm_column('gpm', 'role', 'pct') -> 'gpm_role_pct'."""
+    return f"{column}_{group}_{kind}"
+
+
+def group_norms(df: pd.DataFrame, columns: Sequence[str], by: Sequence[str], group: str) -> pd.DataFrame:
+    """
+    Percentile (share of the group at or below the value, 0-1) and z-score of every column
+    within the groups of `by`, for all columns at once. Missing values stay missing; a group
+    whose values are all equal gets a z-score of 0.
+    """
+    values = df[list(columns)].astype(np.float64)
+    grouped = values.groupby([df[key] for key in by], observed=True, sort=False)
+
+    pct = grouped.rank(method='max', pct=True)
+    std = grouped.transform('std')
+    z = (values - grouped.transform('mean')) / std.where(std > 0)
+    z = z.mask(z.isna() & values.notna(), 0.0)
+
+    pct.columns = [norm_column(col, group, 'pct') for col in columns]
+    z.columns = [norm_column(col, group, 'z') for col in columns]
+    return pd.concat([pct, z], axis=1).astype(np.float32)
+
+
+def compute_player_norms(df: pd.DataFrame, names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Per-role and per-league percentiles and z-scores of the numeric player columns, aligned
+    with df. With names, only those norm columns (see norm_column) are returned, and only the
+    groupbys they need are run; unknown names are ignored.
+    """
+    columns = numeric_player_columns(df)
+    frames = []
+    for group, by in NORM_GROUPS.items():
+        if not set(by).issubset(df.columns):
+            continue
+        wanted = columns if names is None else \
+            [col for col in columns if any(norm_column(col, group, kind) in names for kind in NORM_KINDS)]
+        if wanted:
+            frames.append(group_norms(df, wanted, by, group))
+    if not frames or df.empty:
+        return pd.DataFrame(index=df.index)
+    norms = pd.concat(frames, axis=1)
+    return norms if names is None else norms[[name for name in dict.fromkeys(names) if name in norms.columns]]
@@ -0,0 +1,127 @@
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from schema import DATA_VERSION_ATTR
+from player_norms import norm_column
+from derived_metrics import with_metrics, PLAYER_METRICS
+
+# Per-game and per-minute stats describing how a player plays (rates from derived_metrics rather than totals)
+SIMILARITY_FEATURES = ('kda', 'avg_kills', 'avg_deaths', 'avg_assists', 'gpm', 'kp', 'csm', 'dpm', 'dmg_pct',
+                       'gd15', 'csd15', 'xpd15', 'vspm', 'wpm', 'solo_kills_per_game')
+SIMILAR_PLAYERS = 10
+# Per-role z-scores of the features, for views built for similarity search (SeasonSnapshot.view(norms=...))
+SIMILARITY_NORMS = tuple(norm_column(feature, 'role', 'z') for feature in SIMILARITY_FEATURES)
+
+
+class SimilarityIndex:
+    """
+    k-nearest-neighbour search over player stat vectors.
+
+    Every feature is z-scored within the player's role, so a support is compared with other
+    supports' spread rather than with carries' damage numbers; missing stats count as the role
+    average. The normalized matrix and its squared row norms are kept in float32, and a query
+    is one matrix-vector product plus a partial selection of the k smallest distances.
+    """
+
+    def __init__(self, df: pd.DataFrame, features: Sequence[str] = SIMILARITY_FEATURES):
+        self.df = df.reset_index(drop=True)
+        frame = with_metrics(df, [feature for feature in features if feature in PLAYER_METRICS]).reset_index(drop=True)
+        self.features = [feature for feature in features if feature in frame.columns]
+
+        roles = frame['role'].astype(str) if 'role' in frame.columns else pd.Series('All', index=frame.index)
+        # Per-role z-scores a snapshot view carries (SIMILARITY_NORMS) are reused; the rest, such as those of
+        # derived metrics, is computed here
+        z = pd.DataFrame(index=frame.index)
+        for feature in self.features:
+            if norm_column(feature, 'role', 'z') in frame.columns:
+                z[feature] = frame[norm_column(feature, 'role', 'z')].astype('float64')
+        missing = [feature for feature in self.features if feature not in z.columns]
+        if missing:
+            values = frame[missing].astype('float64')
+            grouped = values.groupby(roles)
+            std = grouped.transform('std').replace(0, np.nan)
+            z = z.join((values - grouped.transform('mean')) / std)
+        z = z[self.features].fillna(0.0)
+
+        self.z = z.to_numpy(dtype=np.float32)
+        self.roles = roles.to_numpy()
+        # Integer role codes, so a same-role filter is an integer comparison
+        codes, names = pd.factorize(self.roles)
+        self._role_codes, self._role_names = codes, pd.Index(names)
+        self._norms = np.einsum('ij,ij->i', self.z, self.z)
+        self._positions = {name: i for i, name in reversed(list(enumerate(self.df['name'].astype(str))))}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def position(self, name: str) -> Optional[int]:
+        """Row of the player (the first one if the name repeats), or None."""
+        return self._positions.get(name)
+
+    def nearest(self, vector: np.ndarray, k: int = SIMILAR_PLAYERS, role: Optional[str] = None,
+                exclude: Optional[int] = None) -> pd.DataFrame:
+        """
+        The k rows closest to a normalized feature vector, nearest first, with their 'distance'
+        (Euclidean, in role standard deviations) and 'similarity' (1 / (1 + distance)).
+        role restricts the search to one role; exclude drops one row (the query player).
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        distances = self._norms - 2 * (self.z @ vector) + vector @ vector
+        if role is not None:
+            code = self._role_names.get_indexer([role])[0]
+            distances = np.where(self._role_codes == code, distances, np.inf)
+        if exclude is not None:
+            distances[exclude] = np.inf
+
+        k = min(k, int(np.isfinite(distances).sum()))
+        if k <= 0:
+            return self.df.iloc[:0].assign(distance=[], similarity=[])
+        candidates = np.argpartition(distances, k - 1)[:k]
+        order = candidates[np.argsort(distances[candidates], kind='stable')]
+        distance = np.sqrt(np.maximum(distances[order], 0.0))
+        return self.df.take(order).assign(distance=distance, similarity=1 / (1 + distance))
+
+    def similar_players(self, name: str, k: int = SIMILAR_PLAYERS, same_role: bool = True) -> pd.DataFrame:
+        """The k players whose stat profile is closest to name's (empty if name is unknown)."""
+        position = self.position(name)
+        if position is None:
+            return self.df.iloc[:0].assign(distance=[], similarity=[])
+        role = self.roles[position] if same_role else None
+        return self.nearest(self.z[position], k, role=role, exclude=position)
+
+    def profile(self, names: Sequence[str]) -> pd.DataFrame:
+        """Normalized feature values of the given players, one row per player."""
+        positions = [self.position(name) for name in names]
+        kept = [(name, p) for name, p in zip(names, positions) if p is not None]
+        return pd.DataFrame(self.z[[p for _, p in kept]], index=[name for name, _ in kept], columns=self.features)
+
+
+_indexes: LRUCache = LRUCache(maxsize=16)
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index(df: pd.DataFrame) -> SimilarityIndex:
+    """
+    Similarity index over df, built once per data version.
+    Frames without a version token are indexed on every call.
+    """
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        return SimilarityIndex(df)
+
+    with _indexes_lock:
+        index = _indexes.get(version)
+    if index is None:
+        index = SimilarityIndex(df)
+        with _indexes_lock:
+            _indexes[version] = index
+    return index
+
+
+def find_similar_players(df: pd.DataFrame, name: str, k: int = SIMILAR_PLAYERS, same_role: bool = True) -> pd.DataFrame:
+    """Players like `name` in df: see SimilarityIndex.similar_players."""
+    return get_similarity_index(df).similar_players(name, k, same_role)
@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+
+@dataclass(frozen=True)
+class Statement:
+    """A named, parameterised SQL statement. Parameters use Postgres positional syntax ($1, $2, ...)."""
+    name: str
+    sql: str
+    param_types: Tuple[str, ...]
+
+
+# Every loader query goes through this registry so the statement text is constant per name
+STATEMENTS: Dict[str, Statement] = {stmt.name: stmt for stmt in [
+    Statement(
+        name='players_by_season',
+        sql="SELECT * FROM players_staging WHERE season = $1 AND name = ANY($2)",
+        param_types=('text', 'text[]'),
+    ),
+    Statement(
+        name='teams_by_split',
+        sql="SELECT * FROM teams_staging WHERE season = $1 AND split = $2 AND name = ANY($3)",
+        param_types=('text', 'text', 'text[]'),
+    ),
+    Statement(
+        name='all_teams_by_split',
+        sql="SELECT * FROM teams_staging WHERE season = $1 AND split = $2",
+        param_types=('text', 'text'),
+    ),
+    Statement(
+        name='matches_by_winner',
+        sql="SELECT * FROM matches_staging WHERE winner = ANY($1)",
+        param_types=('text[]',),
+    ),
+    Statement(
+        # Every result, for the team rating fit (ratings.py)
+        name='match_results',
+        sql="SELECT team1, team2, team1_score, team2_score, date FROM matches_staging",
+        param_types=(),
+    ),
+    Statement(
+        # Served by ix_matches_staging_pair_date (see INDEX_DEFINITIONS). $1 <= $2 must hold in
+        # code point order, which is what the "C" collation compares by (same as match_index.pair_key).
+        name='head_to_head',
+        sql="""
+            SELECT * FROM matches_staging
+            WHERE LEAST(team1 COLLATE "C", team2 COLLATE "C") = $1
+            AND GREATEST(team1 COLLATE "C", team2 COLLATE "C") = $2
+            ORDER BY date DESC
+            LIMIT $3
+        """,
+        param_types=('text', 'text', 'integer'),
+    ),
+    Statement(
+        # The last $2 meetings of every pair among the teams in $1, ranked per unordered pair like head_to_head
+        name='head_to_head_group',
+        sql="""
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY LEAST(team1 COLLATE "C", team2 COLLATE "C"),
+                                 GREATEST(team1 COLLATE "C", team2 COLLATE "C")
+                    ORDER BY date DESC
+                ) AS pair_rank
+                FROM matches_staging
+                WHERE team1 = ANY($1) AND team2 = ANY($1)
+            ) ranked
+            WHERE pair_rank <= $2
+        """,
+        param_types=('text[]', 'integer'),
+    ),
+    Statement(
+        name='team_duration_by_season',
+        sql="""
+            SELECT name, region, AVG(game_duration) AS average_game_duration
+            FROM teams_staging
+            WHERE season = $1 AND name = ANY($2)
+            GROUP BY name, region
+        """,
+        param_types=('text', 'text[]'),
+    ),
+    Statement(
+        name='team_kills_by_season',
+        sql="""
+            SELECT name, AVG(kills_per_game) AS average_kills_per_game
+            FROM teams_staging
+            WHERE season = $1 AND name = ANY($2)
+            GROUP BY name
+        """,
+        param_types=('text', 'text[]'),
+    ),
+]}
+
+# Supporting indexes for the statements above. Not created automatically: run create_indexes() once
+# with a role that may create indexes on the staging tables.
+INDEX_DEFINITIONS = [
+    # Unordered team pair + recency, so head_to_head is an index range scan regardless of which side is team1
+    "CREATE INDEX IF NOT EXISTS ix_matches_staging_pair_date "
+    "ON matches_staging (LEAST(team1 COLLATE \"C\", team2 COLLATE \"C\"), "
+    "GREATEST(team1 COLLATE \"C\", team2 COLLATE \"C\"), date DESC)",
+]
+
+# Expression whose MAX() moves when a table receives new data, used next to COUNT(*) as its change watermark.
+# An empty setting means row count only (see data_cache.COUNT_ONLY_TTL). teams_staging is refreshed in place
+# with the same rows, so its default is the row version: xmin changes on every insert and update.
+WATERMARK_COLUMNS: Dict[str, Optional[str]] = {
+    'teams_staging': os.getenv('TEAMS_WATERMARK_COLUMN', 'xmin::text::bigint') or None,
+    'matches_staging': os.getenv('MATCHES_WATERMARK_COLUMN', 'date'),
+}
+
+
+# Full-table reads used by the snapshot export (snapshot_store.py)
+for _table in ['players_staging', 'teams_staging', 'matches_staging']:
+    STATEMENTS[f"dump_{_table}"] = Statement(name=f"dump_{_table}", sql=f"SELECT * FROM {_table}", param_types=())
+
+
+def watermark_statement_name(table: str) -> str:
+    return f"watermark_{table}"
+
+
+for _table, _column in WATERMARK_COLUMNS.items():
+    STATEMENTS[watermark_statement_name(_table)] = Statement(
+        name=watermark_statement_name(_table),
+        sql=f"SELECT COUNT(*) AS row_count, {f'MAX({_column})' if _column else 'NULL'} AS max_marker FROM {_table}",
+        param_types=(),
+    )
+
+# Retries apply to dropped/invalidated connections only, never to SQL errors
+MAX_RETRIES = int(os.getenv('DB_QUERY_RETRIES', '2'))
+RETRY_BACKOFF = float(os.getenv('DB_QUERY_RETRY_BACKOFF', '0.2'))  # seconds, doubled per attempt
+
+_PREPARED_KEY = 'prepared_statements'
+
+_timings_lock = threading.Lock()
+_timings: Dict[str, Dict[str, float]] = {}
+
+
+def _record(name: str, elapsed: float = 0.0, error: bool = False, retry: bool = False):
+    with _timings_lock:
+        stats = _timings.setdefault(name, {'calls': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        if error:
+            stats['errors'] += 1
+        elif retry:
+            stats['retries'] += 1
+        else:
+            stats['calls'] += 1
+            stats['total_ms'] += elapsed * 1000
+            stats['max_ms'] = max(stats['max_ms'], elapsed * 1000)
+
+
+def query_stats() -> Dict[str, Dict[str, float]]:
+    """Per-statement call counts and latencies (ms) since process start."""
+    with _timings_lock:
+        return {
+            name: {**stats, 'avg_ms': round(stats['total_ms'] / stats['calls'], 2) if stats['calls'] else 0.0}
+            for name, stats in _timings.items()
+        }
+
+
+def _execute_prepared(dbapi_conn, stmt: Statement, params: Sequence) -> pd.DataFrame:
+    """
+    Runs stmt as a server-side prepared statement on one pooled DBAPI connection.
+
+    PREPARE is issued once per physical connection; the set of prepared names lives in
+    the pool's per-connection info dict, which SQLAlchemy clears when the connection is
+    invalidated or recycled.
+    """
+    prepared = dbapi_conn.info.setdefault(_PREPARED_KEY, set())
+    cursor = dbapi_conn.cursor()
+    try:
+        if stmt.name not in prepared:
+            types = f" ({', '.join(stmt.param_types)})" if stmt.param_types else ""
+            cursor.execute(f"PREPARE {stmt.name}{types} AS {stmt.sql}")
+            prepared.add(stmt.name)
+
+        if params:
+            placeholders = ', '.join(['%s'] * len(params))
+            # psycopg2 adapts Python lists to Postgres arrays, matching the text[] parameters
+            cursor.execute(f"EXECUTE {stmt.name} ({placeholders})", [list(p) if isinstance(p, tuple) else p for p in params])
+        else:
+            cursor.execute(f"EXECUTE {stmt.name}")
+        columns = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def fetch(engine: Engine, statement_name: str, params: Sequence) -> pd.DataFrame:
+    """
+    Executes a registered statement with bound parameters and returns the result as a DataFrame.
+
+    Args:
+        engine: The pooled SQLAlchemy engine, or any other data source exposing
+            fetch(statement_name, params) (e.g. snapshot_store.SnapshotStore).
+        statement_name: Key in STATEMENTS.
+        params: Positional parameter values; lists are sent as arrays.
+
+    Raises:
+        The underlying database error once retries are exhausted.
+    """
+    if not isinstance(engine, Engine):
+        start = time.perf_counter()
+        frame = engine.fetch(statement_name, params)
+        _record(statement_name, time.perf_counter() - start)
+        return frame
+
+    stmt = STATEMENTS[statement_name]
+    dbapi = engine.dialect.dbapi
+    # Connection-level failures (dropped socket, server restart); SQL errors are not retried
+    connection_errors = (OperationalError, dbapi.OperationalError, dbapi.InterfaceError)
+
+    for attempt in range(MAX_RETRIES + 1):
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                try:
+                    frame = _execute_prepared(conn.connection, stmt, params)
+                except (dbapi.OperationalError, dbapi.InterfaceError):
+                    # The raw cursor bypasses SQLAlchemy's disconnect handling, so drop the connection here
+                    conn.invalidate()
+                    raise
+        except connection_errors:
+            if attempt == MAX_RETRIES:
+                _record(statement_name, error=True)
+                raise
+            _record(statement_name, retry=True)
+            time.sleep(RETRY_BACKOFF * (2 ** attempt))
+            continue
+        except Exception:
+            _record(statement_name, error=True)
+            raise
+
+        _record(statement_name, time.perf_counter() - start)
+        return frame
+
+
+def create_indexes(engine: Engine):
+    """Creates the indexes in INDEX_DEFINITIONS if they do not exist yet."""
+    with engine.begin() as conn:
+        for ddl in INDEX_DEFINITIONS:
+            conn.exec_driver_sql(ddl)
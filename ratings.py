@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Pseudo-games every team plays (half won, half lost) against a rating-0 opponent. Keeps teams
+# without a win or a loss finite and anchors leagues that never met anyone else.
+RATING_PRIOR_GAMES = 2.0
+RATING_TOLERANCE = 1e-6
+RATING_MAX_ITERATIONS = 2000
+RATING_METHODS = ('bradley_terry', 'massey')
+
+
+def _pair_counts(df_matches: pd.DataFrame, teams: pd.Index) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Games won by each side of every team pair, summed over all their series.
+    Returns (i, j, wins_i, wins_j) with i < j as positions in teams.
+    """
+    i = teams.get_indexer(df_matches['team1'].astype(str))
+    j = teams.get_indexer(df_matches['team2'].astype(str))
+    wins_1 = pd.to_numeric(df_matches['team1_score'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    wins_2 = pd.to_numeric(df_matches['team2_score'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    keep = (i != j) & (wins_1 + wins_2 > 0)
+    i, j, wins_1, wins_2 = i[keep], j[keep], wins_1[keep], wins_2[keep]
+
+    swap = i > j
+    low, high = np.where(swap, j, i), np.where(swap, i, j)
+    wins_low, wins_high = np.where(swap, wins_2, wins_1), np.where(swap, wins_1, wins_2)
+
+    # One row per pair
+    pair = low.astype(np.int64) * len(teams) + high
+    unique, inverse = np.unique(pair, return_inverse=True)
+    return (unique // len(teams)).astype(np.intp), (unique % len(teams)).astype(np.intp), \
+        np.bincount(inverse, weights=wins_low, minlength=len(unique)), \
+        np.bincount(inverse, weights=wins_high, minlength=len(unique))
+
+
+def _solve_laplacian(n_teams: int, i: np.ndarray, j: np.ndarray, weights: np.ndarray, diagonal: np.ndarray,
+                     b: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Solves (L + diag(diagonal)) x = b, where L is the Laplacian of the pair graph with the given
+    edge weights, by Jacobi-preconditioned conjugate gradient starting from x. Products with the
+    matrix are two bincounts over the pair list, so the matrix is never formed.
+    """
+    def apply(v: np.ndarray) -> np.ndarray:
+        flow = weights * (v[i] - v[j])
+        return diagonal * v + np.bincount(i, weights=flow, minlength=n_teams) \
+            - np.bincount(j, weights=flow, minlength=n_teams)
+
+    precondition = diagonal + np.bincount(i, weights=weights, minlength=n_teams) \
+        + np.bincount(j, weights=weights, minlength=n_teams)
+    x = x.copy()
+    r = b - apply(x)
+    z = r / precondition
+    p = z.copy()
+    rz = r @ z
+    tolerance = RATING_TOLERANCE * max(np.linalg.norm(b), 1.0)
+    for iteration in range(RATING_MAX_ITERATIONS):
+        if np.linalg.norm(r) < tolerance:
+            return x, iteration
+        ap = apply(p)
+        alpha = rz / (p @ ap)
+        x += alpha * p
+        r -= alpha * ap
+        z = r / precondition
+        rz_next = r @ z
+        p = z + (rz_next / rz) * p
+        rz = rz_next
+    return x, RATING_MAX_ITERATIONS
+
+
+def _fit_bradley_terry(n_teams: int, i: np.ndarray, j: np.ndarray, wins_i: np.ndarray, wins_j: np.ndarray,
+                       init: Optional[np.ndarray], prior_games: float) -> Tuple[np.ndarray, int]:
+    """
+    Bradley-Terry log-strengths by Newton's method. The Hessian of the log-likelihood has the
+    same pair-graph structure as the Massey system, so each Newton step is one sparse solve.
+    Every team also plays prior_games, half of them won, against a strength-0 opponent.
+    """
+    games = wins_i + wins_j
+    won = np.bincount(i, weights=wins_i, minlength=n_teams) + np.bincount(j, weights=wins_j, minlength=n_teams)
+    x = init.copy() if init is not None else np.zeros(n_teams)
+
+    solves = 0
+    for _ in range(RATING_MAX_ITERATIONS):
+        p_pair = 1 / (1 + np.exp(x[j] - x[i]))
+        p_prior = 1 / (1 + np.exp(-x))
+        expected_i = games * p_pair
+        gradient = won + prior_games / 2 - prior_games * p_prior \
+            - np.bincount(i, weights=expected_i, minlength=n_teams) \
+            - np.bincount(j, weights=games - expected_i, minlength=n_teams)
+        if np.abs(gradient).max() < RATING_TOLERANCE:
+            break
+        step, iterations = _solve_laplacian(n_teams, i, j, games * p_pair * (1 - p_pair),
+                                            prior_games * p_prior * (1 - p_prior), gradient, np.zeros(n_teams))
+        x += step
+        solves += iterations
+    return x, solves
+
+
+def _fit_massey(n_teams: int, i: np.ndarray, j: np.ndarray, wins_i: np.ndarray, wins_j: np.ndarray,
+                init: Optional[np.ndarray], prior_games: float) -> Tuple[np.ndarray, int]:
+    """
+    Massey ratings: least squares fit of rating_i - rating_j to the per-game margin of every
+    pair, weighted by games played, with prior_games of margin 0 against a rating-0 team.
+    """
+    games = wins_i + wins_j
+    margin = wins_i - wins_j
+    b = np.bincount(i, weights=margin, minlength=n_teams) - np.bincount(j, weights=margin, minlength=n_teams)
+    x0 = init if init is not None else np.zeros(n_teams)
+    return _solve_laplacian(n_teams, i, j, games, np.full(n_teams, prior_games), b, x0)
+
+
+_SOLVERS = {'bradley_terry': _fit_bradley_terry, 'massey': _fit_massey}
+
+
+@dataclass(frozen=True)
+class TeamRatings:
+    """
+    Fitted team strengths. ratings is indexed by team with columns rating, games, game_wins;
+    for Bradley-Terry a rating is a log-strength (P(a beats b in a game) is the logistic of
+    the difference), for Massey the expected per-game margin against a rating-0 team.
+    iterations counts conjugate gradient steps.
+    """
+    ratings: pd.DataFrame
+    method: str
+    iterations: int
+    matches: int
+
+    @property
+    def empty(self) -> bool:
+        return self.ratings.empty
+
+    def nbytes(self) -> int:
+        """Deep size of the ratings frame."""
+        return int(self.ratings.memory_usage(deep=True).sum())
+
+    @property
+    def strengths(self) -> pd.Series:
+        return self.ratings['rating']
+
+    def win_probability(self, team_a: str, team_b: str) -> Optional[float]:
+        """Bradley-Terry probability that team_a wins a game against team_b (None if either is unrated)."""
+        if self.method != 'bradley_terry' or team_a not in self.ratings.index or team_b not in self.ratings.index:
+            return None
+        return float(1 / (1 + np.exp(self.strengths[team_b] - self.strengths[team_a])))
+
+
+def fit_ratings(df_matches: pd.DataFrame, method: str = 'bradley_terry', previous: Optional[TeamRatings] = None,
+                prior_games: float = RATING_PRIOR_GAMES) -> TeamRatings:
+    """
+    Fits a rating for every team in df_matches (columns team1, team2, team1_score, team2_score)
+    from the games won by each side, across all leagues at once, so international meetings
+    carry strength between regions.
+
+    Pass the ratings of an earlier fit as previous to refit incrementally after new matches
+    arrive: the solver starts from the old ratings (new teams start at 0), which are already
+    close to the new solution, and needs far fewer iterations.
+    """
+    if method not in _SOLVERS:
+        raise ValueError(f"Unknown rating method '{method}', expected one of {RATING_METHODS}")
+    if df_matches.empty or not {'team1', 'team2', 'team1_score', 'team2_score'}.issubset(df_matches.columns):
+        empty = pd.DataFrame({'rating': [], 'games': [], 'game_wins': []}, index=pd.Index([], name='team'))
+        return TeamRatings(empty, method, 0, 0)
+
+    teams = pd.Index(pd.unique(np.r_[df_matches['team1'].astype(str), df_matches['team2'].astype(str)]), name='team')
+    i, j, wins_i, wins_j = _pair_counts(df_matches, teams)
+
+    init = None
+    if previous is not None and previous.method == method and not previous.ratings.empty:
+        init = previous.strengths.reindex(teams).fillna(0).to_numpy(dtype=np.float64)
+    rating, iterations = _SOLVERS[method](len(teams), i, j, wins_i, wins_j, init, prior_games)
+
+    games = np.bincount(i, weights=wins_i + wins_j, minlength=len(teams)) + \
+        np.bincount(j, weights=wins_i + wins_j, minlength=len(teams))
+    game_wins = np.bincount(i, weights=wins_i, minlength=len(teams)) + np.bincount(j, weights=wins_j, minlength=len(teams))
+    ratings = pd.DataFrame({'rating': rating, 'games': games.astype(np.int64), 'game_wins': game_wins.astype(np.int64)},
+                           index=teams)
+    return TeamRatings(ratings.sort_values('rating', ascending=False), method, iterations, len(df_matches))
@@ -0,0 +1,91 @@
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from typing import Dict
+
+# Declared dtypes for the loaded frames. Identifiers repeat on every row (and across every
+# cached role/split view), so they are stored as categoricals; counts fit in small ints and
+# rates do not need float64 precision.
+PLAYER_SCHEMA: Dict[str, str] = {
+    'name': 'category',
+    'season': 'category',
+    'split': 'category',
+    'country': 'category',
+    'team_name': 'category',
+    'league': 'category',
+    'role': 'category',
+    'games': 'int16',
+    'solo_kills': 'int16',
+    'penta_kills': 'int16',
+    'winrate': 'float32',
+    'kda': 'float32',
+    'avg_kills': 'float32',
+    'avg_deaths': 'float32',
+    'avg_assists': 'float32',
+    'gpm': 'float32',
+    'kp': 'float32',
+    'csm': 'float32',
+    'dpm': 'float32',
+    'gd15': 'float32',
+    'csd15': 'float32',
+    'xpd15': 'float32',
+    'vspm': 'float32',
+    'fb_pct': 'float32',
+    'dmg_pct': 'float32',
+    'wpm': 'float32',
+    'impact_score': 'float32',
+}
+
+TEAM_SCHEMA: Dict[str, str] = {
+    'name': 'category',
+    'season': 'category',
+    'split': 'category',
+    'region': 'category',
+    'games': 'int16',
+    'game_duration': 'float32',
+    'kills_per_game': 'float32',
+    'deaths_per_game': 'float32',
+    'fb_pct': 'float32',
+    'ft_pct': 'float32',
+    'gd_at15': 'float32',
+    'td_at15': 'float32',
+    'fos_pct': 'float32',
+    'atak_pct': 'float32',
+    'drag_pct': 'float32',
+    'baron_pct': 'float32',
+    'dpm': 'float32',
+    'gpm': 'float32',
+    'cspm': 'float32',
+    'gdm': 'float32',
+    'baron_per_game': 'float32',
+    'drags_per_game': 'float32',
+    'plates_per_game': 'float32',
+    'vg_per_game': 'float32',
+}
+
+# Key in DataFrame.attrs naming the data a frame was built from (which load, role, split).
+# It changes whenever the underlying rows can change, so caches can key on it instead of hashing the frame.
+DATA_VERSION_ATTR = 'data_version'
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str], fill_value=0) -> pd.DataFrame:
+    """
+    Casts the columns of df that appear in schema, in one assign.
+
+    Numeric targets are coerced first only when the column did not arrive numeric
+    (e.g. text columns in the staging tables); unparseable values and NaNs become fill_value.
+    Columns missing from df are ignored, columns missing from schema are left untouched.
+    """
+    conversions = {}
+    for col, dtype in schema.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+
+        series = df[col]
+        if dtype == 'category':
+            conversions[col] = series.astype('category')
+        else:
+            if not is_numeric_dtype(series):
+                series = pd.to_numeric(series, errors='coerce')
+            conversions[col] = series.fillna(fill_value).astype(dtype)
+
+    return df.assign(**conversions) if conversions else df
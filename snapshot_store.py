@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from queries import fetch
+
+# 'postgres' (default) or 'snapshot'
+DATA_SOURCE = os.getenv('DATA_SOURCE', 'postgres').lower()
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+# Empty means the version recorded in SNAPSHOT_DIR/LATEST
+SNAPSHOT_VERSION = os.getenv('SNAPSHOT_VERSION', '')
+
+SNAPSHOT_TABLES = ['players_staging', 'teams_staging', 'matches_staging']
+TEAM_MAP_TABLE = 'player_team_names'
+TEAM_MAP_CSV = 'player_team_names.csv'
+
+MANIFEST_FILE = 'manifest.json'
+LATEST_FILE = 'LATEST'
+
+
+def _write_table(table: pa.Table, directory: Path, name: str) -> Dict[str, Any]:
+    """Writes one table as zstd Parquet (archival/interchange) and uncompressed Arrow IPC (memory-mappable)."""
+    pq.write_table(table, directory / f"{name}.parquet", compression='zstd')
+    # Uncompressed so readers can map the buffers straight from the page cache
+    with pa.OSFile(str(directory / f"{name}.arrow"), 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return {'rows': table.num_rows, 'columns': table.schema.names}
+
+
+def export_snapshot(engine, out_dir: str = SNAPSHOT_DIR, version: Optional[str] = None) -> Path:
+    """
+    Exports the staging tables and player_team_names.csv into out_dir/<version>/ and
+    points out_dir/LATEST at it.
+
+    The version directory is written under a temporary name and renamed at the end,
+    so readers never see a half-written snapshot.
+    """
+    version = version or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    root = Path(out_dir)
+    final_dir = root / version
+    if final_dir.exists():
+        raise FileExistsError(f"Snapshot version '{version}' already exists in {root}")
+
+    tmp_dir = root / f".{version}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    manifest = {
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'tables': {},
+    }
+    try:
+        for table_name in SNAPSHOT_TABLES:
+            df = fetch(engine, f"dump_{table_name}", [])
+            manifest['tables'][table_name] = _write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_dir, table_name)
+
+        df_map = pd.read_csv(TEAM_MAP_CSV)
+        manifest['tables'][TEAM_MAP_TABLE] = _write_table(pa.Table.from_pandas(df_map, preserve_index=False), tmp_dir, TEAM_MAP_TABLE)
+
+        (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+        tmp_dir.rename(final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    (root / LATEST_FILE).write_text(version)
+    return final_dir
+
+
+def _filter(table: pa.Table, **conditions) -> pa.Table:
+    """Equality filter for scalar values, membership filter for list values."""
+    mask = None
+    for column, value in conditions.items():
+        if isinstance(value, (list, tuple)):
+            cond = pc.is_in(table[column], value_set=pa.array(list(value), type=table.schema.field(column).type))
+        else:
+            cond = pc.equal(table[column], value)
+        mask = cond if mask is None else pc.and_(mask, cond)
+    return table if mask is None else table.filter(mask)
+
+
+def _group_mean(table: pa.Table, keys: Sequence[str], column: str, alias: str) -> pd.DataFrame:
+    grouped = table.group_by(list(keys)).aggregate([(column, 'mean')])
+    return grouped.rename_columns(list(keys) + [alias]).to_pandas()
+
+
+class SnapshotStore:
+    """
+    Read-only data source backed by one exported snapshot version.
+
+    Arrow IPC files are memory-mapped, so the tables live in the OS page cache and are
+    shared by every worker process on the machine. Statements are answered with Arrow
+    compute filters and only the matching rows are converted to pandas.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.manifest = json.loads((self.path / MANIFEST_FILE).read_text())
+        self.version = self.manifest['version']
+        self._tables: Dict[str, pa.Table] = {}
+        self._handlers: Dict[str, Callable[[Sequence], pd.DataFrame]] = {
+            'players_by_season': lambda p: _filter(self.table('players_staging'), season=p[0], name=p[1]).to_pandas(),
+            'teams_by_split': lambda p: _filter(self.table('teams_staging'), season=p[0], split=p[1], name=p[2]).to_pandas(),
+            'all_teams_by_split': lambda p: _filter(self.table('teams_staging'), season=p[0], split=p[1]).to_pandas(),
+            'matches_by_winner': lambda p: _filter(self.table('matches_staging'), winner=p[0]).to_pandas(),
+            'match_results': lambda p: self.table('matches_staging').select(
+                ['team1', 'team2', 'team1_score', 'team2_score', 'date']).to_pandas(),
+            'head_to_head': self._head_to_head,
+            'head_to_head_group': self._head_to_head_group,
+            'team_duration_by_season': lambda p: _group_mean(
+                _filter(self.table('teams_staging'), season=p[0], name=p[1]),
+                ['name', 'region'], 'game_duration', 'average_game_duration'),
+            'team_kills_by_season': lambda p: _group_mean(
+                _filter(self.table('teams_staging'), season=p[0], name=p[1]),
+                ['name'], 'kills_per_game', 'average_kills_per_game'),
+        }
+        for table_name in SNAPSHOT_TABLES:
+            self._handlers[f"dump_{table_name}"] = lambda p, t=table_name: self.table(t).to_pandas()
+            # A snapshot never changes, so its version is a valid watermark for every table
+            self._handlers[f"watermark_{table_name}"] = lambda p, t=table_name: pd.DataFrame(
+                {'row_count': [self.table(t).num_rows], 'max_marker': [self.version]})
+
+    def table(self, name: str) -> pa.Table:
+        """Returns the memory-mapped Arrow table, opening it on first use."""
+        if name not in self._tables:
+            ipc_path = self.path / f"{name}.arrow"
+            if ipc_path.exists():
+                self._tables[name] = ipc.open_file(pa.memory_map(str(ipc_path), 'r')).read_all()
+            else:
+                self._tables[name] = pq.read_table(self.path / f"{name}.parquet", memory_map=True)
+        return self._tables[name]
+
+    def team_map(self) -> pd.DataFrame:
+        return self.table(TEAM_MAP_TABLE).to_pandas()
+
+    def _head_to_head(self, params: Sequence) -> pd.DataFrame:
+        team_low, team_high, limit = params
+        matches = self.table('matches_staging')
+        pair = pc.or_(
+            pc.and_(pc.equal(matches['team1'], team_low), pc.equal(matches['team2'], team_high)),
+            pc.and_(pc.equal(matches['team1'], team_high), pc.equal(matches['team2'], team_low)),
+        )
+        selected = matches.filter(pair).sort_by([('date', 'descending')])
+        return selected.slice(0, limit).to_pandas()
+
+    def _head_to_head_group(self, params: Sequence) -> pd.DataFrame:
+        teams, limit = params
+        in_group = _filter(self.table('matches_staging'), team1=list(teams), team2=list(teams))
+        selected = in_group.sort_by([('date', 'descending')]).to_pandas()
+        low = selected[['team1', 'team2']].min(axis=1)
+        high = selected[['team1', 'team2']].max(axis=1)
+        selected['pair_rank'] = selected.groupby([low, high], sort=False).cumcount() + 1
+        return selected[selected['pair_rank'] <= limit].reset_index(drop=True)
+
+    def fetch(self, statement_name: str, params: Sequence) -> pd.DataFrame:
+        """Answers a registered statement (see queries.STATEMENTS) from the snapshot."""
+        if statement_name not in self._handlers:
+            raise KeyError(f"Statement '{statement_name}' is not supported in snapshot mode")
+        return self._handlers[statement_name](params)
+
+
+def open_snapshot(root: str = SNAPSHOT_DIR, version: str = SNAPSHOT_VERSION) -> SnapshotStore:
+    """Opens the requested snapshot version, or the one recorded in root/LATEST."""
+    root_path = Path(root)
+    version = version or (root_path / LATEST_FILE).read_text().strip()
+    return SnapshotStore(root_path / version)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the staging tables into a versioned Parquet/Arrow snapshot.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help="Export all staging tables from Postgres")
+    export_parser.add_argument('--out', default=SNAPSHOT_DIR, help="Snapshot root directory")
+    export_parser.add_argument('--version', default=None, help="Version name (default: UTC timestamp)")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        from db import get_engine
+        path = export_snapshot(get_engine(), args.out, args.version)
+        print(f"Snapshot written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from schema import DATA_VERSION_ATTR
+
+CLUSTER_RESTARTS = 16
+CLUSTER_MAX_ITERATIONS = 100
+# Centre movement, relative to the feature variance, below which a restart counts as converged
+CLUSTER_TOLERANCE = 1e-4
+# Features named in an archetype label, strongest first
+ARCHETYPE_TRAITS = 2
+
+
+@dataclass(frozen=True)
+class TeamClusters:
+    """
+    Playstyle clusters of a team frame.
+
+    labels: cluster of every team (index: team name).
+    coords: the teams' first two principal components ('pc1', 'pc2'), for plotting.
+    centroids: cluster centres in standard deviations from the average team, one row per cluster.
+    archetypes: a short name per cluster from its most distinctive features.
+    """
+    labels: pd.Series
+    coords: pd.DataFrame
+    centroids: pd.DataFrame
+    archetypes: Dict[int, str]
+    inertia: float
+    explained_variance: np.ndarray
+
+
+def standardize(values: np.ndarray) -> np.ndarray:
+    """Column z-scores; missing values become the column mean and constant columns 0."""
+    mean = np.nanmean(values, axis=0)
+    std = np.nanstd(values, axis=0)
+    z = (values - mean) / np.where(std > 0, std, 1)
+    return np.nan_to_num(z)
+
+
+def _squared_distances(x: np.ndarray, x_norms: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """
+    (points, restarts, clusters) squared distances, from one matrix product over every restart's
+    centres; the clusters axis is contiguous so the nearest-centre argmin stays fast.
+    """
+    restarts, k, d = centers.shape
+    flat = centers.reshape(-1, d)
+    cross = x @ flat.T
+    cross *= -2
+    cross += x_norms[:, None]
+    cross += np.einsum('cd,cd->c', flat, flat)
+    return np.maximum(cross, 0.0, out=cross).reshape(len(x), restarts, k)
+
+
+def _kmeans_plus_plus(rng: np.random.Generator, x: np.ndarray, x_norms: np.ndarray, k: int, restarts: int) -> np.ndarray:
+    """k-means++ starting centres for every restart at once (the loop runs over clusters, not restarts)."""
+    n = len(x)
+    centers = np.empty((restarts, k, x.shape[1]))
+    centers[:, 0] = x[rng.integers(0, n, restarts)]
+    closest = _squared_distances(x, x_norms, centers[:, :1])[:, :, 0].T
+    for c in range(1, k):
+        # Next centre drawn with probability proportional to the squared distance to the closest one
+        cumulative = np.cumsum(closest + 1e-12, axis=1)
+        draws = rng.random(restarts) * cumulative[:, -1]
+        picks = np.minimum((cumulative < draws[:, None]).sum(axis=1), n - 1)
+        centers[:, c] = x[picks]
+        closest = np.minimum(closest, _squared_distances(x, x_norms, centers[:, c:c + 1])[:, :, 0].T)
+    return centers
+
+
+def kmeans(x: np.ndarray, k: int, restarts: int = CLUSTER_RESTARTS, seed: Optional[int] = 0,
+           max_iterations: int = CLUSTER_MAX_ITERATIONS, tolerance: float = CLUSTER_TOLERANCE):
+    """
+    Lloyd's k-means with k-means++ starts, all restarts advancing together: an iteration is one
+    matrix product for the distances and one for the new centres (a one-hot membership matrix
+    times the points). A restart stops once its labels no longer change or its centres move less
+    than tolerance (relative to the data's variance), and drops out of the batch. Returns the
+    labels, centres and inertia of the best restart.
+    """
+    rng = np.random.default_rng(seed)
+    n, d = x.shape
+    x_norms = np.einsum('nd,nd->n', x, x)
+    centers = _kmeans_plus_plus(rng, x, x_norms, k, restarts)
+    labels = np.full((restarts, n), -1, dtype=np.intp)
+    threshold = tolerance * max(float(x.var(axis=0).mean()), 1e-12)
+    active = np.arange(restarts)
+    point_index = np.arange(n)
+
+    for _ in range(max_iterations):
+        new_labels = _squared_distances(x, x_norms, centers[active]).argmin(axis=2).T
+        changed = (new_labels != labels[active]).any(axis=1)
+        labels[active] = new_labels
+
+        # Row r * k + c of the membership matrix marks the points of cluster c in restart r
+        rows = new_labels + (np.arange(len(active)) * k)[:, None]
+        membership = np.zeros((len(active) * k, n))
+        membership[rows.ravel(), np.tile(point_index, len(active))] = 1.0
+        counts = membership.sum(axis=1).reshape(-1, k)
+        sums = (membership @ x).reshape(-1, k, d)
+        # An emptied cluster keeps its previous centre
+        moved = np.where(counts[:, :, None] > 0, sums / np.maximum(counts, 1)[:, :, None], centers[active])
+        shift = ((moved - centers[active]) ** 2).sum(axis=(1, 2))
+        centers[active] = moved
+
+        active = active[changed & (shift > threshold)]
+        if not len(active):
+            break
+
+    distances = _squared_distances(x, x_norms, centers)
+    nearest = distances.argmin(axis=2)
+    inertia = np.take_along_axis(distances, nearest[:, :, None], axis=2)[:, :, 0].sum(axis=0)
+    best = int(np.argmin(inertia))
+    return nearest[:, best], centers[best], float(inertia[best])
+
+
+def _relabel_by_size(labels: np.ndarray, centers: np.ndarray):
+    """Cluster 0 is the largest, so labels (and colours) stay stable between runs."""
+    order = np.argsort(-np.bincount(labels, minlength=len(centers)), kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[labels], centers[order]
+
+
+def _archetype_names(centroids: pd.DataFrame, labels: Dict[str, str]) -> Dict[int, str]:
+    names = {}
+    for cluster, centre in centroids.iterrows():
+        traits = centre.abs().sort_values(ascending=False).index[:ARCHETYPE_TRAITS]
+        names[cluster] = ", ".join(
+            f"{'High' if centre[feature] > 0 else 'Low'} {labels.get(feature, feature)}" for feature in traits
+        )
+    return names
+
+
+def cluster_teams(df: pd.DataFrame, features: Sequence[str], k: int, feature_labels: Optional[Dict[str, str]] = None,
+                  restarts: int = CLUSTER_RESTARTS, seed: Optional[int] = 0) -> Optional[TeamClusters]:
+    """
+    Groups the teams of df (one row per team, 'name' column) into k playstyle clusters over the
+    standardized features, and projects them onto their first two principal components.
+    Returns None when there are fewer teams than clusters or no usable feature.
+    """
+    features = [feature for feature in features if feature in df.columns]
+    teams = df.drop_duplicates('name')
+    if not features or len(teams) < max(k, 2):
+        return None
+
+    x = standardize(teams[features].to_numpy(dtype=np.float64, na_value=np.nan))
+    labels, centers, inertia = kmeans(x, k, restarts, seed)
+    labels, centers = _relabel_by_size(labels, centers)
+
+    # Principal components from the SVD of the standardized matrix
+    _, singular, vt = np.linalg.svd(x - x.mean(axis=0), full_matrices=False)
+    components = vt[:2]
+    coords = (x - x.mean(axis=0)) @ components.T
+    if coords.shape[1] < 2:
+        coords = np.column_stack([coords, np.zeros(len(coords))])
+    variance = singular ** 2
+    explained = variance[:2] / variance.sum() if variance.sum() > 0 else np.zeros(2)
+
+    index = pd.Index(teams['name'].astype(str), name='name')
+    centroids = pd.DataFrame(centers, columns=features)
+    return TeamClusters(
+        labels=pd.Series(labels, index=index, name='cluster'),
+        coords=pd.DataFrame(coords[:, :2], index=index, columns=['pc1', 'pc2']),
+        centroids=centroids,
+        archetypes=_archetype_names(centroids, feature_labels or {}),
+        inertia=inertia,
+        explained_variance=explained,
+    )
+
+
+_clusters: LRUCache = LRUCache(maxsize=32)
+_clusters_lock = threading.Lock()
+
+
+def get_team_clusters(df: pd.DataFrame, features: Sequence[str], k: int,
+                      feature_labels: Optional[Dict[str, str]] = None) -> Optional[TeamClusters]:
+    """
+    cluster_teams() cached per data version (team frames carry one per split and load), feature
+    set and k. Frames without a version token are clustered on every call.
+    """
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        return cluster_teams(df, features, k, feature_labels)
+
+    key = (version, tuple(features), k)
+    with _clusters_lock:
+        if key in _clusters:
+            return _clusters[key]
+    result = cluster_teams(df, features, k, feature_labels)
+    with _clusters_lock:
+        _clusters[key] = result
+    return result
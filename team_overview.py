@@ -151,4 +151,17 @@ def show_overview():
                     st.subheader(team["name"])
                     st.markdown(f"*{team['summary']}*")
 
-            st.markdown("---")
\ No newline at end of file
+            st.markdown("---")
+
+
+def render_overview_page(ctx):
+    show_overview()
+
+
+def render_future_additions_page(ctx):
+    st.header("Future Additions")
+    st.subheader("I want to keep building this into more than just Worlds Analysis and add more data/visulations to it."
+                 " But for now I will keep adding data about the Teams playing in Worlds showcasing teams early game "
+                 "aggression, objective control and how these statistics can show how a team plays and how the changes"
+                 "in game affects teams play-style and also how teams compare domestically and on international stage")
+    st.warning("Some data is not available right now or is missing. So I am not able to build a lot relating to teams.")
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from confidence import kda_interval, player_intervals, wilson_interval
+
+
+@pytest.mark.parametrize('successes, trials, low, high', [
+    # Published 95% Wilson score intervals
+    (8, 10, 0.4902, 0.9433),
+    (0, 10, 0.0, 0.2775),
+    (10, 10, 0.7225, 1.0),
+    (50, 100, 0.4038, 0.5962),
+    (81, 263, 0.2553, 0.3662),
+])
+def test_wilson_interval_matches_known_values(successes, trials, low, high):
+    lo, hi = wilson_interval(np.array([successes], dtype=float), np.array([trials], dtype=float))
+    assert lo[0] == pytest.approx(low, abs=1e-4)
+    assert hi[0] == pytest.approx(high, abs=1e-4)
+
+
+def test_wilson_interval_is_vectorized_and_nan_without_trials():
+    lo, hi = wilson_interval(np.array([8.0, 0.0, 3.0]), np.array([10.0, 0.0, 10.0]), level=0.9)
+    assert np.isnan(lo[1]) and np.isnan(hi[1])
+    # A narrower level gives a narrower interval than the 95% one
+    lo95, hi95 = wilson_interval(np.array([8.0]), np.array([10.0]))
+    assert lo95[0] < lo[0] < 0.8 < hi[0] < hi95[0]
+
+
+def test_kda_interval_matches_the_delta_method_for_long_seasons():
+    # 2000 kills + assists over 500 deaths: KDA 4, and the log of a ratio of Poisson counts
+    # has a standard deviation close to sqrt(1/2000 + 1/500)
+    lo, hi = kda_interval(np.array([2.0]), np.array([1.0]), np.array([2.0]), np.array([500]), samples=4000)
+    sd = np.sqrt(1 / 2000 + 1 / 500)
+    assert lo[0] == pytest.approx(4 * np.exp(-1.96 * sd), rel=0.02)
+    assert hi[0] == pytest.approx(4 * np.exp(1.96 * sd), rel=0.02)
+
+
+def test_kda_interval_narrows_with_games_and_is_reproducible():
+    games = np.array([10, 60, 0])
+    args = (np.full(3, 3.0), np.full(3, 2.0), np.full(3, 5.0), games)
+    lo, hi = kda_interval(*args)
+    assert hi[1] - lo[1] < hi[0] - lo[0]
+    assert (lo[:2] < 4.0).all() and (hi[:2] > 4.0).all()
+    assert np.isnan(lo[2]) and np.isnan(hi[2])
+    np.testing.assert_array_equal(kda_interval(*args)[0], lo)
+
+
+def test_kda_interval_is_scaled_to_the_reported_kda():
+    args = (np.array([3.0]), np.array([2.0]), np.array([5.0]), np.array([20]))
+    lo, hi = kda_interval(*args)
+    scaled_lo, scaled_hi = kda_interval(*args, kda=np.array([4.4]))
+    assert scaled_lo[0] == pytest.approx(lo[0] * 1.1) and scaled_hi[0] == pytest.approx(hi[0] * 1.1)
+
+
+def test_player_intervals_use_games_as_trials_for_rates():
+    df = pd.DataFrame({'winrate': [80.0, 50.0], 'games': [10, 100]})
+    bounds = player_intervals(df)
+    assert list(bounds.columns) == ['winrate_lo', 'winrate_hi']
+    np.testing.assert_allclose(bounds['winrate_lo'], [49.02, 40.38], atol=1e-2)
+    np.testing.assert_allclose(bounds['winrate_hi'], [94.33, 59.62], atol=1e-2)
@@ -0,0 +1,137 @@
+import pandas as pd
+import pytest
+
+import data_cache
+from data_cache import WatermarkCache, LoadFailed, watermark_cached
+from queries import watermark_statement_name
+
+
+class FakeSource:
+    """Answers the watermark statement of one table from row_count and max_marker; anything else fails."""
+
+    def __init__(self, row_count=10, max_marker='2025-09-01'):
+        self.row_count = row_count
+        self.max_marker = max_marker
+        self.watermark_reads = 0
+
+    def fetch(self, statement_name, params):
+        if statement_name != watermark_statement_name('matches_staging'):
+            raise RuntimeError(f"unexpected statement {statement_name}")
+        self.watermark_reads += 1
+        return pd.DataFrame({'row_count': [self.row_count], 'max_marker': [self.max_marker]})
+
+
+class BrokenSource:
+    def fetch(self, statement_name, params):
+        raise RuntimeError("connection lost")
+
+
+class Loader:
+    def __init__(self, value=None):
+        self.calls = 0
+        self.value = value
+
+    def __call__(self):
+        self.calls += 1
+        return self.value if self.value is not None else pd.DataFrame({'call': [self.calls]})
+
+
+@pytest.fixture(autouse=True)
+def fake_fetch(monkeypatch):
+    """The fake sources answer the watermark statements in place of the database."""
+    monkeypatch.setattr(data_cache, 'fetch', lambda engine, statement_name, params: engine.fetch(statement_name, params))
+
+
+def _expire_watermarks():
+    """What WATERMARK_TTL passing does: the next lookup re-reads every table's watermark."""
+    with data_cache._watermarks_lock:
+        data_cache._watermarks.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_watermarks():
+    _expire_watermarks()
+    yield
+    _expire_watermarks()
+
+
+def test_unchanged_watermark_is_a_hit():
+    source, cache, loader = FakeSource(), WatermarkCache(), Loader()
+    first = cache.get_or_load(source, 'matches_staging', 'key', loader)
+    _expire_watermarks()
+    second = cache.get_or_load(source, 'matches_staging', 'key', loader)
+    assert second is first
+    assert loader.calls == 1 and source.watermark_reads == 2
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+
+@pytest.mark.parametrize('change', [{'row_count': 11}, {'max_marker': '2025-09-02'}])
+def test_moved_watermark_reloads(change):
+    source, cache, loader = FakeSource(), WatermarkCache(), Loader()
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    for attr, value in change.items():
+        setattr(source, attr, value)
+    _expire_watermarks()
+    assert cache.get_or_load(source, 'matches_staging', 'key', loader)['call'].item() == 2
+    assert cache.get_or_load(source, 'matches_staging', 'key', loader)['call'].item() == 2
+    assert loader.calls == 2
+
+
+def test_watermark_is_only_re_read_after_its_ttl():
+    source, cache, loader = FakeSource(), WatermarkCache(), Loader()
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    source.row_count = 11
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    assert loader.calls == 1 and source.watermark_reads == 1
+
+
+def test_count_only_watermark_expires_entries(monkeypatch):
+    source, cache, loader = FakeSource(max_marker=None), WatermarkCache(), Loader()
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    assert loader.calls == 1
+    monkeypatch.setattr(data_cache, 'COUNT_ONLY_TTL', 0)
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    assert loader.calls == 2
+
+
+def test_empty_results_are_cached_and_failed_loads_are_not():
+    source, cache = FakeSource(), WatermarkCache()
+    empty = Loader(pd.DataFrame())
+    cache.get_or_load(source, 'matches_staging', 'empty', empty)
+    cache.get_or_load(source, 'matches_staging', 'empty', empty)
+    assert empty.calls == 1
+
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise LoadFailed(pd.DataFrame({'fallback': [True]}))
+
+    for _ in range(2):
+        assert cache.get_or_load(source, 'matches_staging', 'failing', failing)['fallback'].item()
+    assert len(calls) == 2 and cache.stats()['entries'] == 1
+
+
+def test_unreadable_watermark_loads_every_time():
+    cache, loader = WatermarkCache(), Loader()
+    source = BrokenSource()
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    cache.get_or_load(source, 'matches_staging', 'key', loader)
+    assert loader.calls == 2 and cache.stats()['entries'] == 0
+
+
+def test_decorated_loaders_are_keyed_by_their_arguments():
+    source, cache, calls = FakeSource(), WatermarkCache(), []
+
+    @watermark_cached('matches_staging', cache)
+    def load(engine, split):
+        calls.append(split)
+        return pd.DataFrame({'split': [split]})
+
+    assert load(source, 'Spring')['split'].item() == 'Spring'
+    assert load(source, 'Summer')['split'].item() == 'Summer'
+    load(source, 'Spring')
+    assert calls == ['Spring', 'Summer']
+    load.uncached(source, 'Spring')
+    assert calls == ['Spring', 'Summer', 'Spring']
@@ -0,0 +1,94 @@
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from graphs.figures import FigureCache, FIGURE_CACHE, cached_figure
+from schema import DATA_VERSION_ATTR
+
+
+class Builder:
+    """Builds a one-trace bar chart, counting the calls."""
+
+    def __init__(self, label='a', size=3):
+        self.calls = 0
+        self.label = label
+        self.size = size
+
+    def __call__(self):
+        self.calls += 1
+        return go.Figure(go.Bar(x=[f'{self.label}{i}' for i in range(self.size)], y=list(range(self.size))))
+
+
+def _payload_size(builder) -> int:
+    return len(Builder(builder.label, builder.size)().to_json())
+
+
+def _frame(version=None) -> pd.DataFrame:
+    df = pd.DataFrame({'name': ['Faker'], 'kda': [5.0]})
+    if version is not None:
+        df.attrs[DATA_VERSION_ATTR] = version
+    return df
+
+
+@pytest.fixture(autouse=True)
+def empty_figure_cache():
+    FIGURE_CACHE.clear()
+    yield
+    FIGURE_CACHE.clear()
+
+
+def test_a_hit_returns_a_fresh_copy_of_the_figure():
+    cache, build = FigureCache(), Builder()
+    first = cache.get_or_build('key', build)
+    first.update_layout(title='changed by the caller')
+    second = cache.get_or_build('key', build)
+    assert build.calls == 1
+    assert second is not first and second.layout.title.text is None
+    assert list(second.data[0].x) == list(first.data[0].x)
+    assert cache.stats() == {'entries': 1, 'bytes': _payload_size(build), 'hits': 1, 'misses': 1}
+
+
+def test_least_recently_used_figures_are_evicted_by_size():
+    builders = {key: Builder(key) for key in 'abc'}
+    size = _payload_size(builders['a'])
+    cache = FigureCache(max_bytes=2 * size)
+    cache.get_or_build('a', builders['a'])
+    cache.get_or_build('b', builders['b'])
+    cache.get_or_build('a', builders['a'])
+    cache.get_or_build('c', builders['c'])
+    assert cache.nbytes() == 2 * size
+
+    for key in 'cab':
+        cache.get_or_build(key, builders[key])
+    # 'b' was the least recently used when 'c' arrived
+    assert {key: builder.calls for key, builder in builders.items()} == {'a': 1, 'b': 2, 'c': 1}
+
+
+def test_none_and_oversized_figures_are_not_cached():
+    cache = FigureCache(max_bytes=_payload_size(Builder(size=3)))
+    assert cache.get_or_build('none', lambda: None) is None
+    big = Builder(size=50)
+    cache.get_or_build('big', big)
+    cache.get_or_build('big', big)
+    assert big.calls == 2 and cache.stats()['entries'] == 0
+
+
+def test_cached_figure_keys_on_version_name_and_filters():
+    build = Builder()
+    df = _frame('v1/All/ALL')
+    cached_figure('bubble', df, build, teams=['T1', 'G2 Esports'], metric='kda')
+    # List selections compare as sets and keyword order does not matter
+    cached_figure('bubble', df, build, metric='kda', teams=['G2 Esports', 'T1'])
+    assert build.calls == 1
+
+    cached_figure('bubble', df, build, teams=['T1'], metric='kda')
+    cached_figure('scatter', df, build, teams=['T1', 'G2 Esports'], metric='kda')
+    cached_figure('bubble', _frame('v2/All/ALL'), build, teams=['T1', 'G2 Esports'], metric='kda')
+    assert build.calls == 4
+
+
+def test_frames_without_a_version_are_never_cached():
+    build = Builder()
+    cached_figure('bubble', _frame(), build)
+    cached_figure('bubble', _frame(), build)
+    assert build.calls == 2 and FIGURE_CACHE.stats()['entries'] == 0
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from derived_metrics import IMPACT_SCALES, IMPACT_WEIGHTS, MetricStore, PLAYER_METRICS
+from leaderboard import ImpactScorer, get_impact_scorer, top_positions
+from schema import DATA_VERSION_ATTR
+
+
+def _players(seed: int, n: int = 200) -> pd.DataFrame:
+    """Game-like gpm and kp values, rounded so equal scores are common, with a few missing."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'name': [f'p{i}' for i in range(n)],
+        'gpm': rng.integers(300, 320, n).astype('float32'),
+        'kp': rng.integers(50, 60, n).astype('float32'),
+    })
+    df.loc[rng.choice(n, 4, replace=False), 'gpm'] = np.nan
+    return df
+
+
+def _weighted_sum(df: pd.DataFrame, weights) -> pd.Series:
+    return sum(df[col].astype('float64') * IMPACT_SCALES[col] * weights.get(col, 0.0) for col in IMPACT_SCALES)
+
+
+@pytest.mark.parametrize('weights', [{'gpm': 0.5, 'kp': 0.5}, {'gpm': 2.0, 'kp': 0.0}, {'gpm': 0.1, 'kp': 1.7},
+                                     {'kp': 1.0}])
+def test_scores_are_the_weighted_sum(weights):
+    df = _players(0)
+    np.testing.assert_allclose(ImpactScorer(df).scores(weights), _weighted_sum(df, weights), rtol=1e-5)
+
+
+def test_default_weights_reproduce_the_impact_score_metric():
+    df = _players(1)
+    expected = MetricStore(df, PLAYER_METRICS).evaluate(['impact_score'])['impact_score']
+    np.testing.assert_allclose(ImpactScorer(df).scores(IMPACT_WEIGHTS), expected, rtol=1e-5)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('n', [1, 5, 20, 500])
+def test_top_players_match_a_stable_sort_of_the_rescored_frame(seed, n):
+    df = _players(seed)
+    weights = {'gpm': 1.0, 'kp': 0.3}
+    scores = ImpactScorer(df).scores(weights)
+    expected = df.assign(impact_score=scores).sort_values(
+        'impact_score', ascending=False, kind='stable', na_position='last').head(n)
+    top = ImpactScorer(df).top_players(weights, n)
+    assert top['name'].tolist() == expected['name'].tolist()
+    np.testing.assert_array_equal(top['impact_score'], expected['impact_score'])
+
+
+def test_top_positions_puts_missing_values_last():
+    values = np.array([np.nan, 3.0, 5.0, 3.0, np.nan])
+    assert top_positions(values, 4).tolist() == [2, 1, 3, 0]
+    assert top_positions(values, 0).tolist() == []
+
+
+def test_scorers_are_cached_per_data_version():
+    df = _players(0)
+    assert get_impact_scorer(df) is not get_impact_scorer(df)
+    df.attrs[DATA_VERSION_ATTR] = 'v1/All/ALL'
+    assert get_impact_scorer(df) is get_impact_scorer(df)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from leaderboard import Leaderboards, get_leaderboards
+from schema import DATA_VERSION_ATTR
+
+
+def _players(seed: int, n: int = 40) -> pd.DataFrame:
+    """Small integer-valued stats, so ties are common, with a few missing values."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'name': [f'p{i}' for i in range(n)],
+        'kda': rng.integers(0, 8, n).astype('float32'),
+        'solo_kills': rng.integers(0, 5, n).astype('float64'),
+        'gpm': rng.integers(300, 320, n).astype('float32'),
+        'kp': rng.integers(50, 60, n).astype('float32'),
+    })
+    df.loc[rng.choice(n, 4, replace=False), 'kda'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('k', [1, 5, 20, 60])
+def test_top_players_match_a_stable_sort(seed, k):
+    df = _players(seed)
+    boards = Leaderboards(df, metrics=('kda', 'solo_kills'), size=20)
+    for metric in ('kda', 'solo_kills'):
+        expected = df.sort_values(metric, ascending=False, kind='stable', na_position='last').head(min(k, 20))
+        assert boards.top_players(metric, k)['name'].tolist() == expected['name'].tolist()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_ranks_and_percentiles_match_pandas(seed):
+    df = _players(seed)
+    ranks = Leaderboards(df, metrics=('kda', 'solo_kills')).ranks
+    for metric in ('kda', 'solo_kills'):
+        valid = df[metric].notna()
+        expected_rank = df.loc[valid, metric].rank(method='min', ascending=False)
+        expected_pct = df.loc[valid, metric].rank(method='max', pct=True)
+        np.testing.assert_array_equal(ranks.loc[valid, f'{metric}_rank'], expected_rank)
+        np.testing.assert_allclose(ranks.loc[valid, f'{metric}_pct'], expected_pct)
+        assert ranks.loc[~valid, f'{metric}_pct'].isna().all()
+        assert (ranks.loc[~valid, f'{metric}_rank'] > valid.sum()).all()
+
+
+def test_leaderboards_are_cached_per_data_version():
+    df = _players(1)
+    df.attrs[DATA_VERSION_ATTR] = 'v1/All/ALL'
+    subset = df[df['kda'] > 2].copy()
+    subset.attrs[DATA_VERSION_ATTR] = 'v1/All/ALL/pickems'
+    assert get_leaderboards(df) is get_leaderboards(df)
+    assert get_leaderboards(subset).top_players('kda', 3)['name'].tolist() == \
+        subset.sort_values('kda', ascending=False, kind='stable').head(3)['name'].tolist()
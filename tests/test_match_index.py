@@ -0,0 +1,96 @@
+import datetime
+from itertools import combinations, permutations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from match_index import MatchIndex
+
+TEAMS = ['T1', 'G2 Esports', 'Fnatic', 'KT Rolster', 'FlyQuest']
+
+
+def _matches(seed: int, n: int = 120) -> pd.DataFrame:
+    """Random best-of-five results between TEAMS, one per day, in shuffled row order."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for day in rng.permutation(n):
+        team1, team2 = rng.choice(TEAMS, 2, replace=False)
+        loser_games = int(rng.integers(0, 3))
+        team1_won = rng.random() < 0.5
+        rows.append({
+            'team1': team1,
+            'team2': team2,
+            'team1_score': 3 if team1_won else loser_games,
+            'team2_score': loser_games if team1_won else 3,
+            'winner': team1 if team1_won else team2,
+            'date': datetime.date(2024, 1, 1) + datetime.timedelta(days=int(day)),
+        })
+    return pd.DataFrame(rows)
+
+
+def _pair(df: pd.DataFrame, team_a: str, team_b: str, limit=None) -> pd.DataFrame:
+    """Reference: the pair's meetings filtered and sorted in pandas, most recent first."""
+    mask = ((df['team1'] == team_a) & (df['team2'] == team_b)) | ((df['team1'] == team_b) & (df['team2'] == team_a))
+    pair = df[mask].sort_values('date', ascending=False, kind='stable')
+    return pair if limit is None else pair.head(limit)
+
+
+def _games_won(pair: pd.DataFrame, team: str) -> int:
+    return int(np.where(pair['team1'] == team, pair['team1_score'], pair['team2_score']).sum())
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('limit', [None, 1, 4])
+def test_head_to_head_and_record_match_a_pandas_filter(seed, limit):
+    df = _matches(seed)
+    index = MatchIndex(df)
+    for team_a, team_b in permutations(TEAMS, 2):
+        expected = _pair(df, team_a, team_b, limit)
+        h2h = index.head_to_head(team_a, team_b, limit)
+        assert h2h['date'].tolist() == expected['date'].tolist()
+        assert h2h['score_a'].sum() == _games_won(expected, team_a)
+
+        record = index.record(team_a, team_b, limit)
+        assert record.matches == len(expected)
+        assert record.series_wins_a == (expected['winner'] == team_a).sum()
+        assert record.series_wins_b == (expected['winner'] == team_b).sum()
+        assert record.game_wins_a == _games_won(expected, team_a)
+        assert record.game_wins_b == _games_won(expected, team_b)
+
+
+@pytest.mark.parametrize('limit', [None, 3])
+def test_matrix_matches_a_pandas_filter(limit):
+    df = _matches(7)
+    teams = TEAMS[:4] + ['Unknown Team']
+    matrix = MatchIndex(df).matrix(teams, limit)
+    for team_a in teams:
+        for team_b in teams:
+            expected = _pair(df, team_a, team_b, limit) if team_a != team_b else df.iloc[:0]
+            assert matrix.series_wins.loc[team_a, team_b] == (expected['winner'] == team_a).sum()
+            assert matrix.game_wins.loc[team_a, team_b] == _games_won(expected, team_a)
+
+
+@pytest.mark.parametrize('limit', [None, 2])
+def test_group_record_sums_the_pair_records(limit):
+    df = _matches(11)
+    group = TEAMS[:4]
+    result = MatchIndex(df).group_record(group, limit).set_index('team')
+    for team in group:
+        meetings = pd.concat([_pair(df, team, other, limit) for other in group if other != team])
+        assert result.loc[team, 'series_wins'] == (meetings['winner'] == team).sum()
+        assert result.loc[team, 'series_losses'] == (meetings['winner'] != team).sum()
+        assert result.loc[team, 'game_wins'] == _games_won(meetings, team)
+    assert result['series_wins'].sum() == result['series_losses'].sum()
+
+
+def test_pairs_and_empty_index():
+    df = _matches(3)
+    pairs = MatchIndex(df).pairs()
+    assert sum(pairs.values()) == len(df)
+    assert len(pairs) == len([pair for pair in combinations(sorted(TEAMS), 2) if len(_pair(df, *pair))])
+
+    empty = MatchIndex(pd.DataFrame())
+    assert empty.empty
+    assert empty.record('T1', 'Fnatic').matches == 0
+    assert empty.head_to_head('T1', 'Fnatic').empty
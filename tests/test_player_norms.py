@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_norms import compute_player_norms, group_norms, norm_column, numeric_player_columns
+
+
+def _players(seed: int, n: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'name': [f'p{i}' for i in range(n)],
+        'split': rng.choice(['Spring', 'Summer'], n),
+        'role': rng.choice(['Top', 'Mid', 'Support'], n),
+        'league': rng.choice(['LCK', 'LPL', 'LEC'], n),
+        'kda': rng.integers(1, 6, n).astype('float32'),
+        'gpm': rng.normal(400, 30, n).astype('float32'),
+        'games': rng.integers(10, 40, n).astype('int16'),
+    })
+    df.loc[rng.choice(n, 5, replace=False), 'kda'] = np.nan
+    # A one-player group and a group whose values are all equal
+    df.loc[0, ['split', 'role', 'league']] = ['Winter', 'Top', 'LCK']
+    df.loc[[1, 2], ['split', 'role', 'league', 'gpm']] = ['Winter', 'Mid', 'LPL', 420.0]
+    return df
+
+
+def _reference(df: pd.DataFrame, column: str, by) -> pd.DataFrame:
+    """Per-row percentile and z-score computed by looping over every row's group."""
+    pct, z = [], []
+    for _, row in df.iterrows():
+        peers = df[np.logical_and.reduce([df[key] == row[key] for key in by])][column].dropna().astype('float64')
+        value = row[column]
+        if pd.isna(value):
+            pct.append(np.nan)
+            z.append(np.nan)
+            continue
+        pct.append((peers <= value).mean())
+        std = peers.std()
+        z.append((value - peers.mean()) / std if len(peers) > 1 and std > 0 else 0.0)
+    return pd.DataFrame({'pct': pct, 'z': z}, index=df.index)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('by, group', [(('split', 'role'), 'role'), (('split', 'league'), 'league')])
+def test_group_norms_match_a_per_group_loop(seed, by, group):
+    df = _players(seed)
+    norms = group_norms(df, ['kda', 'gpm'], by, group)
+    for column in ('kda', 'gpm'):
+        expected = _reference(df, column, by)
+        np.testing.assert_allclose(norms[norm_column(column, group, 'pct')], expected['pct'], rtol=1e-6)
+        np.testing.assert_allclose(norms[norm_column(column, group, 'z')], expected['z'], rtol=1e-5, atol=1e-6)
+
+
+def test_compute_player_norms_covers_every_numeric_column_and_group():
+    df = _players(0)
+    norms = compute_player_norms(df)
+    assert numeric_player_columns(df) == ['games', 'kda', 'gpm']
+    expected = {norm_column(col, group, kind) for col in ('games', 'kda', 'gpm')
+                for group in ('role', 'league') for kind in ('pct', 'z')}
+    assert set(norms.columns) == expected
+    assert norms.index.equals(df.index)
+    assert (norms.dtypes == np.float32).all()
+    # The single Winter Top player is only compared with itself
+    assert norms.loc[0, 'gpm_role_pct'] == 1.0 and norms.loc[0, 'gpm_role_z'] == 0.0
+
+
+def test_compute_player_norms_of_an_empty_frame():
+    assert compute_player_norms(_players(0).iloc[:0]).empty
+
+
+def test_compute_player_norms_restricted_to_named_columns():
+    df = _players(1)
+    names = ['gpm_role_z', 'kda_league_pct', 'unknown_role_z', 'gpm_role_z']
+    norms = compute_player_norms(df, names)
+    assert list(norms.columns) == ['gpm_role_z', 'kda_league_pct']
+    pd.testing.assert_frame_equal(norms, compute_player_norms(df)[['gpm_role_z', 'kda_league_pct']])
+    assert compute_player_norms(df, ['unknown_role_z']).columns.empty
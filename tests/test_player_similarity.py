@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_similarity import SimilarityIndex, SIMILARITY_FEATURES
+
+RAW_FEATURES = [feature for feature in SIMILARITY_FEATURES if feature != 'solo_kills_per_game']
+
+
+def _players(seed: int, n: int = 80) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.normal(5, 2, n) for col in RAW_FEATURES})
+    df['name'] = [f'p{i}' for i in range(n)]
+    df['role'] = rng.choice(['Top', 'Mid', 'Support'], n)
+    df['games'] = rng.integers(10, 40, n)
+    df['solo_kills'] = rng.integers(0, 30, n)
+    df.loc[rng.choice(n, 5, replace=False), 'gpm'] = np.nan
+    return df
+
+
+def _reference_z(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-role z-scores computed one role at a time, missing stats as the role average."""
+    values = df[RAW_FEATURES].assign(solo_kills_per_game=df['solo_kills'] / df['games'])
+    z = pd.DataFrame(index=df.index, columns=values.columns, dtype='float64')
+    for role in df['role'].unique():
+        rows = df['role'] == role
+        z[rows] = (values[rows] - values[rows].mean()) / values[rows].std()
+    return z.fillna(0.0)
+
+
+def _brute_force(df: pd.DataFrame, name: str, k: int, same_role: bool) -> pd.DataFrame:
+    z = _reference_z(df)
+    query = df.index[df['name'] == name][0]
+    distance = np.sqrt(((z - z.loc[query]) ** 2).sum(axis=1))
+    candidates = df.assign(distance=distance).drop(index=query)
+    if same_role:
+        candidates = candidates[candidates['role'] == df.loc[query, 'role']]
+    return candidates.sort_values('distance', kind='stable').head(k)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('same_role', [True, False])
+@pytest.mark.parametrize('k', [1, 5, 200])
+def test_nearest_players_match_a_brute_force_search(seed, same_role, k):
+    df = _players(seed)
+    index = SimilarityIndex(df)
+    for name in ('p0', 'p17', 'p42'):
+        expected = _brute_force(df, name, k, same_role)
+        similar = index.similar_players(name, k, same_role)
+        assert similar['name'].tolist() == expected['name'].tolist()
+        np.testing.assert_allclose(similar['distance'], expected['distance'], rtol=1e-4, atol=1e-4)
+        np.testing.assert_allclose(similar['similarity'], 1 / (1 + similar['distance']))
+
+
+def test_profile_is_the_role_z_score_matrix():
+    df = _players(0)
+    profile = SimilarityIndex(df).profile(['p3', 'unknown', 'p9'])
+    assert profile.index.tolist() == ['p3', 'p9']
+    np.testing.assert_allclose(profile, _reference_z(df).loc[[3, 9], profile.columns], rtol=1e-5, atol=1e-5)
+
+
+def test_unknown_player_has_no_neighbours():
+    assert SimilarityIndex(_players(0)).similar_players('nobody').empty
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ratings import fit_ratings
+
+
+def _series(*results) -> pd.DataFrame:
+    """Matches from (team1, team2, team1_score, team2_score) tuples."""
+    return pd.DataFrame(results, columns=['team1', 'team2', 'team1_score', 'team2_score'])
+
+
+def _league(seed: int, n_teams: int = 6, n_series: int = 25) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    results = []
+    for _ in range(n_series):
+        a, b = rng.choice(n_teams, 2, replace=False)
+        loser_games = int(rng.integers(0, 3))
+        results.append((f'team{a}', f'team{b}') + ((3, loser_games) if rng.random() < 0.5 else (loser_games, 3)))
+    return _series(*results)
+
+
+def _games(df: pd.DataFrame, teams) -> np.ndarray:
+    """Reference: wins[a, b] = games team a won against team b, summed by loops."""
+    position = {team: k for k, team in enumerate(teams)}
+    wins = np.zeros((len(teams), len(teams)))
+    for team1, team2, score1, score2 in df.itertuples(index=False):
+        wins[position[team1], position[team2]] += score1
+        wins[position[team2], position[team1]] += score2
+    return wins
+
+
+def test_massey_two_team_league_by_hand():
+    # One 3-1 series: 4 games, margin 2. With 2 prior games, (L + 2I) x = b reads
+    # [[6, -4], [-4, 6]] x = [2, -2], so x = (0.2, -0.2).
+    ratings = fit_ratings(_series(('A', 'B', 3, 1)), 'massey', prior_games=2.0)
+    assert ratings.strengths['A'] == pytest.approx(0.2, abs=1e-5)
+    assert ratings.strengths['B'] == pytest.approx(-0.2, abs=1e-5)
+    assert ratings.ratings.loc['A', ['games', 'game_wins']].tolist() == [4, 3]
+
+
+def test_bradley_terry_two_team_league_by_hand():
+    # Without a prior, the maximum likelihood has P(A beats B) = 3/4, a log-strength difference of ln 3
+    ratings = fit_ratings(_series(('A', 'B', 2, 1), ('B', 'A', 0, 1)), 'bradley_terry', prior_games=0.0)
+    assert ratings.strengths['A'] - ratings.strengths['B'] == pytest.approx(np.log(3), abs=1e-5)
+    assert ratings.win_probability('A', 'B') == pytest.approx(0.75, abs=1e-5)
+
+    # With the prior the difference shrinks, to the root of 3 + 1 = 2 sigmoid(d) + 4 sigmoid(2d)
+    ratings = fit_ratings(_series(('A', 'B', 3, 1)), 'bradley_terry', prior_games=2.0)
+    d = ratings.strengths['A']
+    assert ratings.strengths['B'] == pytest.approx(-d, abs=1e-5)
+    assert 2 / (1 + np.exp(-d)) + 4 / (1 + np.exp(-2 * d)) == pytest.approx(4, abs=1e-5)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_massey_matches_a_dense_solve(seed):
+    df = _league(seed)
+    ratings = fit_ratings(df, 'massey', prior_games=1.5)
+    teams = list(ratings.ratings.index)
+    wins = _games(df, teams)
+    games = wins + wins.T
+    laplacian = np.diag(games.sum(axis=1)) - games
+    expected = np.linalg.solve(laplacian + 1.5 * np.eye(len(teams)), (wins - wins.T).sum(axis=1))
+    np.testing.assert_allclose(ratings.strengths.to_numpy(), expected, atol=1e-5)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_bradley_terry_zeroes_the_likelihood_gradient(seed):
+    df = _league(seed)
+    ratings = fit_ratings(df, 'bradley_terry', prior_games=2.0)
+    teams = list(ratings.ratings.index)
+    x = ratings.strengths.to_numpy()
+    wins = _games(df, teams)
+    p = 1 / (1 + np.exp(x[None, :] - x[:, None]))
+    # d/dx_a of the log-likelihood, prior games (half won) against a strength-0 team included
+    gradient = wins.sum(axis=1) - ((wins + wins.T) * p).sum(axis=1) + 1.0 - 2.0 / (1 + np.exp(-x))
+    np.testing.assert_allclose(gradient, 0, atol=1e-5)
+    assert ratings.ratings['game_wins'].tolist() == wins.sum(axis=1).tolist()
+
+
+@pytest.mark.parametrize('method', ['bradley_terry', 'massey'])
+def test_warm_start_reaches_the_same_ratings(method):
+    df = _league(9, n_series=40)
+    previous = fit_ratings(df.iloc[:35], method)
+    cold = fit_ratings(df, method)
+    warm = fit_ratings(df, method, previous=previous)
+    pd.testing.assert_series_equal(warm.strengths.sort_index(), cold.strengths.sort_index(), atol=1e-5)
+
+
+def test_empty_and_unknown_method():
+    assert fit_ratings(pd.DataFrame()).empty
+    with pytest.raises(ValueError):
+        fit_ratings(_series(('A', 'B', 3, 1)), 'elo')
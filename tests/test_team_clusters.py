@@ -0,0 +1,85 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from team_clusters import cluster_teams, kmeans, standardize
+
+
+def _points(seed: int, n: int = 8, d: int = 3) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, d))
+
+
+def _blobs(seed: int, k: int, n: int = 9, d: int = 3) -> np.ndarray:
+    """Points scattered around k random centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(0, 2, size=(k, d))
+    return centres[np.arange(n) % k] + rng.normal(0, 0.5, size=(n, d))
+
+
+def _best_inertia(x: np.ndarray, k: int) -> float:
+    """Reference: the lowest within-cluster sum of squares over every assignment of points to k clusters."""
+    best = np.inf
+    for labels in product(range(k), repeat=len(x)):
+        labels = np.array(labels)
+        inertia = sum(((x[labels == c] - x[labels == c].mean(axis=0)) ** 2).sum()
+                      for c in range(k) if (labels == c).any())
+        best = min(best, inertia)
+    return best
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('k', [2, 3])
+def test_kmeans_reaches_the_enumerated_optimum(seed, k):
+    x = _blobs(seed, k)
+    assert kmeans(x, k)[2] == pytest.approx(_best_inertia(x, k), rel=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('k', [2, 3])
+def test_kmeans_returns_a_lloyd_fixed_point(seed, k):
+    # Structureless data has several local optima; whichever one is returned must be self-consistent
+    x = _points(seed)
+    labels, centers, inertia = kmeans(x, k)
+    assert inertia >= _best_inertia(x, k) - 1e-9
+    # Each point sits in its nearest centre's cluster, and each centre is its cluster's mean
+    distances = ((x[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+    assert (labels == distances.argmin(axis=1)).all()
+    for c in np.unique(labels):
+        np.testing.assert_allclose(centers[c], x[labels == c].mean(axis=0))
+
+
+def test_standardize_matches_pandas():
+    values = _points(5, n=10)
+    values[[1, 4], 0] = np.nan
+    values[:, 2] = 7.0
+    frame = pd.DataFrame(values)
+    expected = ((frame - frame.mean()) / frame.std(ddof=0)).fillna(0.0)
+    np.testing.assert_allclose(standardize(values), expected.to_numpy(), atol=1e-12)
+
+
+def test_cluster_teams_projection_and_labels():
+    rng = np.random.default_rng(2)
+    # Two well separated groups of teams
+    values = np.r_[rng.normal(0, 0.3, (6, 4)), rng.normal(3, 0.3, (4, 4))]
+    df = pd.DataFrame(values, columns=['a', 'b', 'c', 'd']).assign(name=[f'team{i}' for i in range(10)])
+    clusters = cluster_teams(df, ['a', 'b', 'c', 'd', 'missing'], 2, {'a': 'Alpha'})
+
+    assert clusters.labels.tolist() == [0] * 6 + [1] * 4  # cluster 0 is the largest
+    assert clusters.centroids.columns.tolist() == ['a', 'b', 'c', 'd']
+    assert set(clusters.archetypes) == {0, 1}
+
+    # Principal components against an eigendecomposition of the covariance (up to sign)
+    x = standardize(values)
+    eigenvalues, eigenvectors = np.linalg.eigh(np.cov(x, rowvar=False))
+    order = np.argsort(eigenvalues)[::-1][:2]
+    np.testing.assert_allclose(clusters.explained_variance, eigenvalues[order] / eigenvalues.sum())
+    expected = (x - x.mean(axis=0)) @ eigenvectors[:, order]
+    np.testing.assert_allclose(np.abs(clusters.coords.to_numpy()), np.abs(expected), atol=1e-9)
+
+
+def test_too_few_teams_or_features():
+    df = pd.DataFrame({'name': ['a', 'b'], 'x': [1.0, 2.0]})
+    assert cluster_teams(df, ['x'], 3) is None
+    assert cluster_teams(df, ['missing'], 2) is None
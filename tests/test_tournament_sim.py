@@ -0,0 +1,86 @@
+from itertools import combinations, product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tournament_sim import (best_pickems, pickem_expected_score, series_win_probability, simulate_worlds,
+                            win_probabilities_from_strengths, SimulationResult, PICKEM_SLOTS, OUTCOMES)
+
+
+def _result(seed: int, n_teams: int) -> SimulationResult:
+    rng = np.random.default_rng(seed)
+    probabilities = pd.DataFrame(rng.random((n_teams, len(PICKEM_SLOTS))), columns=list(PICKEM_SLOTS),
+                                 index=[f'team{i}' for i in range(n_teams)])
+    return SimulationResult(probabilities, n_sims=1)
+
+
+def _enumerated_best_score(result: SimulationResult) -> float:
+    """Reference: tries every assignment of distinct teams to the pick'em slots."""
+    outcomes = list(PICKEM_SLOTS)
+    probabilities = result.probabilities[outcomes].to_numpy()
+    best = -np.inf
+
+    def assign(column, available, score):
+        nonlocal best
+        if column == len(outcomes):
+            best = max(best, score)
+            return
+        for picked in combinations(available, PICKEM_SLOTS[outcomes[column]]):
+            remaining = [team for team in available if team not in picked]
+            assign(column + 1, remaining, score + probabilities[list(picked), column].sum())
+
+    assign(0, list(range(len(probabilities))), 0.0)
+    return best
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_best_pickems_matches_enumeration(seed):
+    result = _result(seed, n_teams=10)
+    picks = best_pickems(result)
+
+    assert {outcome: len(teams) for outcome, teams in picks.items()} == PICKEM_SLOTS
+    picked = [team for teams in picks.values() for team in teams]
+    assert len(picked) == len(set(picked))
+    assert pickem_expected_score(result, picks) == pytest.approx(_enumerated_best_score(result))
+    for outcome, teams in picks.items():
+        shown = result.probabilities.loc[teams, outcome].tolist()
+        assert shown == sorted(shown, reverse=True)
+
+
+def test_best_pickems_beats_filling_the_scarcest_outcome_first():
+    # team0 is the best 3-0 pick but much more valuable as a 0-3 pick
+    probabilities = pd.DataFrame(0.0, index=[f'team{i}' for i in range(9)], columns=list(PICKEM_SLOTS))
+    probabilities.loc['team0'] = [0.5, 0.9, 0.0]
+    probabilities.loc[['team1', 'team2'], 'swiss_3_0'] = 0.45
+    probabilities.loc['team3', 'swiss_0_3'] = 0.1
+    result = SimulationResult(probabilities, n_sims=1)
+    assert pickem_expected_score(result, best_pickems(result)) == pytest.approx(_enumerated_best_score(result))
+    assert 'team0' in best_pickems(result)['swiss_0_3']
+
+
+@pytest.mark.parametrize('best_of', [1, 3, 5])
+@pytest.mark.parametrize('p', [0.0, 0.3, 0.5, 0.85, 1.0])
+def test_series_win_probability_matches_enumerated_games(best_of, p):
+    needed = best_of // 2 + 1
+    expected = 0.0
+    # Every full-length sequence of games; the series is won if team a takes the majority
+    for games in product([True, False], repeat=best_of):
+        if sum(games) >= needed:
+            expected += p ** sum(games) * (1 - p) ** (best_of - sum(games))
+    assert series_win_probability(np.float64(p), best_of) == pytest.approx(expected)
+
+
+def test_simulated_outcomes_add_up_per_tournament():
+    play_in = ('T1', 'Invictus Gaming')
+    teams = list(play_in) + [f'team{i}' for i in range(15)]
+    strengths = pd.Series(np.linspace(1.5, -1.5, len(teams)), index=teams)
+    result = simulate_worlds(win_probabilities_from_strengths(strengths), play_in, n_sims=2000, seed=3, workers=0)
+    totals = result.probabilities[OUTCOMES].sum()
+    expected = {'swiss': 16, 'swiss_3_0': 2, 'swiss_3_1_3_2': 6, 'swiss_0_3': 2,
+                'quarterfinal': 8, 'semifinal': 4, 'final': 2, 'champion': 1}
+    for outcome, count in expected.items():
+        assert totals[outcome] == pytest.approx(count)
+    # Only the play-in teams can miss the Swiss stage, and exactly one of them plays it
+    assert result.probabilities.loc[list(play_in), 'swiss'].sum() == pytest.approx(1)
+    assert result.probabilities['champion'].idxmax() == play_in[0]
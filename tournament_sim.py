@@ -0,0 +1,225 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SWISS_WINS = 3
+SWISS_LOSSES = 3
+# Simulations per vectorized batch; bounds peak memory (a few hundred bytes per simulation)
+SIM_BATCH_SIZE = int(os.getenv('SIM_BATCH_SIZE', '200000'))
+# Worker processes for large runs; 0 or 1 simulates in the calling process
+SIM_WORKERS = int(os.getenv('SIM_WORKERS', '0'))
+
+# Pick'em Swiss slots: how many teams are picked for each outcome, one point per correct pick
+PICKEM_SLOTS: Dict[str, int] = {'swiss_3_0': 2, 'swiss_0_3': 2, 'swiss_3_1_3_2': 5}
+
+# Swiss record codes (wins * RECORD_BASE + losses) and what each one means for the next round
+RECORD_BASE = SWISS_LOSSES + 1
+_CODES = np.arange(SWISS_WINS * RECORD_BASE + SWISS_LOSSES + 1)
+_ACTIVE = (_CODES // RECORD_BASE < SWISS_WINS) & (_CODES % RECORD_BASE < SWISS_LOSSES)
+# Finished teams sort after every record still playing
+_SORT_KEY = np.where(_ACTIVE, _CODES, _CODES.max() + 1).astype(np.float32)
+_BEST_OF = np.where((_CODES // RECORD_BASE == SWISS_WINS - 1) | (_CODES % RECORD_BASE == SWISS_LOSSES - 1), 3, 1)
+
+OUTCOMES = ['swiss', 'swiss_3_0', 'swiss_3_1_3_2', 'swiss_0_3', 'quarterfinal', 'semifinal', 'final', 'champion']
+
+
+def series_win_probability(p_game: np.ndarray, best_of: int) -> np.ndarray:
+    """Probability of winning a best-of-N series given the per-game win probability."""
+    if best_of == 1:
+        return p_game
+    if best_of == 3:
+        return p_game ** 2 * (3 - 2 * p_game)
+    if best_of == 5:
+        return p_game ** 3 * (10 - 15 * p_game + 6 * p_game ** 2)
+    raise ValueError(f"Unsupported series length: Bo{best_of}")
+
+
+def _play(rng: np.random.Generator, p_flat: np.ndarray, n_teams: int, team_a: np.ndarray, team_b: np.ndarray,
+          best_of) -> np.ndarray:
+    """
+    Plays the series between team_a and team_b (team ids, arrays of shape (sims, matches)).
+    best_of is an int or a same-shaped array. Returns a boolean array, True where team_a won.
+    """
+    p = p_flat[team_a * n_teams + team_b]
+    if np.isscalar(best_of):
+        p = series_win_probability(p, best_of)
+    else:
+        p = np.where(best_of == 3, series_win_probability(p, 3), p)
+    return rng.random(p.shape) < p
+
+
+def _simulate_batch(p_game: np.ndarray, swiss_ids: np.ndarray, play_in_ids: Tuple[int, int],
+                    n_sims: int, seed) -> np.ndarray:
+    """
+    Simulates n_sims tournaments at once and returns how often each team reached each outcome,
+    as an array of shape (teams, len(OUTCOMES)).
+
+    Per-simulation lookups go through flat indices (row offset + slot) rather than 2-D fancy
+    indexing, which is several times faster at this shape.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = p_game.shape[0]
+    p_flat = p_game.ravel()
+    n_slots = len(swiss_ids) + 1
+    offset = (np.arange(n_sims) * n_slots)[:, None]
+
+    # --- Play-in (Bo5): the winner fills the last Swiss slot ---
+    p_play_in = series_win_probability(p_game[play_in_ids[0], play_in_ids[1]], 5)
+    ids = np.empty((n_sims, n_slots), dtype=np.intp)
+    ids[:, :-1] = swiss_ids
+    ids[:, -1] = np.where(rng.random(n_sims) < p_play_in, play_in_ids[0], play_in_ids[1])
+    ids_flat = ids.ravel()
+
+    # --- Swiss: teams on the same record are paired at random each round ---
+    # A team's record is one int8 code, wins * RECORD_BASE + losses; per-code properties are table lookups
+    state = np.zeros(n_sims * n_slots, dtype=np.int8)
+    while True:
+        # Every simulation has the same number of teams still playing in a given round
+        n_active = int(_ACTIVE[state[:n_slots]].sum())
+        if not n_active:
+            break
+        record = _SORT_KEY[state].reshape(n_sims, n_slots)
+        order = np.argsort(record + rng.random(record.shape, dtype=np.float32), axis=1)[:, :n_active]
+        a, b = offset + order[:, 0::2], offset + order[:, 1::2]
+        # Matches that decide advancement or elimination are Bo3, the rest Bo1
+        best_of = _BEST_OF[state[a]]
+        a_won = _play(rng, p_flat, n_teams, ids_flat[a], ids_flat[b], best_of)
+        state[np.where(a_won, a, b)] += RECORD_BASE
+        state[np.where(a_won, b, a)] += 1
+
+    wins, losses = np.divmod(state.reshape(n_sims, n_slots), RECORD_BASE)
+    advanced = wins == SWISS_WINS
+
+    # --- Knockout (Bo5): seeded by Swiss record, random within a record ---
+    seed_key = np.where(advanced, losses, SWISS_LOSSES + 1) + rng.random(wins.shape)
+    seeds = offset + np.argsort(seed_key, axis=1)[:, :8]
+    # Bracket halves: (1v8, 4v5) and (2v7, 3v6)
+    quarter_a, quarter_b = ids_flat[seeds[:, [0, 3, 1, 2]]], ids_flat[seeds[:, [7, 4, 6, 5]]]
+    semis = np.where(_play(rng, p_flat, n_teams, quarter_a, quarter_b, 5), quarter_a, quarter_b)
+    semi_a, semi_b = semis[:, 0::2], semis[:, 1::2]
+    finals = np.where(_play(rng, p_flat, n_teams, semi_a, semi_b, 5), semi_a, semi_b)
+    final_a, final_b = finals[:, :1], finals[:, 1:]
+    champion = np.where(_play(rng, p_flat, n_teams, final_a, final_b, 5), final_a, final_b)
+
+    def count(teams: np.ndarray) -> np.ndarray:
+        return np.bincount(teams.ravel(), minlength=n_teams)
+
+    return np.column_stack([
+        count(ids),
+        count(ids[advanced & (losses == 0)]),
+        count(ids[advanced & (losses > 0)]),
+        count(ids[(losses == SWISS_LOSSES) & (wins == 0)]),
+        count(ids[advanced]),
+        count(semis),
+        count(finals),
+        count(champion),
+    ])
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Share of simulations in which each team reached each outcome (index: team, columns: OUTCOMES)."""
+    probabilities: pd.DataFrame
+    n_sims: int
+
+
+def simulate_worlds(p_game: pd.DataFrame, play_in: Tuple[str, str], n_sims: int = 100_000,
+                    seed: Optional[int] = None, workers: int = SIM_WORKERS) -> SimulationResult:
+    """
+    Monte Carlo simulation of the play-in series, the Swiss stage and the knockout bracket.
+
+    Args:
+        p_game: Square frame of per-game win probabilities, p_game.loc[a, b] = P(a beats b),
+            indexed by team on both axes. Every team not in the play-in enters the Swiss stage.
+        play_in: The two teams playing the qualifying series; the winner takes the last Swiss slot.
+        n_sims: Number of simulated tournaments.
+        seed: Seed for reproducible results.
+        workers: Spread the batches over this many processes (0 or 1 runs in this process).
+
+    All simulations of a batch advance together: each Swiss round is one argsort to pair the
+    teams on equal records and one vectorized draw for every match of every simulation.
+    """
+    teams = list(p_game.index)
+    matrix = p_game.loc[teams, teams].to_numpy(dtype=np.float64)
+    play_in_ids = (teams.index(play_in[0]), teams.index(play_in[1]))
+    swiss_ids = np.array([i for i in range(len(teams)) if i not in play_in_ids], dtype=np.intp)
+    if len(swiss_ids) + 1 != 16:
+        raise ValueError(f"The Swiss stage needs 16 teams, got {len(swiss_ids) + 1}")
+
+    sizes = [SIM_BATCH_SIZE] * (n_sims // SIM_BATCH_SIZE) + ([n_sims % SIM_BATCH_SIZE] if n_sims % SIM_BATCH_SIZE else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(matrix, swiss_ids, play_in_ids, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = sum(pool.map(_simulate_batch, *zip(*args)))
+    else:
+        counts = sum(_simulate_batch(*batch) for batch in args)
+
+    probabilities = pd.DataFrame(counts / max(n_sims, 1), index=teams, columns=OUTCOMES)
+    return SimulationResult(probabilities.sort_values('champion', ascending=False), n_sims)
+
+
+def game_win_probabilities(game_wins: pd.DataFrame, prior_games: float = 4.0) -> pd.DataFrame:
+    """
+    Per-game win probabilities from a head-to-head game-wins matrix (MatchIndex.matrix().game_wins).
+
+    Each team's strength is the log-odds of its share of games won against the other teams,
+    shrunk towards 50% by prior_games pseudo-games; P(a beats b) is the logistic of the difference.
+    """
+    won = game_wins.sum(axis=1).to_numpy(dtype=np.float64)
+    lost = game_wins.sum(axis=0).to_numpy(dtype=np.float64)
+    share = (won + prior_games / 2) / (won + lost + prior_games)
+    return win_probabilities_from_strengths(pd.Series(np.log(share / (1 - share)), index=game_wins.index))
+
+
+def win_probabilities_from_strengths(strengths: pd.Series) -> pd.DataFrame:
+    """Logistic per-game win probability of every pair from log-odds strengths."""
+    s = strengths.to_numpy(dtype=np.float64)
+    p = 1 / (1 + np.exp(-(s[:, None] - s[None, :])))
+    return pd.DataFrame(p, index=strengths.index, columns=strengths.index)
+
+
+def best_pickems(result: SimulationResult) -> Dict[str, List[str]]:
+    """
+    The Swiss pick'em that maximizes the expected number of correct picks: the sum of the picked
+    teams' outcome probabilities, with each team picked at most once and every outcome's slots
+    (PICKEM_SLOTS) filled. Solved exactly by a dynamic program over the teams whose state is the
+    number of slots still open per outcome (3 x 3 x 6 states for the 2/2/5 pick'em).
+    """
+    outcomes = list(PICKEM_SLOTS)
+    probabilities = result.probabilities[outcomes].to_numpy(dtype=np.float64)
+    # Open slots per outcome -> (best expected score, picks so far as (team, outcome) positions)
+    best: Dict[Tuple[int, ...], Tuple[float, Tuple[Tuple[int, int], ...]]] = {
+        tuple(PICKEM_SLOTS[outcome] for outcome in outcomes): (0.0, ()),
+    }
+    for team in range(len(probabilities)):
+        following: Dict[Tuple[int, ...], Tuple[float, Tuple[Tuple[int, int], ...]]] = {}
+        for open_slots, (score, chosen) in best.items():
+            # Leave the team out, or pick it for any outcome with an open slot
+            options = [(open_slots, score, chosen)]
+            for o, remaining in enumerate(open_slots):
+                if remaining:
+                    options.append((open_slots[:o] + (remaining - 1,) + open_slots[o + 1:],
+                                    score + probabilities[team, o], chosen + ((team, o),)))
+            for state, value, picks in options:
+                if state not in following or value > following[state][0]:
+                    following[state] = (value, picks)
+        best = following
+
+    # Fewest open slots first (all filled when there are enough teams), then the highest score
+    _, (_, chosen) = min(best.items(), key=lambda item: (sum(item[0]), -item[1][0]))
+    teams = result.probabilities.index
+    return {outcome: [teams[team] for team, o in sorted(chosen, key=lambda pick: -probabilities[pick])
+                      if o == index]
+            for index, outcome in enumerate(outcomes)}
+
+
+def pickem_expected_score(result: SimulationResult, picks: Dict[str, Sequence[str]]) -> float:
+    """Expected number of correct Swiss picks: the sum of each picked team's outcome probability."""
+    probabilities = result.probabilities
+    return float(sum(probabilities.loc[list(teams), outcome].sum() for outcome, teams in picks.items()))